@@ -103,6 +103,7 @@ in
     # Data commands
     seed.exec = "uv run python -m puffin.seed";
     backup.exec = "uv run python -m puffin.backup";
+    maintenance.exec = "uv run python -m puffin.maintenance";
   };
 
   enterShell = ''
@@ -134,6 +135,7 @@ in
     echo "Data commands:"
     echo "  seed             - Generate 14 days of demo data"
     echo "  backup           - Snapshot the database into <db-dir>/backups"
+    echo "  maintenance      - Refresh planner statistics and reclaim free space"
     echo ""
     echo "Other commands:"
     echo "  install-deps     - Install dependencies with uv"
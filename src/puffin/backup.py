@@ -12,14 +12,39 @@ the database is being written concurrently, and both land in a ``backups/``
 directory beside the database. That protects against a bad migration or logical
 corruption; it does **not** protect against losing the disk itself, since the
 copies share it -- see README for off-box replication.
+
+Snapshots can be compressed (``PUFFIN_BACKUP_COMPRESS``) and are pruned by
+count, total size and daily/weekly/monthly tiers.  ``python -m puffin.backup
+restore <snapshot>`` puts one back, compressed or not.
+
+``python -m puffin.backup incremental`` stores only the pages that changed
+since the last incremental backup, in a page store beside the snapshots, so
+frequent rollback points cost about what changed rather than the whole file.
+
+``python -m puffin.backup restore-replica`` restores from the continuous WAL
+replica kept by ``replica`` when ``PUFFIN_REPLICA_DIR`` is set, to any point
+in time it covers.
 """
 
+import argparse
+import gzip
+import hashlib
 import logging
 import os
+import re
+import shutil
 import sqlite3
+import tempfile
+import time
+import zlib
 from datetime import UTC, datetime
 from pathlib import Path
 
+try:
+    import zstandard
+except ImportError:  # optional: gzip is always available
+    zstandard = None
+
 logger = logging.getLogger("uvicorn.error")
 
 # How many snapshots to retain per database. Override with PUFFIN_BACKUP_KEEP;
@@ -27,31 +52,285 @@ logger = logging.getLogger("uvicorn.error")
 DEFAULT_KEEP = 10
 
 
-def _keep_count() -> int:
-    raw = os.environ.get("PUFFIN_BACKUP_KEEP")
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
     if raw is None:
-        return DEFAULT_KEEP
+        return default
     try:
         return int(raw)
     except ValueError:
-        return DEFAULT_KEEP
+        return default
+
+
+def _keep_count() -> int:
+    return _env_int("PUFFIN_BACKUP_KEEP", DEFAULT_KEEP)
+
+
+# Snapshot compression, set with PUFFIN_BACKUP_COMPRESS: ``zstd`` (needs
+# ``puffin[zstd]``), ``gzip``, or unset for plain ``.db`` files.  A database
+# compresses about 12x with zstd at level 3 and 10x with gzip at level 6;
+# zstd does it in a seventh of gzip's time.
+_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+_ZSTD_LEVEL = 3
+_GZIP_LEVEL = 6
+
+# Bytes read and written at a time while compressing or restoring.
+_CHUNK_SIZE = 1024 * 1024
+
+# A snapshot's name: ``<stem>-<stamp>-<reason>.db``, then any compression.
+_STAMP_FORMAT = "%Y%m%dT%H%M%S_%fZ"
+_SNAPSHOT_NAME = re.compile(r"-(\d{8}T\d{6}_\d{6}Z)-([\w-]+)\.db(\.gz|\.zst)?$")
+
+
+def _compression() -> str | None:
+    method = os.environ.get("PUFFIN_BACKUP_COMPRESS", "").strip().lower()
+    if not method or method == "none":
+        return None
+    if method not in _SUFFIXES:
+        logger.warning("Ignoring PUFFIN_BACKUP_COMPRESS=%r: use zstd or gzip", method)
+        return None
+    if method == "zstd" and zstandard is None:
+        logger.warning("zstd backups need the zstandard package (puffin[zstd]); using gzip")
+        return "gzip"
+    return method
+
+
+def _retention() -> dict:
+    """The ``_prune`` limits beyond the count, from the environment.
+
+    ``PUFFIN_BACKUP_MAX_MB`` caps the snapshots' total size, and
+    ``PUFFIN_BACKUP_KEEP_DAILY``/``_WEEKLY``/``_MONTHLY`` keep the newest
+    snapshot of that many recent days, weeks and months besides.
+    """
+    return {
+        "max_bytes": _env_int("PUFFIN_BACKUP_MAX_MB", 0) * 1024 * 1024,
+        "daily": _env_int("PUFFIN_BACKUP_KEEP_DAILY", 0),
+        "weekly": _env_int("PUFFIN_BACKUP_KEEP_WEEKLY", 0),
+        "monthly": _env_int("PUFFIN_BACKUP_KEEP_MONTHLY", 0),
+    }
+
+
+# Pages copied per step of the online backup (4 MiB at the default page
+# size).  The source is locked only while a step runs, so writers get in
+# between steps rather than waiting out the whole copy.  Override with
+# PUFFIN_BACKUP_STEP_PAGES.
+STEP_PAGES = 1024
+
+# Pause between steps, in seconds, for backups taken by ``backup_database``.
+# Writers are never blocked by a pause, but on an SD card the copy's reads
+# compete with their fsyncs; a pause leaves the disk to them for a moment.
+# Off by default: a longer copy is more likely to be restarted by a write
+# (see ``MAX_RESTARTS``).  Set with PUFFIN_BACKUP_STEP_SLEEP_MS.
+STEP_SLEEP = 0.0
+
+# Restarts tolerated before the copy is taken in a single step instead.
+MAX_RESTARTS = 3
+
+
+def _step_pages() -> int:
+    return _env_int("PUFFIN_BACKUP_STEP_PAGES", STEP_PAGES)
+
+
+def _step_sleep() -> float:
+    raw = os.environ.get("PUFFIN_BACKUP_STEP_SLEEP_MS")
+    try:
+        return max(float(raw), 0.0) / 1000 if raw else STEP_SLEEP
+    except ValueError:
+        return STEP_SLEEP
+
+
+class _CopyRestartedError(Exception):
+    pass
+
+
+def _restart_guard():
+    """A backup progress callback that gives up after ``MAX_RESTARTS`` restarts.
+
+    A restart shows up as a step that completed (a busy step copies nothing)
+    without bringing the remaining page count down.
+    """
+    last = None
+    restarts = 0
+
+    def progress(status, remaining, total):
+        nonlocal last, restarts
+        if status == sqlite3.SQLITE_OK and last is not None and remaining >= last:
+            restarts += 1
+            logger.info("Database written to during the backup; copy restarted")
+            if restarts > MAX_RESTARTS:
+                raise _CopyRestartedError
+        last = remaining
+
+    return progress
+
+
+def _progress(dest, sleep: float):
+    """The progress callback for a copy into *dest*.
+
+    Logs each further tenth of the pages copied, pauses *sleep* seconds
+    after every step but the last, and stops stepping via ``_restart_guard``.
+    Runs between steps, when the source is not locked.
+    """
+    guard = _restart_guard()
+    logged = None
+
+    def progress(status, remaining, total):
+        nonlocal logged
+        guard(status, remaining, total)
+        tenths = (total - remaining) * 10 // total if total else 10
+        if tenths != logged:
+            logger.info("Backup to %s: %d of %d pages copied", dest, total - remaining, total)
+            logged = tenths
+        if sleep and remaining:
+            time.sleep(sleep)
+
+    return progress
+
+
+def copy_database(
+    source: sqlite3.Connection, dest, *, pages: int | None = None, sleep: float = 0.0
+) -> None:
+    """Copy the database behind *source* into the file *dest*, a step at a time.
+
+    Each step copies *pages* pages (default ``STEP_PAGES``) and is followed
+    by a pause of *sleep* seconds.  A write from another connection between
+    steps makes SQLite restart the copy from the first page, so the result
+    is always a consistent snapshot.  Under a steady stream of writes that
+    could go on forever, so after ``MAX_RESTARTS`` the copy is redone in one
+    step, blocking writers for that one pass as an unstepped backup always
+    did.
+    """
+    dst = sqlite3.connect(str(dest))
+    try:
+        with dst:
+            try:
+                source.backup(dst, pages=pages or STEP_PAGES, progress=_progress(dest, sleep))
+            except _CopyRestartedError:
+                logger.warning("Backup to %s kept restarting; copying in one step", dest)
+                source.backup(dst)
+    finally:
+        dst.close()
 
 
 def _backup_dir(db_path: Path) -> Path:
     return db_path.parent / "backups"
 
 
-def _prune(backups: Path, stem: str, keep: int) -> None:
-    """Keep only the newest *keep* snapshots for *stem*.
+def _snapshots(backups: Path, stem: str, reason: str | None = None) -> list[tuple[datetime, Path]]:
+    """*stem*'s snapshots in *backups* with the time each was taken, oldest first.
 
-    Filenames are timestamped with a fixed-width, zero-padded stamp, so
-    lexical order is chronological order.
+    With *reason*, only the snapshots taken for that reason.
     """
-    if keep <= 0:
-        return
-    snaps = sorted(backups.glob(f"{stem}-*.db"))
-    for old in snaps[:-keep]:
-        old.unlink(missing_ok=True)
+    found = []
+    for path in backups.glob(f"{stem}-*.db*"):
+        match = _SNAPSHOT_NAME.search(path.name)
+        if match and path.name[: match.start()] == stem and reason in (None, match.group(2)):
+            taken = datetime.strptime(match.group(1), _STAMP_FORMAT).replace(tzinfo=UTC)
+            found.append((taken, path))
+    return sorted(found)
+
+
+def _tier_picks(snaps: list[tuple[datetime, object]], count: int, period) -> set:
+    """The newest snapshot in each of the *count* most recent periods that have one.
+
+    *period* maps a snapshot's time to the day, week or month it falls in.
+    """
+    picks: dict = {}
+    for taken, snap in reversed(snaps):
+        key = period(taken)
+        if key not in picks:
+            if len(picks) == count:
+                break
+            picks[key] = snap
+    return set(picks.values())
+
+
+def _kept(
+    snaps: list[tuple[datetime, object]], keep: int, daily: int, weekly: int, monthly: int
+) -> set:
+    """Of *snaps*, oldest first, the newest *keep* and the tiers' picks."""
+    kept = {snap for _, snap in snaps[-keep:]}
+    kept |= _tier_picks(snaps, daily, lambda t: t.date())
+    kept |= _tier_picks(snaps, weekly, lambda t: t.isocalendar()[:2])
+    kept |= _tier_picks(snaps, monthly, lambda t: (t.year, t.month))
+    return kept
+
+
+def _prune(
+    backups: Path,
+    stem: str,
+    keep: int,
+    *,
+    reason: str | None = None,
+    max_bytes: int = 0,
+    daily: int = 0,
+    weekly: int = 0,
+    monthly: int = 0,
+) -> None:
+    """Keep the newest *keep* snapshots for *stem*, and the tiers' picks.
+
+    Besides the newest *keep*, the newest snapshot of each of the last
+    *daily* days, *weekly* ISO weeks and *monthly* months (UTC) is kept --
+    grandfather-father-son retention.  Then, with *max_bytes*, the oldest
+    of those go until all of *stem*'s snapshots fit, though the newest is
+    always kept.  A *keep* of 0 or less keeps every snapshot, subject only
+    to *max_bytes*.
+
+    With *reason*, only the snapshots taken for that reason are pruned, so
+    an hourly schedule cannot push out the pre-migration and manual ones.
+    """
+    snaps = _snapshots(backups, stem, reason)
+    if keep > 0:
+        kept = _kept(snaps, keep, daily, weekly, monthly)
+        for _, path in snaps:
+            if path not in kept:
+                path.unlink(missing_ok=True)
+        snaps = [(taken, path) for taken, path in snaps if path in kept]
+    if max_bytes > 0:
+        sizes = [path.stat().st_size for _, path in snaps]
+        total = sum(path.stat().st_size for _, path in _snapshots(backups, stem))
+        for (_, path), size in zip(snaps[:-1], sizes, strict=False):
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _compress(path: Path, method: str) -> Path:
+    """Compress the snapshot at *path* in one streaming pass; return the new file.
+
+    The compressed copy is written beside it under a temporary name and
+    renamed into place, and only then is the plain copy removed, so a
+    failure at any point leaves one whole snapshot behind.
+    """
+    dest = path.with_name(path.name + _SUFFIXES[method])
+    partial = path.with_name(f".{dest.name}.partial")
+    try:
+        with open(path, "rb") as src, open(partial, "wb") as out:
+            if method == "zstd":
+                zstandard.ZstdCompressor(level=_ZSTD_LEVEL).copy_stream(
+                    src, out, read_size=_CHUNK_SIZE, write_size=_CHUNK_SIZE
+                )
+            else:
+                with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=_GZIP_LEVEL) as gz:
+                    shutil.copyfileobj(src, gz, _CHUNK_SIZE)
+        partial.replace(dest)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    path.unlink()
+    return dest
+
+
+def _open_snapshot(path: Path):
+    """*path* opened for reading as a plain database file, whatever its compression."""
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} is zstd-compressed: install puffin[zstd]")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
 
 
 def backup_database(db_path, *, reason: str = "manual", keep: int | None = None) -> Path | None:
@@ -60,8 +339,9 @@ def backup_database(db_path, *, reason: str = "manual", keep: int | None = None)
     Returns the snapshot path, or ``None`` when there is nothing to back up
     (the file is missing or empty, i.e. a fresh install). *reason* is embedded
     in the filename so ``pre-migration`` and ``manual`` copies are
-    distinguishable. Never raises on backup failure -- a failed backup must not
-    take down startup -- but logs it.
+    distinguishable. The snapshot is compressed when ``PUFFIN_BACKUP_COMPRESS``
+    is set. Never raises on backup failure -- a failed backup must not take
+    down startup -- but logs it.
     """
     db_path = Path(db_path)
     if not db_path.exists() or db_path.stat().st_size == 0:
@@ -74,18 +354,13 @@ def backup_database(db_path, *, reason: str = "manual", keep: int | None = None)
     backups.mkdir(parents=True, exist_ok=True)
     # Microseconds keep the stamp unique when two snapshots land in one second
     # (e.g. a manual backup right after the pre-migration one).
-    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S_%fZ")
+    stamp = datetime.now(UTC).strftime(_STAMP_FORMAT)
     dest = backups / f"{db_path.stem}-{stamp}-{reason}.db"
 
     try:
         src = sqlite3.connect(str(db_path))
         try:
-            dst = sqlite3.connect(str(dest))
-            try:
-                with dst:
-                    src.backup(dst)
-            finally:
-                dst.close()
+            copy_database(src, dest, pages=_step_pages(), sleep=_step_sleep())
         finally:
             src.close()
     except sqlite3.Error:
@@ -93,16 +368,326 @@ def backup_database(db_path, *, reason: str = "manual", keep: int | None = None)
         dest.unlink(missing_ok=True)
         return None
 
-    _prune(backups, db_path.stem, keep)
+    method = _compression()
+    if method is not None:
+        try:
+            dest = _compress(dest, method)
+        except OSError:
+            # The plain snapshot is still there: a backup all the same.
+            logger.exception("Compressing %s failed; keeping it uncompressed", dest)
+
+    _prune(backups, db_path.stem, keep, reason=reason, **_retention())
     logger.info("Database backed up to %s (reason=%s)", dest, reason)
     return dest
 
 
-def main() -> None:
+def restore_database(snapshot, db_path) -> Path | None:
+    """Replace the database at *db_path* with *snapshot*, decompressing it if need be.
+
+    Stop the app first.  The snapshot is unpacked beside the database and
+    checked before anything is replaced; the database it replaces is itself
+    snapshotted first (reason ``pre-restore``), so a restore can be undone;
+    if that snapshot fails, nothing is replaced and ``RuntimeError`` is
+    raised.  Returns that snapshot's path, or ``None`` if there was no
+    database.
+    """
+    snapshot = Path(snapshot)
+
+    def unpack(out):
+        with _open_snapshot(snapshot) as src:
+            shutil.copyfileobj(src, out, _CHUNK_SIZE)
+
+    return _restore(Path(db_path), unpack, snapshot.name)
+
+
+def _restore(db_path: Path, unpack, label: str) -> Path | None:
+    """``restore_database``, with the database written out by ``unpack(file)``."""
+    fd, unpacked = tempfile.mkstemp(prefix=".restore-", suffix=".db", dir=db_path.parent)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            unpack(out)
+        check = sqlite3.connect(unpacked)
+        try:
+            result = check.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            check.close()
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"{label} failed its integrity check: {result}")
+        previous = backup_database(db_path, reason="pre-restore")
+        if previous is None and any(
+            Path(f"{db_path}{suffix}").exists() and Path(f"{db_path}{suffix}").stat().st_size
+            for suffix in ("", "-wal")
+        ):
+            # There is data to lose and no snapshot to undo the restore with.
+            raise RuntimeError(f"Could not snapshot {db_path} first; nothing was restored")
+        # A journal or WAL left beside the old database would be applied to
+        # the restored one.  Its changes are in the pre-restore snapshot.
+        for suffix in ("-journal", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        os.replace(unpacked, db_path)
+    except BaseException:
+        Path(unpacked).unlink(missing_ok=True)
+        raise
+    logger.info("Database restored from %s", label)
+    return previous
+
+
+# Incremental backups keep pages rather than files.  ``<stem>-pages.db`` in
+# ``backups/`` holds every distinct page stored so far, zlib-compressed and
+# keyed by a digest of its contents, and for each backup the digests of its
+# pages in order.  A backup adds only the pages whose digest differs from the
+# previous backup's, plus its list of digests (16 bytes a page).  Retention
+# is set with PUFFIN_BACKUP_KEEP_INCREMENTAL and the same tiers as snapshots.
+DEFAULT_KEEP_INCREMENTAL = 48
+_DIGEST_SIZE = 16
+
+_PAGE_STORE_SCHEMA = """
+PRAGMA auto_vacuum = INCREMENTAL;
+CREATE TABLE IF NOT EXISTS pages (
+    digest BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS backups (
+    taken_at TEXT PRIMARY KEY,
+    page_size INTEGER NOT NULL,
+    digests BLOB NOT NULL,
+    new_pages INTEGER NOT NULL,
+    new_bytes INTEGER NOT NULL
+);
+"""
+
+
+def _page_store_path(db_path: Path) -> Path:
+    return _backup_dir(db_path) / f"{db_path.stem}-pages.db"
+
+
+def _page_store(db_path: Path) -> sqlite3.Connection:
+    _backup_dir(db_path).mkdir(parents=True, exist_ok=True)
+    store = sqlite3.connect(str(_page_store_path(db_path)))
+    store.executescript(_PAGE_STORE_SCHEMA)
+    return store
+
+
+def incremental_backup(db_path, *, keep: int | None = None) -> str | None:
+    """Store the pages of *db_path* that changed since its last incremental backup.
+
+    A consistent copy is taken first, as for a snapshot, into a temporary
+    file beside the page store; its pages are hashed and the new ones added
+    in one transaction.  Returns the backup's stamp, or ``None`` when there
+    is nothing to back up or the backup failed, which is logged.
+    """
+    db_path = Path(db_path)
+    if not db_path.exists() or db_path.stat().st_size == 0:
+        return None
+    if keep is None:
+        keep = _env_int("PUFFIN_BACKUP_KEEP_INCREMENTAL", DEFAULT_KEEP_INCREMENTAL)
+
+    stamp = datetime.now(UTC).strftime(_STAMP_FORMAT)
+    try:
+        store = _page_store(db_path)
+    except sqlite3.Error:
+        logger.exception("Opening the page store for %s failed", db_path)
+        return None
+    fd, staged = tempfile.mkstemp(prefix=".incremental-", suffix=".db", dir=_backup_dir(db_path))
+    os.close(fd)
+    try:
+        src = sqlite3.connect(str(db_path))
+        try:
+            copy_database(src, staged, pages=_step_pages(), sleep=_step_sleep())
+        finally:
+            src.close()
+        with store:
+            new_pages, new_bytes = _store_pages(store, Path(staged), stamp)
+        # Not PUFFIN_BACKUP_MAX_MB: backups share pages, so none has a size of its own.
+        tiers = _retention()
+        _prune_page_store(store, keep, tiers["daily"], tiers["weekly"], tiers["monthly"])
+    except sqlite3.Error:
+        logger.exception("Incremental backup of %s failed", db_path)
+        return None
+    finally:
+        store.close()
+        Path(staged).unlink(missing_ok=True)
+
+    logger.info(
+        "Database backed up incrementally (%s): %d new pages, %d bytes", stamp, new_pages, new_bytes
+    )
+    return stamp
+
+
+def _store_pages(store: sqlite3.Connection, copy: Path, stamp: str) -> tuple[int, int]:
+    """Add *copy*'s pages to the store as backup *stamp*; return what was new."""
+    check = sqlite3.connect(str(copy))
+    try:
+        page_size = check.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        check.close()
+    last = store.execute("SELECT digests FROM backups ORDER BY taken_at DESC LIMIT 1").fetchone()
+    previous = last[0] if last else b""
+    digests = []
+    new_pages = new_bytes = 0
+    with open(copy, "rb") as pages:
+        while page := pages.read(page_size):
+            digest = hashlib.blake2b(page, digest_size=_DIGEST_SIZE).digest()
+            at = len(digests) * _DIGEST_SIZE
+            if previous[at : at + _DIGEST_SIZE] != digest:
+                data = zlib.compress(page)
+                added = store.execute(
+                    "INSERT OR IGNORE INTO pages (digest, data) VALUES (?, ?)", (digest, data)
+                ).rowcount
+                new_pages += added
+                new_bytes += added * len(data)
+            digests.append(digest)
+    store.execute(
+        "INSERT INTO backups (taken_at, page_size, digests, new_pages, new_bytes)"
+        " VALUES (?, ?, ?, ?, ?)",
+        (stamp, page_size, b"".join(digests), new_pages, new_bytes),
+    )
+    return new_pages, new_bytes
+
+
+def _prune_page_store(
+    store: sqlite3.Connection, keep: int, daily: int = 0, weekly: int = 0, monthly: int = 0
+) -> None:
+    """Drop the backups ``_prune`` would, then the pages no remaining backup uses."""
+    if keep <= 0:
+        return
+    stamps = [row[0] for row in store.execute("SELECT taken_at FROM backups ORDER BY taken_at")]
+    snaps = [(datetime.strptime(s, _STAMP_FORMAT).replace(tzinfo=UTC), s) for s in stamps]
+    kept = _kept(snaps, keep, daily, weekly, monthly)
+    doomed = [(s,) for s in stamps if s not in kept]
+    if not doomed:
+        return
+    with store:
+        store.executemany("DELETE FROM backups WHERE taken_at = ?", doomed)
+        store.execute("CREATE TEMP TABLE live (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        for (digests,) in store.execute("SELECT digests FROM backups").fetchall():
+            store.executemany(
+                "INSERT OR IGNORE INTO live VALUES (?)",
+                ((digests[i : i + _DIGEST_SIZE],) for i in range(0, len(digests), _DIGEST_SIZE)),
+            )
+        store.execute("DELETE FROM pages WHERE digest NOT IN (SELECT digest FROM live)")
+        store.execute("DROP TABLE live")
+    store.execute("PRAGMA incremental_vacuum")
+
+
+def incremental_backups(db_path) -> list[tuple[str, int, int]]:
+    """``(stamp, new pages, new bytes)`` of each incremental backup, oldest first."""
+    path = _page_store_path(Path(db_path))
+    if not path.exists():
+        return []
+    store = sqlite3.connect(str(path))
+    try:
+        query = "SELECT taken_at, new_pages, new_bytes FROM backups ORDER BY taken_at"
+        return store.execute(query).fetchall()
+    finally:
+        store.close()
+
+
+def restore_incremental(stamp: str, db_path) -> Path | None:
+    """``restore_database`` from the newest incremental backup whose stamp starts *stamp*.
+
+    A stamp is ``YYYYmmddTHHMMSS_ffffffZ`` in UTC, so ``20260301T14`` picks
+    the last backup taken in that hour.  Raises ``LookupError`` if none does.
+    """
+    db_path = Path(db_path)
+    path = _page_store_path(db_path)
+    if not path.exists():
+        raise LookupError(f"No incremental backups of {db_path.name}")
+    # Read-only: looking a stamp up must not create or change the store.
+    store = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        row = store.execute(
+            "SELECT taken_at FROM backups WHERE substr(taken_at, 1, ?) = ?"
+            " ORDER BY taken_at DESC LIMIT 1",
+            (len(stamp), stamp),
+        ).fetchone()
+        if row is None:
+            raise LookupError(f"No incremental backup matches {stamp!r}")
+
+        def unpack(out):
+            page_size, digests = store.execute(
+                "SELECT page_size, digests FROM backups WHERE taken_at = ?", row
+            ).fetchone()
+            for i in range(0, len(digests), _DIGEST_SIZE):
+                (data,) = store.execute(
+                    "SELECT data FROM pages WHERE digest = ?", (digests[i : i + _DIGEST_SIZE],)
+                ).fetchone()
+                out.write(zlib.decompress(data))
+
+        return _restore(db_path, unpack, f"incremental backup {row[0]}")
+    finally:
+        store.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m puffin.backup")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("incremental", help="store the pages changed since the last one")
+    commands.add_parser("list", help="list the incremental backups")
+    restore = commands.add_parser("restore", help="replace the database with a snapshot")
+    restore.add_argument(
+        "snapshot", help="a snapshot file, or the stamp (or its start) of an incremental backup"
+    )
+    restore_replica = commands.add_parser(
+        "restore-replica", help="replace the database with its WAL replica"
+    )
+    restore_replica.add_argument(
+        "--at",
+        type=datetime.fromisoformat,
+        help="the time to restore to, e.g. 2026-03-01T14:05:00 (UTC unless an offset is given)",
+    )
+    restore_replica.add_argument(
+        "--from",
+        dest="directory",
+        default=os.environ.get("PUFFIN_REPLICA_DIR"),
+        help="the replica directory (default: PUFFIN_REPLICA_DIR)",
+    )
+    args = parser.parse_args(argv)
+
     # Imported lazily so this module has no import-time dependency on database
     # (which imports this one).
     from puffin.database import DB_PATH
 
+    # Run from cron, with no server to set up logging: show the progress.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "list":
+        for stamp, new_pages, new_bytes in incremental_backups(DB_PATH):
+            print(f"{stamp}  {new_pages:8d} new pages  {new_bytes:12d} bytes")
+        return
+    if args.command == "incremental":
+        stamp = incremental_backup(DB_PATH)
+        print("Nothing backed up (see above)." if stamp is None else f"Backed up as {stamp}")
+        return
+    if args.command == "restore-replica":
+        # Imported lazily: replica imports this module.
+        from puffin.replica import restore_replica
+
+        if args.directory is None:
+            parser.exit(2, "No replica directory: pass --from or set PUFFIN_REPLICA_DIR\n")
+        at = args.at
+        if at is not None and at.tzinfo is None:
+            at = at.replace(tzinfo=UTC)
+        try:
+            previous = restore_replica(args.directory, DB_PATH, at)
+        except Exception as exc:  # as for restore, below
+            parser.exit(1, f"Restore failed, database unchanged: {exc}\n")
+        print(f"Restored {DB_PATH} from the replica in {args.directory}")
+        if previous is not None:
+            print(f"The database it replaced is in {previous}")
+        return
+    if args.command == "restore":
+        try:
+            if Path(args.snapshot).exists():
+                previous = restore_database(args.snapshot, DB_PATH)
+            else:
+                previous = restore_incremental(args.snapshot, DB_PATH)
+        except Exception as exc:  # a bad or truncated file fails in many ways; all mean "no"
+            parser.exit(1, f"Restore failed, database unchanged: {exc}\n")
+        print(f"Restored {DB_PATH} from {args.snapshot}")
+        if previous is not None:
+            print(f"The database it replaced is in {previous}")
+        return
+
     dest = backup_database(DB_PATH, reason="manual")
     if dest is None:
         print("No database to back up yet.")
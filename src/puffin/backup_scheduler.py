@@ -0,0 +1,156 @@
+"""Scheduled backups, taken by a thread of the app itself.
+
+With ``PUFFIN_BACKUP_INTERVAL_MINUTES`` set, a background thread runs a
+backup that often -- a snapshot (``backup.backup_database``), or with
+``PUFFIN_BACKUP_MODE=incremental`` an incremental one -- instead of cron
+starting a fresh interpreter for ``python -m puffin.backup`` each time.
+
+A run is skipped when the data version (see ``models.create_version_triggers``)
+is what it was at the last backup: nothing has been logged, edited or
+deleted since.  It is put off while an export job is rendering, so the two
+do not compete for the disk, and runs never overlap: one asked for while
+another is under way does not start.  ``GET /api/backups/status`` reports
+the last run -- when, how long, and how it went.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from puffin import backup, export_jobs
+from puffin.models import read_data_version
+from puffin.schemas import BackupRun
+
+logger = logging.getLogger("uvicorn.error")
+
+MODES = ("snapshot", "incremental")
+
+# How long a run waits for a running export to finish before trying again.
+EXPORT_RETRY = 60.0
+
+
+class BackupScheduler:
+    """A thread that backs the database up every *interval* seconds."""
+
+    def __init__(self, url: str, interval: float, mode: str = "snapshot"):
+        self.interval = interval
+        self.mode = mode
+        self.engine = create_engine(url)
+        self.db_path = Path(self.engine.url.database)
+        self.last_run: BackupRun | None = None
+        self._backed_up_version: int | None = None
+        self._running = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="puffin-backup", daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    def close(self) -> None:
+        """Stop the thread, letting a backup under way finish first."""
+        self._stop.set()
+        self._thread.join()
+        self.engine.dispose()
+
+    def _run(self) -> None:
+        delay = self.interval
+        while not self._stop.wait(delay):
+            if export_jobs.running():
+                delay = min(EXPORT_RETRY, self.interval)
+                continue
+            self.run_now()
+            delay = self.interval
+
+    def run_now(self) -> BackupRun | None:
+        """Back up now unless nothing has changed; ``None`` if a run is under way."""
+        if not self._running.acquire(blocking=False):
+            return None
+        try:
+            started_at = datetime.now(UTC)
+            start = time.perf_counter()
+            outcome, detail = self._backup()
+            self.last_run = BackupRun(
+                started_at=started_at,
+                duration_seconds=round(time.perf_counter() - start, 3),
+                outcome=outcome,
+                detail=detail,
+            )
+            return self.last_run
+        finally:
+            self._running.release()
+
+    def _backup(self) -> tuple[str, str]:
+        try:
+            with self.engine.connect() as conn:
+                version = read_data_version(conn)
+        except SQLAlchemyError as exc:
+            logger.exception("Scheduled backup could not read the data version")
+            return "failed", str(exc)
+        if version == self._backed_up_version:
+            return "skipped", "no changes since the last backup"
+        if self.mode == "incremental":
+            result = backup.incremental_backup(self.db_path)
+        else:
+            path = backup.backup_database(self.db_path, reason="scheduled")
+            result = path.name if path is not None else None
+        if result is None:
+            # backup_database and incremental_backup have logged why.
+            return "failed", "see the server log"
+        self._backed_up_version = version
+        return "done", result
+
+
+_scheduler: BackupScheduler | None = None
+
+
+def settings_from_env() -> tuple[float | None, str]:
+    """The interval in seconds, or ``None`` when scheduling is off, and the mode."""
+    mode = os.environ.get("PUFFIN_BACKUP_MODE", "snapshot").strip().lower()
+    if mode not in MODES:
+        logger.warning("Ignoring PUFFIN_BACKUP_MODE=%r: use snapshot or incremental", mode)
+        mode = "snapshot"
+    raw = os.environ.get("PUFFIN_BACKUP_INTERVAL_MINUTES")
+    if not raw:
+        return None, mode
+    try:
+        minutes = float(raw)
+    except ValueError:
+        logger.warning("Ignoring PUFFIN_BACKUP_INTERVAL_MINUTES=%r: not a number", raw)
+        return None, mode
+    return (minutes * 60 if minutes > 0 else None), mode
+
+
+def start(url: str, interval: float | None, mode: str = "snapshot") -> None:
+    """Start the scheduler, unless *interval* is ``None``.  Called at app startup."""
+    global _scheduler
+    if interval is not None and _scheduler is None:
+        _scheduler = BackupScheduler(url, interval, mode)
+
+
+def stop() -> None:
+    """Stop the scheduler, if running.  Called at app shutdown."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.close()
+        _scheduler = None
+
+
+def status() -> dict:
+    """The scheduler's state for the status endpoint."""
+    if _scheduler is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "mode": _scheduler.mode,
+        "interval_minutes": _scheduler.interval / 60,
+        "running": _scheduler.running,
+        "last_run": _scheduler.last_run,
+    }
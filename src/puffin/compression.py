@@ -0,0 +1,182 @@
+"""Response compression for the API.
+
+Timeline JSON and the CSV/JSON exports are repetitive text -- labels, enum
+values, ISO timestamps -- that shrink 10x or more, which matters when the app
+is checked over a phone's mobile data.  ``CompressionMiddleware`` negotiates
+``zstd`` or ``gzip`` from ``Accept-Encoding`` for ``/api/`` responses and
+compresses as the body is sent: a ``StreamingResponse`` export is compressed
+chunk by chunk, each flushed to the client as it is produced, never
+buffered whole.
+
+zstd is used when the optional ``zstandard`` package is installed
+(``puffin[zstd]``) and the client accepts it; it compresses better than gzip
+at a fraction of the CPU.  Otherwise gzip, from the standard library.
+"""
+
+import zlib
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to gzip alone
+    zstandard = None
+
+# Complete bodies smaller than this go out as they are: below about 1 KiB the
+# framing and the extra header cost about what compression would save.
+MINIMUM_SIZE = 1024
+
+# Compress bodies at least this large in a worker thread, off the event loop.
+_THREAD_MINIMUM_SIZE = 256 * 1024
+
+# zlib's default level.  Level 1 was twice as fast but a fifth larger on the
+# exports, which are generated far slower than either compresses.
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+# Already compressed: PDFs (fpdf2 deflates its page streams), the Parquet and
+# Arrow zips, and the gzipped database snapshot.
+_SKIP_MEDIA_TYPES = frozenset({"application/pdf", "application/zip", "application/gzip"})
+
+
+def _accepted(accept_encoding: str) -> dict[str, float]:
+    """The codings in an ``Accept-Encoding`` header, with their q-values."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """The coding to use for a client sending *accept_encoding*, if any."""
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    offered = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    best = max(offered, key=lambda c: accepted.get(c, wildcard))
+    return best if accepted.get(best, wildcard) > 0 else None
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if final:
+            return self._compressor.compress(data) + self._compressor.flush()
+        # A sync flush hands the client everything so far: a streamed export
+        # arrives as it is produced, not when zlib's window happens to fill.
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if final:
+            return self._compressor.compress(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+
+_CODERS = {"gzip": _Gzip, "zstd": _Zstd}
+
+
+class CompressionMiddleware:
+    """Compress ``/api/`` responses with the best coding the client accepts.
+
+    Left alone: small complete bodies, already-compressed media types,
+    responses that already carry a ``Content-Encoding``, and anything
+    advertising byte ranges -- a resumed ``FileResponse`` download must match
+    the bytes of the first attempt, so those are always sent as stored.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingSender(coding, send).run(self.app, scope, receive)
+
+
+class _CompressingSender:
+    """Wraps one response's ``send``, deciding on its first body message."""
+
+    def __init__(self, coding: str, send: Send):
+        self.coding = coding
+        self.send = send
+        self.start: Message | None = None
+        self.coder = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.send_message)
+
+    async def send_message(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body shows whether to compress.
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = (
+                message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or "accept-ranges" in headers
+                or media_type in _SKIP_MEDIA_TYPES
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+        if self.start is not None and message["type"] != "http.response.body":
+            # Anything but a body (e.g. ``pathsend``) goes out untouched.
+            self.passthrough = True
+            await self.send(self.start)
+            self.start = None
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start, self.start = self.start, None
+        if start is not None:
+            if not more_body and len(body) < MINIMUM_SIZE:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.coder = _CODERS[self.coding]()
+        body = await self._compress(body, final=not more_body)
+        if start is not None:
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= _THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self.coder.compress, body, final)
+        return self.coder.compress(body, final)
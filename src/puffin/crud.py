@@ -1,18 +1,36 @@
+import html
 import logging
 import os
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime, timedelta
 from datetime import date as date_type
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from sqlalchemy import String, cast, func, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    Row,
+    String,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from puffin.models import (
+    SEARCH_KINDS,
     Child,
     DiaperChange,
     Feeding,
     Medication,
+    RowChange,
     SavedMedication,
     TemperatureReading,
 )
@@ -122,6 +140,177 @@ def _period_count(db: Session, model, timestamp_col, period: str, child: ChildFi
     return db.execute(stmt).scalar() or 0
 
 
+# --- Read-only rows ---
+#
+# List endpoints, the timeline and the exports turn what they read into dicts
+# or response models straight away, so they select table columns through Core
+# and get plain ``Row`` tuples back instead of ORM instances.  A row has the
+# same attribute access (``row.timestamp``) and column types, but skips the
+# session's identity map and per-instance state, which is most of the cost of
+# loading a long history.  Writes, and single-row reads that precede them,
+# stay on the ORM.
+
+
+# Rows an export fetches from SQLite per round trip while streaming.
+_STREAM_BATCH = 1000
+
+
+def _log_select(model, start_date: datetime | None, end_date: datetime | None, child: ChildFilter):
+    """Newest-first select of *model*'s table within ``[start_date, end_date)``."""
+    table = model.__table__
+    stmt = select(table).order_by(table.c.timestamp.desc())
+    if start_date:
+        stmt = stmt.where(table.c.timestamp >= start_date)
+    if end_date:
+        stmt = stmt.where(table.c.timestamp < end_date)
+    return _child_where(stmt, table.c.child_id, child)
+
+
+def _log_rows(
+    db: Session,
+    model,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    limit: int | None,
+    offset: int,
+    child: ChildFilter,
+) -> list[Row]:
+    """Newest-first rows of *model*'s table within ``[start_date, end_date)``."""
+    stmt = _log_select(model, start_date, end_date, child).offset(offset).limit(limit)
+    return list(db.execute(stmt).all())
+
+
+def iter_log_rows(
+    db: Session,
+    model,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    child: ChildFilter = None,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[Row]:
+    """Every row ``_log_rows`` would return, fetched in batches as consumed.
+
+    For exports: the cursor stays open between batches, so memory holds one
+    batch however much history there is, and the first row is available as
+    soon as SQLite produces it rather than after the last.  *progress*, if
+    given, is called with each batch's size once its rows are consumed.
+    """
+    stmt = _log_select(model, start_date, end_date, child).execution_options(
+        stream_results=True, yield_per=_STREAM_BATCH
+    )
+    for batch in db.execute(stmt).partitions():
+        yield from batch
+        if progress:
+            progress(len(batch))
+
+
+def count_log_rows(
+    db: Session,
+    model,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    child: ChildFilter = None,
+) -> int:
+    """How many rows ``iter_log_rows`` will yield for the same arguments."""
+    rows = _log_select(model, start_date, end_date, child).order_by(None).subquery()
+    return db.execute(select(func.count()).select_from(rows)).scalar_one()
+
+
+def iter_changed_rows(db: Session, model, since: int, until: int) -> Iterator[Row]:
+    """*model*'s rows last written in data versions ``(since, until]``, oldest first.
+
+    Each row carries its ``updated_at`` from the change log after the
+    table's own columns.  Streamed in batches like ``iter_log_rows``.
+    """
+    table = model.__table__
+    stmt = (
+        select(table, RowChange.updated_at)
+        .join(
+            RowChange,
+            and_(RowChange.table_name == table.name, RowChange.row_id == table.c.id),
+        )
+        .where(RowChange.seq > since, RowChange.seq <= until, RowChange.deleted.is_(False))
+        .order_by(RowChange.seq)
+        .execution_options(stream_results=True, yield_per=_STREAM_BATCH)
+    )
+    for batch in db.execute(stmt).partitions():
+        yield from batch
+
+
+def iter_deleted_rows(db: Session, since: int, until: int) -> Iterator[Row]:
+    """``(table_name, row_id, updated_at)`` of rows deleted in ``(since, until]``."""
+    stmt = (
+        select(RowChange.table_name, RowChange.row_id, RowChange.updated_at)
+        .where(RowChange.seq > since, RowChange.seq <= until, RowChange.deleted.is_(True))
+        .order_by(RowChange.seq)
+        .execution_options(stream_results=True, yield_per=_STREAM_BATCH)
+    )
+    for batch in db.execute(stmt).partitions():
+        yield from batch
+
+
+def insert_logs(db: Session, rows: dict[type, list[dict]]) -> None:
+    """Insert many logs at once: one ``executemany`` per table, one commit.
+
+    For bulk import, where an ORM object, flush and refresh per row would be
+    most of the cost.  Every dict for a model must have the same keys.
+    Medication names are added to the saved names, as for a single log.
+    """
+    for model, values in rows.items():
+        db.execute(insert(model.__table__), values)
+    names = dict.fromkeys(v["medication_name"] for v in rows.get(Medication, ()))
+    if names:
+        now = datetime.now(UTC)
+        db.execute(
+            sqlite_insert(SavedMedication).on_conflict_do_nothing(),
+            [{"name": name, "created_at": now} for name in names],
+        )
+    db.commit()
+
+
+# --- Single-row writes ---
+#
+# A create, update or delete is one statement.  The INSERT or UPDATE hands
+# back the row as stored -- defaults and all -- with RETURNING, so nothing is
+# read back after the commit, and an UPDATE or DELETE of a missing id simply
+# matches no row instead of being looked up first.  The rows are returned
+# as plain ``Row``s, like the list queries, so the commit has nothing to
+# expire.  SQLite before 3.35 has no RETURNING; there the row is read back
+# with a SELECT in the same transaction.
+
+
+def _insert_row(db: Session, model, values: dict) -> Row:
+    table = model.__table__
+    stmt = insert(table).values(values)
+    if db.get_bind().dialect.insert_returning:
+        return db.execute(stmt.returning(*table.c)).one()
+    row_id = db.execute(stmt).inserted_primary_key[0]
+    return db.execute(select(table).where(table.c.id == row_id)).one()
+
+
+def _update_row(db: Session, model, row_id: int, values: dict) -> Row | None:
+    table = model.__table__
+    stmt = update(table).where(table.c.id == row_id).values(values)
+    if values and db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(*table.c)).one_or_none()
+    if values:
+        db.execute(stmt)
+    return db.execute(select(table).where(table.c.id == row_id)).one_or_none()
+
+
+def _delete_row(db: Session, model, row_id: int) -> bool:
+    table = model.__table__
+    stmt = delete(table).where(table.c.id == row_id)
+    if db.get_bind().dialect.delete_returning:
+        return db.execute(stmt.returning(table.c.id)).first() is not None
+    return db.execute(stmt).rowcount == 1
+
+
+def _supplied(kwargs: dict, keep_none=_NULLABLE_UPDATE_KEYS) -> dict:
+    """The update kwargs to write: the non-blank ones, and any in *keep_none*."""
+    return {k: v for k, v in kwargs.items() if v is not None or k in keep_none}
+
+
 # --- Diaper Changes ---
 
 
@@ -131,14 +320,19 @@ def create_diaper(
     type_: str,
     notes: str | None,
     child_id: int | None = None,
-) -> DiaperChange:
-    obj = DiaperChange(
-        timestamp=timestamp or datetime.now(UTC), type=type_, notes=notes, child_id=child_id
+) -> Row:
+    row = _insert_row(
+        db,
+        DiaperChange,
+        {
+            "timestamp": timestamp or datetime.now(UTC),
+            "type": type_,
+            "notes": notes,
+            "child_id": child_id,
+        },
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def get_diapers(
@@ -148,40 +342,24 @@ def get_diapers(
     limit: int | None = 50,
     offset: int = 0,
     child: ChildFilter = None,
-) -> list[DiaperChange]:
-    stmt = select(DiaperChange).order_by(DiaperChange.timestamp.desc())
-    if start_date:
-        stmt = stmt.where(DiaperChange.timestamp >= start_date)
-    if end_date:
-        stmt = stmt.where(DiaperChange.timestamp < end_date)
-    stmt = _child_where(stmt, DiaperChange.child_id, child)
-    stmt = stmt.offset(offset).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+) -> list[Row]:
+    return _log_rows(db, DiaperChange, start_date, end_date, limit, offset, child)
 
 
 def get_diaper(db: Session, diaper_id: int) -> DiaperChange | None:
     return db.get(DiaperChange, diaper_id)
 
 
-def update_diaper(db: Session, diaper_id: int, **kwargs) -> DiaperChange | None:
-    obj = db.get(DiaperChange, diaper_id)
-    if not obj:
-        return None
-    for k, v in kwargs.items():
-        if v is not None or k in _NULLABLE_UPDATE_KEYS:
-            setattr(obj, k, v)
+def update_diaper(db: Session, diaper_id: int, **kwargs) -> Row | None:
+    row = _update_row(db, DiaperChange, diaper_id, _supplied(kwargs))
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def delete_diaper(db: Session, diaper_id: int) -> bool:
-    obj = db.get(DiaperChange, diaper_id)
-    if not obj:
-        return False
-    db.delete(obj)
+    deleted = _delete_row(db, DiaperChange, diaper_id)
     db.commit()
-    return True
+    return deleted
 
 
 def diaper_stats(db: Session, child: ChildFilter = None) -> dict[str, int]:
@@ -214,25 +392,27 @@ def create_feeding(
     session_id: str | None = None,
     bottle_type: str | None = None,
     child_id: int | None = None,
-) -> Feeding:
+) -> Row:
     if feeding_type != "bottle":
         amount = None
         amount_unit = None
-    obj = Feeding(
-        timestamp=timestamp or datetime.now(UTC),
-        feeding_type=feeding_type,
-        duration_minutes=duration_minutes,
-        amount=amount,
-        amount_unit=amount_unit,
-        notes=notes,
-        session_id=session_id,
-        bottle_type=bottle_type,
-        child_id=child_id,
+    row = _insert_row(
+        db,
+        Feeding,
+        {
+            "timestamp": timestamp or datetime.now(UTC),
+            "feeding_type": feeding_type,
+            "duration_minutes": duration_minutes,
+            "amount": amount,
+            "amount_unit": amount_unit,
+            "notes": notes,
+            "session_id": session_id,
+            "bottle_type": bottle_type,
+            "child_id": child_id,
+        },
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def get_feedings(
@@ -242,26 +422,16 @@ def get_feedings(
     limit: int | None = 50,
     offset: int = 0,
     child: ChildFilter = None,
-) -> list[Feeding]:
-    stmt = select(Feeding).order_by(Feeding.timestamp.desc())
-    if start_date:
-        stmt = stmt.where(Feeding.timestamp >= start_date)
-    if end_date:
-        stmt = stmt.where(Feeding.timestamp < end_date)
-    stmt = _child_where(stmt, Feeding.child_id, child)
-    stmt = stmt.offset(offset).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+) -> list[Row]:
+    return _log_rows(db, Feeding, start_date, end_date, limit, offset, child)
 
 
 def get_feeding(db: Session, feeding_id: int) -> Feeding | None:
     return db.get(Feeding, feeding_id)
 
 
-def update_feeding(db: Session, feeding_id: int, **kwargs) -> Feeding | None:
-    obj = db.get(Feeding, feeding_id)
-    if not obj:
-        return None
-    target_type = kwargs.get("feeding_type", obj.feeding_type)
+def update_feeding(db: Session, feeding_id: int, **kwargs) -> Row | None:
+    target_type = kwargs.get("feeding_type")
     if target_type in {"breast_left", "breast_right"}:
         kwargs["amount"] = None
         kwargs["amount_unit"] = None
@@ -272,21 +442,28 @@ def update_feeding(db: Session, feeding_id: int, **kwargs) -> Feeding | None:
         # exports print the column verbatim and show a phantom duration.  The
         # router only forwards non-None values, so the frontend cannot clear it.
         kwargs["duration_minutes"] = None
-    for k, v in kwargs.items():
-        if v is not None or k in _CLEARED_ON_CONVERT | _NULLABLE_UPDATE_KEYS:
-            setattr(obj, k, v)
+    values = _supplied(kwargs, _CLEARED_ON_CONVERT | _NULLABLE_UPDATE_KEYS)
+    if target_type is None:
+        # The type is unchanged, and which fields it clears depends on the
+        # stored one: the UPDATE decides, row by row.
+        columns = Feeding.__table__.c
+        is_bottle = columns.feeding_type == "bottle"
+
+        def supplied(key):
+            return literal(values[key], columns[key].type) if key in values else columns[key]
+
+        values["amount"] = case((is_bottle, supplied("amount")), else_=null())
+        values["amount_unit"] = case((is_bottle, supplied("amount_unit")), else_=null())
+        values["duration_minutes"] = case((is_bottle, null()), else_=supplied("duration_minutes"))
+    row = _update_row(db, Feeding, feeding_id, values)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def delete_feeding(db: Session, feeding_id: int) -> bool:
-    obj = db.get(Feeding, feeding_id)
-    if not obj:
-        return False
-    db.delete(obj)
+    deleted = _delete_row(db, Feeding, feeding_id)
     db.commit()
-    return True
+    return deleted
 
 
 def _feeding_session_count(db: Session, start: datetime, child: ChildFilter = None) -> int:
@@ -349,19 +526,21 @@ def create_medication(
     dosage_unit: str,
     notes: str | None,
     child_id: int | None = None,
-) -> Medication:
-    obj = Medication(
-        timestamp=timestamp or datetime.now(UTC),
-        medication_name=medication_name,
-        dosage_quantity=dosage_quantity,
-        dosage_unit=dosage_unit,
-        notes=notes,
-        child_id=child_id,
+) -> Row:
+    row = _insert_row(
+        db,
+        Medication,
+        {
+            "timestamp": timestamp or datetime.now(UTC),
+            "medication_name": medication_name,
+            "dosage_quantity": dosage_quantity,
+            "dosage_unit": dosage_unit,
+            "notes": notes,
+            "child_id": child_id,
+        },
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def get_medications(
@@ -371,40 +550,24 @@ def get_medications(
     limit: int | None = 50,
     offset: int = 0,
     child: ChildFilter = None,
-) -> list[Medication]:
-    stmt = select(Medication).order_by(Medication.timestamp.desc())
-    if start_date:
-        stmt = stmt.where(Medication.timestamp >= start_date)
-    if end_date:
-        stmt = stmt.where(Medication.timestamp < end_date)
-    stmt = _child_where(stmt, Medication.child_id, child)
-    stmt = stmt.offset(offset).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+) -> list[Row]:
+    return _log_rows(db, Medication, start_date, end_date, limit, offset, child)
 
 
 def get_medication(db: Session, medication_id: int) -> Medication | None:
     return db.get(Medication, medication_id)
 
 
-def update_medication(db: Session, medication_id: int, **kwargs) -> Medication | None:
-    obj = db.get(Medication, medication_id)
-    if not obj:
-        return None
-    for k, v in kwargs.items():
-        if v is not None or k in _NULLABLE_UPDATE_KEYS:
-            setattr(obj, k, v)
+def update_medication(db: Session, medication_id: int, **kwargs) -> Row | None:
+    row = _update_row(db, Medication, medication_id, _supplied(kwargs))
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def delete_medication(db: Session, medication_id: int) -> bool:
-    obj = db.get(Medication, medication_id)
-    if not obj:
-        return False
-    db.delete(obj)
+    deleted = _delete_row(db, Medication, medication_id)
     db.commit()
-    return True
+    return deleted
 
 
 def medication_stats(db: Session, child: ChildFilter = None) -> dict[str, int]:
@@ -417,39 +580,51 @@ def medication_stats(db: Session, child: ChildFilter = None) -> dict[str, int]:
 
 def get_saved_medications(db: Session) -> list[str]:
     """Return saved medication names sorted case-insensitively A→Z."""
-    stmt = select(SavedMedication.name).order_by(func.lower(SavedMedication.name))
+    stmt = select(SavedMedication.name).order_by(SavedMedication.name.collate("NOCASE"))
     return list(db.execute(stmt).scalars().all())
 
 
-def _saved_medication_exists(db: Session, name: str) -> bool:
-    """Whether *name* is already saved, ignoring case.
+def search_saved_medications(db: Session, prefix: str, limit: int = 10) -> list[str]:
+    """Saved names starting with *prefix* (ignoring case), most useful first.
 
-    Split out from ``add_saved_medication`` so a lost check-then-insert race
-    can be reproduced deterministically in tests.
+    Backs the medication autocomplete, which used to download every saved
+    name and filter in the browser.  An exact match always leads, so the
+    client can tell whether to offer "+ Add"; the rest rank by how often the
+    name has been logged, then how recently, then alphabetically.  The prefix
+    is a NOCASE range on the indexed name rather than a ``LIKE``, so it seeks
+    the unique index and needs no wildcard escaping.
     """
-    stmt = select(SavedMedication).where(func.lower(SavedMedication.name) == name.lower())
-    return db.execute(stmt).scalar_one_or_none() is not None
+    name = SavedMedication.name.collate("NOCASE")
+    logged = Medication.medication_name.collate("NOCASE") == SavedMedication.name
+    uses = select(func.count()).where(logged).scalar_subquery()
+    last_used = select(func.max(Medication.timestamp)).where(logged).scalar_subquery()
+    stmt = (
+        select(SavedMedication.name)
+        .order_by((name == prefix).desc(), uses.desc(), last_used.desc(), name)
+        .limit(limit)
+    )
+    if prefix:
+        stmt = stmt.where(name >= prefix, name < prefix + "\U0010ffff")
+    return list(db.execute(stmt).scalars().all())
 
 
 def add_saved_medication(db: Session, name: str) -> bool:
     """Add name to saved list if no case-insensitive match exists. Returns True if added.
 
-    The existence check and the insert are not atomic and ``name`` is unique,
-    so two parents saving the same new medication at once can both pass the
-    check.  Losing that race is not a real failure -- the name is on the list
-    either way -- but the uncaught IntegrityError became a 500 *after* the
-    medication log itself had already been committed, so the user saw an error
-    for a save that had partly succeeded.
+    A single ``INSERT ... ON CONFLICT DO NOTHING`` against the NOCASE unique
+    index, so there is no check-then-insert window: two parents saving the
+    same new medication at once both succeed, and the name is stored once.
+    This runs *after* the medication log has been committed, so it must never
+    turn a duplicate into an error.
     """
-    if _saved_medication_exists(db, name):
-        return False
-    db.add(SavedMedication(name=name))
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        return False
-    return True
+    stmt = (
+        sqlite_insert(SavedMedication)
+        .values(name=name, created_at=datetime.now(UTC))
+        .on_conflict_do_nothing()
+    )
+    added = db.execute(stmt).rowcount == 1
+    db.commit()
+    return added
 
 
 # --- Temperature Readings ---
@@ -473,19 +648,21 @@ def create_temperature(
     notes: str | None,
     unit: str = "F",
     child_id: int | None = None,
-) -> TemperatureReading:
-    obj = TemperatureReading(
-        timestamp=timestamp or datetime.now(UTC),
-        temperature=temperature,
-        unit=unit,
-        location=location,
-        notes=notes,
-        child_id=child_id,
+) -> Row:
+    row = _insert_row(
+        db,
+        TemperatureReading,
+        {
+            "timestamp": timestamp or datetime.now(UTC),
+            "temperature": temperature,
+            "unit": unit,
+            "location": location,
+            "notes": notes,
+            "child_id": child_id,
+        },
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def get_temperatures(
@@ -495,40 +672,24 @@ def get_temperatures(
     limit: int | None = 50,
     offset: int = 0,
     child: ChildFilter = None,
-) -> list[TemperatureReading]:
-    stmt = select(TemperatureReading).order_by(TemperatureReading.timestamp.desc())
-    if start_date:
-        stmt = stmt.where(TemperatureReading.timestamp >= start_date)
-    if end_date:
-        stmt = stmt.where(TemperatureReading.timestamp < end_date)
-    stmt = _child_where(stmt, TemperatureReading.child_id, child)
-    stmt = stmt.offset(offset).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+) -> list[Row]:
+    return _log_rows(db, TemperatureReading, start_date, end_date, limit, offset, child)
 
 
 def get_temperature(db: Session, temp_id: int) -> TemperatureReading | None:
     return db.get(TemperatureReading, temp_id)
 
 
-def update_temperature(db: Session, temp_id: int, **kwargs) -> TemperatureReading | None:
-    obj = db.get(TemperatureReading, temp_id)
-    if not obj:
-        return None
-    for k, v in kwargs.items():
-        if v is not None or k in _NULLABLE_UPDATE_KEYS:
-            setattr(obj, k, v)
+def update_temperature(db: Session, temp_id: int, **kwargs) -> Row | None:
+    row = _update_row(db, TemperatureReading, temp_id, _supplied(kwargs))
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def delete_temperature(db: Session, temp_id: int) -> bool:
-    obj = db.get(TemperatureReading, temp_id)
-    if not obj:
-        return False
-    db.delete(obj)
+    deleted = _delete_row(db, TemperatureReading, temp_id)
     db.commit()
-    return True
+    return deleted
 
 
 # --- Children ---
@@ -536,12 +697,10 @@ def delete_temperature(db: Session, temp_id: int) -> bool:
 _LOG_MODELS = (DiaperChange, Feeding, Medication, TemperatureReading)
 
 
-def create_child(db: Session, name: str) -> Child:
-    obj = Child(name=name)
-    db.add(obj)
+def create_child(db: Session, name: str) -> Row:
+    row = _insert_row(db, Child, {"name": name})
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def get_children(db: Session) -> list[Child]:
@@ -558,14 +717,10 @@ def get_child(db: Session, child_id: int) -> Child | None:
     return db.get(Child, child_id)
 
 
-def update_child(db: Session, child_id: int, name: str) -> Child | None:
-    obj = db.get(Child, child_id)
-    if not obj:
-        return None
-    obj.name = name
+def update_child(db: Session, child_id: int, name: str) -> Row | None:
+    row = _update_row(db, Child, child_id, {"name": name})
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 def delete_child(db: Session, child_id: int) -> bool:
@@ -575,25 +730,24 @@ def delete_child(db: Session, child_id: int) -> bool:
     association, and resurface under the unassigned view where they can be
     re-assigned individually or in bulk.
     """
-    obj = db.get(Child, child_id)
-    if not obj:
+    if not _delete_row(db, Child, child_id):
+        db.rollback()
         return False
     for model in _LOG_MODELS:
         db.query(model).filter(model.child_id == child_id).update(
             {"child_id": None}, synchronize_session=False
         )
-    db.delete(obj)
     db.commit()
     return True
 
 
 def count_unassigned_logs(db: Session) -> int:
     """Total logs across all types belonging to no profile."""
-    total = 0
-    for model in _LOG_MODELS:
-        stmt = select(func.count()).select_from(model).where(model.child_id.is_(None))
-        total += db.execute(stmt).scalar() or 0
-    return total
+    counts = [
+        select(func.count()).select_from(model).where(model.child_id.is_(None)).scalar_subquery()
+        for model in _LOG_MODELS
+    ]
+    return sum(db.execute(select(*counts)).one())
 
 
 def assign_unassigned_logs(db: Session, child_id: int) -> int:
@@ -613,6 +767,78 @@ def assign_unassigned_logs(db: Session, child_id: int) -> int:
     return assigned
 
 
+# --- Bulk edit and delete ---
+
+# The log tables by the name the API gives each kind.
+LOG_KINDS = dict(zip(SEARCH_KINDS, _LOG_MODELS, strict=True))
+
+
+def _bulk_where(
+    stmt,
+    model,
+    ids: list[int] | None,
+    child: ChildFilter,
+    start_date: datetime | None,
+    end_date: datetime | None,
+):
+    """Narrow a bulk UPDATE or DELETE of *model*'s table to the logs selected."""
+    table = model.__table__
+    if ids is not None:
+        stmt = stmt.where(table.c.id.in_(ids))
+    if start_date:
+        stmt = stmt.where(table.c.timestamp >= start_date)
+    if end_date:
+        stmt = stmt.where(table.c.timestamp < end_date)
+    return _child_where(stmt, table.c.child_id, child)
+
+
+def bulk_update_logs(
+    db: Session,
+    kinds: list[str],
+    values: dict,
+    ids: list[int] | None = None,
+    child: ChildFilter = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> dict[str, int]:
+    """Set *values* on every selected log of *kinds*, returning how many per kind.
+
+    One ``UPDATE`` per table and one commit, however many logs match.  The
+    selection is ANDed together: *ids* (of a single kind), *child* as in the
+    list queries, and timestamps within ``[start_date, end_date)``.
+    """
+    counts = {}
+    for kind in kinds:
+        table = LOG_KINDS[kind].__table__
+        stmt = _bulk_where(
+            update(table).values(values), LOG_KINDS[kind], ids, child, start_date, end_date
+        )
+        counts[kind] = db.execute(stmt).rowcount
+    db.commit()
+    return counts
+
+
+def bulk_delete_logs(
+    db: Session,
+    kinds: list[str],
+    ids: list[int] | None = None,
+    child: ChildFilter = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> dict[str, int]:
+    """Delete every selected log of *kinds*, returning how many per kind.
+
+    Selects as ``bulk_update_logs`` does; one ``DELETE`` per table, one commit.
+    """
+    counts = {}
+    for kind in kinds:
+        table = LOG_KINDS[kind].__table__
+        stmt = _bulk_where(delete(table), LOG_KINDS[kind], ids, child, start_date, end_date)
+        counts[kind] = db.execute(stmt).rowcount
+    db.commit()
+    return counts
+
+
 # --- Activities ---
 
 _DIAPER_LABELS = {"pee": "Pee", "poop": "Poop", "both": "Pee + Poop", "dry": "Dry"}
@@ -775,6 +1001,68 @@ def get_activities(
     return activities
 
 
+# --- Search ---
+
+# Snippet highlight markers: control characters no note can contain, swapped
+# for ``<mark>`` only after the snippet has been HTML-escaped.
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+
+def _fts_query(q: str) -> str:
+    """Turn free user input into a safe FTS5 query.
+
+    Each word becomes a quoted phrase, so FTS5 operators and punctuation in
+    the input are matched literally instead of raising a syntax error, and
+    the last word also matches as a prefix so results appear while typing.
+    All words must match.
+    """
+    words = ['"' + w.replace('"', '""') + '"' for w in q.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+def search_logs(
+    db: Session, q: str, limit: int = 20, offset: int = 0, child: ChildFilter = None
+) -> list[dict]:
+    """Logs whose notes or medication name match *q*, best match first.
+
+    Backed by the ``log_search`` FTS5 index (see ``models``), so the cost
+    follows the number of matches rather than the size of the history.
+    Medication names weigh double in the ranking; equal scores fall back to
+    newest first.  Snippets are HTML-escaped with matches wrapped in
+    ``<mark>``.
+    """
+    match = _fts_query(q)
+    if not match:
+        return []
+    sql = (
+        "SELECT rowid, timestamp, "
+        f"snippet(log_search, -1, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 12) "
+        "FROM log_search WHERE log_search MATCH :match"
+    )
+    params: dict = {"match": match, "limit": limit, "offset": offset}
+    if child == UNASSIGNED:
+        sql += " AND child_id IS NULL"
+    elif child is not None:
+        sql += " AND child_id = :child"
+        params["child"] = child
+    sql += " ORDER BY bm25(log_search, 2.0, 1.0), timestamp DESC LIMIT :limit OFFSET :offset"
+
+    results = []
+    for rowid, timestamp, snippet in db.execute(text(sql), params):
+        snippet = html.escape(snippet).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+        results.append(
+            {
+                "type": SEARCH_KINDS[rowid % 4],
+                "id": rowid // 4,
+                "timestamp": datetime.fromisoformat(timestamp).replace(tzinfo=UTC),
+                "snippet": snippet,
+            }
+        )
+    return results
+
+
 # --- Dashboard ---
 
 
@@ -795,8 +1083,7 @@ def get_dashboard(db: Session, date_str: str | None = None, child: ChildFilter =
     # Last entries — scoped to the same child as the counts, so "last fed 2h
     # ago" never reports another child's feeding.
     def _latest(model):
-        stmt = select(model).order_by(model.timestamp.desc()).limit(1)
-        return db.execute(_child_where(stmt, model.child_id, child)).scalar_one_or_none()
+        return next(iter(_log_rows(db, model, None, None, 1, 0, child)), None)
 
     last_diaper = _latest(DiaperChange)
     last_feeding = _latest(Feeding)
@@ -807,18 +1094,7 @@ def get_dashboard(db: Session, date_str: str | None = None, child: ChildFilter =
     # date is supplied.
     temp_day = date_str or now.astimezone(_get_local_tz()).strftime("%Y-%m-%d")
     t_start, t_end = _day_bounds(temp_day)
-    temp_stmt = (
-        select(TemperatureReading)
-        .where(
-            TemperatureReading.timestamp >= t_start,
-            TemperatureReading.timestamp < t_end,
-        )
-        .order_by(TemperatureReading.timestamp.desc())
-        .limit(1)
-    )
-    last_temp = db.execute(
-        _child_where(temp_stmt, TemperatureReading.child_id, child)
-    ).scalar_one_or_none()
+    last_temp = next(iter(_log_rows(db, TemperatureReading, t_start, t_end, 1, 0, child)), None)
 
     # Recent activities (last 3 days, excluding future)
     three_days_ago = now - timedelta(days=3)
@@ -833,3 +1109,121 @@ def get_dashboard(db: Session, date_str: str | None = None, child: ChildFilter =
         "last_temperature": last_temp,
         "recent_activities": activities,
     }
+
+
+# --- Dashboard across profiles ---
+#
+# The same summary as ``get_dashboard`` for every profile at once.  Each query
+# groups or correlates on ``child_id`` rather than filtering on it, so the
+# number of queries is fixed however many profiles there are.  Unassigned logs
+# are simply the ``child_id IS NULL`` group.
+
+
+def _windowed_counts(
+    db: Session,
+    model,
+    windows: dict[str, tuple[datetime, datetime | None]],
+    distinct=None,
+) -> dict[int | None, dict[str, int]]:
+    """Count rows of *model* per child within each named ``[start, end)`` window.
+
+    With *distinct*, counts distinct values of that expression instead -- the
+    feeding session key, so a two-sided feed counts once.  A window with no
+    end is open to the future, as the single-child stats are.
+    """
+    table = model.__table__
+    ts = table.c.timestamp
+    cols = []
+    for name, (start, end) in windows.items():
+        inside = ts >= start if end is None else and_(ts >= start, ts < end)
+        if distinct is None:
+            cols.append(func.count(case((inside, 1))).label(name))
+        else:
+            cols.append(func.count(func.distinct(case((inside, distinct)))).label(name))
+    # Grouping on ``child_id + 0`` rather than the bare column stops SQLite
+    # walking the whole ``(child_id, timestamp)`` index just to get groups in
+    # order; it seeks the timestamp index to the window instead, and sorts
+    # only the rows inside it.
+    owner = (table.c.child_id + 0).label("child_id")
+    earliest = min(start for start, _ in windows.values())
+    stmt = select(owner, *cols).where(ts >= earliest).group_by(owner)
+    return {
+        row.child_id: {name: row._mapping[name] for name in windows} for row in db.execute(stmt)
+    }
+
+
+def _latest_by_child(
+    db: Session, model, start: datetime | None = None, end: datetime | None = None
+) -> dict[int | None, Row]:
+    """Each child's most recent row of *model*, optionally within ``[start, end)``.
+
+    One correlated ``LIMIT 1`` per owner -- every profile plus unassigned --
+    each a seek on the ``(child_id, timestamp)`` index.  Ranking the whole
+    table with a window function instead sorts every row ever logged.
+    """
+    table = model.__table__
+    owners = select(Child.id.label("child_id")).union_all(select(null())).subquery()
+    newest = select(table.c.id).where(table.c.child_id.is_not_distinct_from(owners.c.child_id))
+    if start:
+        newest = newest.where(table.c.timestamp >= start)
+    if end:
+        newest = newest.where(table.c.timestamp < end)
+    newest = (
+        newest.order_by(table.c.timestamp.desc(), table.c.id.desc())
+        .limit(1)
+        .correlate(owners)
+        .scalar_subquery()
+    )
+    stmt = select(table).where(table.c.id.in_(select(newest).select_from(owners)))
+    return {row.child_id: row for row in db.execute(stmt)}
+
+
+def get_children_dashboard(db: Session, date_str: str | None = None) -> dict:
+    """Dashboard stats and last entries for every profile in one pass.
+
+    Mirrors ``get_dashboard`` per child, minus the recent-activity timeline.
+    The unassigned group is included only while unassigned logs exist.
+    """
+    local_tz = _get_local_tz()
+    now = datetime.now(local_tz)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today = _day_bounds(date_str) if date_str else (midnight.astimezone(UTC), None)
+    windows = {
+        "today": today,
+        "week": ((now - timedelta(days=7)).astimezone(UTC), None),
+        "month": ((now - timedelta(days=30)).astimezone(UTC), None),
+    }
+
+    session_key = func.coalesce(Feeding.session_id, cast(Feeding.id, String))
+    diaper_counts = _windowed_counts(db, DiaperChange, windows)
+    feeding_counts = _windowed_counts(db, Feeding, windows, distinct=session_key)
+    med_counts = _windowed_counts(db, Medication, {"today": today})
+
+    last_diapers = _latest_by_child(db, DiaperChange)
+    last_feedings = _latest_by_child(db, Feeding)
+    # Scoped to the viewed day, as in ``get_dashboard``.
+    t_start, t_end = _day_bounds(date_str or now.strftime("%Y-%m-%d"))
+    last_temps = _latest_by_child(db, TemperatureReading, t_start, t_end)
+
+    empty = {"today": 0, "week": 0, "month": 0}
+
+    def summary(child_id: int | None, name: str) -> dict:
+        d_stats = {**empty, **diaper_counts.get(child_id, {})}
+        f_stats = {**empty, **feeding_counts.get(child_id, {})}
+        return {
+            "child_id": child_id,
+            "name": name,
+            "diaper_stats": d_stats,
+            "feeding_stats": f_stats,
+            "medication_count_today": med_counts.get(child_id, {}).get("today", 0),
+            "last_diaper": last_diapers.get(child_id),
+            "last_feeding": last_feedings.get(child_id),
+            "last_temperature": last_temps.get(child_id),
+        }
+
+    unassigned_count = count_unassigned_logs(db)
+    return {
+        "children": [summary(c.id, c.name) for c in get_children(db)],
+        "unassigned": summary(None, "Unassigned") if unassigned_count else None,
+        "unassigned_count": unassigned_count,
+    }
@@ -3,7 +3,7 @@ import re
 from datetime import UTC, datetime
 from pathlib import Path
 
-from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy import Integer, create_engine, event, inspect, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 _DOSAGE_UNIT_MAP = {
@@ -80,6 +80,18 @@ def _enable_foreign_keys(dbapi_connection, connection_record):
     cursor.close()
 
 
+@event.listens_for(engine, "connect")
+def _leave_checkpoints_to_replica(dbapi_connection, connection_record):
+    """Stop this connection checkpointing the WAL while it is being replicated.
+
+    A checkpoint lets the next write restart the WAL, overwriting frames
+    ``replica`` may not have shipped yet, so with ``PUFFIN_REPLICA_DIR`` set
+    the replicator is the only connection that checkpoints.
+    """
+    if os.environ.get("PUFFIN_REPLICA_DIR"):
+        dbapi_connection.execute("PRAGMA wal_autocheckpoint=0")
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -108,181 +120,397 @@ def _run_migrations(bind=None) -> None:
     """
     target = bind if bind is not None else engine
     with target.connect() as conn:
-        existing_cols = {c["name"] for c in inspect(conn).get_columns("feedings")}
-        if "session_id" not in existing_cols:
-            conn.execute(text("ALTER TABLE feedings ADD COLUMN session_id TEXT"))
-            conn.commit()
-            existing_cols.add("session_id")
-        if "bottle_type" not in existing_cols:
-            conn.execute(text("ALTER TABLE feedings ADD COLUMN bottle_type TEXT"))
-            conn.commit()
-            existing_cols.add("bottle_type")
-        if "amount_unit" not in existing_cols:
-            conn.execute(text("ALTER TABLE feedings ADD COLUMN amount_unit TEXT"))
+        _migrate_columns(conn)
+        _encode_categorical_columns(conn)
+        _index_medication_names(conn)
+        _index_log_text(conn)
+        _track_data_version(conn)
+
+
+def _migrate_columns(conn) -> None:
+    """Add, rename and backfill columns on legacy schemas, oldest change first."""
+    existing_cols = {c["name"] for c in inspect(conn).get_columns("feedings")}
+    if "session_id" not in existing_cols:
+        conn.execute(text("ALTER TABLE feedings ADD COLUMN session_id TEXT"))
+        conn.commit()
+        existing_cols.add("session_id")
+    if "bottle_type" not in existing_cols:
+        conn.execute(text("ALTER TABLE feedings ADD COLUMN bottle_type TEXT"))
+        conn.commit()
+        existing_cols.add("bottle_type")
+    if "amount_unit" not in existing_cols:
+        conn.execute(text("ALTER TABLE feedings ADD COLUMN amount_unit TEXT"))
+        conn.commit()
+        existing_cols.add("amount_unit")
+    conn.execute(
+        text(
+            "UPDATE feedings SET amount_unit = 'oz' "
+            "WHERE feeding_type = 'bottle' AND amount_unit IS NULL"
+        )
+    )
+    conn.commit()
+    if "amount_oz" in existing_cols and "amount" not in existing_cols:
+        conn.execute(text("PRAGMA foreign_keys=off"))
+        conn.execute(
+            text(
+                "CREATE TABLE feedings_new ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "timestamp DATETIME NOT NULL, "
+                "feeding_type VARCHAR NOT NULL, "
+                "duration_minutes INTEGER, "
+                "amount FLOAT, "
+                "amount_unit VARCHAR, "
+                "notes TEXT, "
+                "session_id VARCHAR, "
+                "bottle_type VARCHAR, "
+                "created_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO feedings_new "
+                "(id, timestamp, feeding_type, duration_minutes, amount, amount_unit, "
+                "notes, session_id, bottle_type, created_at) "
+                "SELECT id, timestamp, feeding_type, duration_minutes, amount_oz, amount_unit, "
+                "notes, session_id, bottle_type, created_at FROM feedings"
+            )
+        )
+        conn.execute(text("DROP TABLE feedings"))
+        conn.execute(text("ALTER TABLE feedings_new RENAME TO feedings"))
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS idx_feeding_timestamp ON feedings (timestamp)")
+        )
+        conn.execute(text("PRAGMA foreign_keys=on"))
+        conn.commit()
+
+    # Child profiles: every log table gains a nullable ``child_id``.
+    # Existing rows keep ``NULL`` (unassigned) — no log data is read or
+    # reinterpreted here.  Bulk assignment to a profile is a separate,
+    # user-initiated action.  This must run after the ``feedings`` rebuild
+    # above (which recreates the table without ``child_id``) and before the
+    # medications early-return below.
+    #
+    # The index is on ``(child_id, timestamp)`` so "latest log for this child"
+    # is a seek rather than a sort of the child's whole history.  It replaces
+    # the original ``child_id``-only index, whose lookups it also serves.
+    insp = inspect(conn)
+    for table, prefix in (
+        ("diaper_changes", "idx_diaper"),
+        ("feedings", "idx_feeding"),
+        ("medications", "idx_medication"),
+        ("temperature_readings", "idx_temperature"),
+    ):
+        if not insp.has_table(table):
+            continue
+        if "child_id" not in {c["name"] for c in insp.get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN child_id INTEGER"))
             conn.commit()
-            existing_cols.add("amount_unit")
         conn.execute(
             text(
-                "UPDATE feedings SET amount_unit = 'oz' "
-                "WHERE feeding_type = 'bottle' AND amount_unit IS NULL"
+                f"CREATE INDEX IF NOT EXISTS {prefix}_child_timestamp "
+                f"ON {table} (child_id, timestamp)"
             )
         )
+        conn.execute(text(f"DROP INDEX IF EXISTS {prefix}_child"))
         conn.commit()
-        if "amount_oz" in existing_cols and "amount" not in existing_cols:
-            conn.execute(text("PRAGMA foreign_keys=off"))
+
+    # Temperature readings gain a ``unit`` column recording how each reading
+    # was entered/displayed. Legacy rows predate this and have no known
+    # entry unit; the stored value is Celsius, so they are backfilled to
+    # 'C' — displaying the true canonical value without inventing an entry
+    # unit we can't recover. See issue #58.
+    insp = inspect(conn)
+    if insp.has_table("temperature_readings"):
+        temp_cols = {c["name"] for c in insp.get_columns("temperature_readings")}
+        if "unit" not in temp_cols:
             conn.execute(
-                text(
-                    "CREATE TABLE feedings_new ("
-                    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
-                    "timestamp DATETIME NOT NULL, "
-                    "feeding_type VARCHAR NOT NULL, "
-                    "duration_minutes INTEGER, "
-                    "amount FLOAT, "
-                    "amount_unit VARCHAR, "
-                    "notes TEXT, "
-                    "session_id VARCHAR, "
-                    "bottle_type VARCHAR, "
-                    "created_at DATETIME)"
-                )
+                text("ALTER TABLE temperature_readings ADD COLUMN unit TEXT NOT NULL DEFAULT 'C'")
             )
+            conn.commit()
+
+    # Store temperatures as entered instead of normalized to Celsius: rename
+    # ``temperature_celsius`` to ``temperature`` and reconstruct the entered
+    # value from the recorded ``unit``. Fahrenheit rows are converted back
+    # from their stored Celsius value (best-effort — earlier rounding to
+    # Celsius isn't perfectly reversible); Celsius rows are kept as-is. This
+    # runs after the ``unit`` backfill above, which it depends on. See #60.
+    insp = inspect(conn)
+    if insp.has_table("temperature_readings"):
+        temp_cols = {c["name"] for c in insp.get_columns("temperature_readings")}
+        if "temperature_celsius" in temp_cols and "temperature" not in temp_cols:
+            conn.execute(text("ALTER TABLE temperature_readings ADD COLUMN temperature FLOAT"))
             conn.execute(
                 text(
-                    "INSERT INTO feedings_new "
-                    "(id, timestamp, feeding_type, duration_minutes, amount, amount_unit, "
-                    "notes, session_id, bottle_type, created_at) "
-                    "SELECT id, timestamp, feeding_type, duration_minutes, amount_oz, amount_unit, "
-                    "notes, session_id, bottle_type, created_at FROM feedings"
+                    "UPDATE temperature_readings SET temperature = CASE "
+                    "WHEN unit = 'F' THEN ROUND(temperature_celsius * 9.0 / 5.0 + 32, 1) "
+                    "ELSE temperature_celsius END"
                 )
             )
-            conn.execute(text("DROP TABLE feedings"))
-            conn.execute(text("ALTER TABLE feedings_new RENAME TO feedings"))
+            conn.execute(text("ALTER TABLE temperature_readings DROP COLUMN temperature_celsius"))
+            conn.commit()
+
+    insp = inspect(conn)
+    if not insp.has_table("medications"):
+        return
+    med_cols = {c["name"] for c in insp.get_columns("medications")}
+    if "dosage_quantity" not in med_cols:
+        conn.execute(
+            text("ALTER TABLE medications ADD COLUMN dosage_quantity REAL NOT NULL DEFAULT 0.0")
+        )
+        conn.execute(
+            text("ALTER TABLE medications ADD COLUMN dosage_unit TEXT NOT NULL DEFAULT 'unit(s)'")
+        )
+        conn.commit()
+        # Attempt to migrate existing free-text dosage values
+        rows = conn.execute(text("SELECT id, dosage FROM medications")).fetchall()
+        for row_id, dosage_text in rows:
+            qty, unit = _parse_dosage(dosage_text or "")
             conn.execute(
-                text("CREATE INDEX IF NOT EXISTS idx_feeding_timestamp ON feedings (timestamp)")
+                text(
+                    "UPDATE medications SET dosage_quantity = :qty, dosage_unit = :unit "
+                    "WHERE id = :id"
+                ),
+                {"qty": qty, "unit": unit, "id": row_id},
             )
-            conn.execute(text("PRAGMA foreign_keys=on"))
-            conn.commit()
+        conn.commit()
 
-        # Child profiles: every log table gains a nullable ``child_id``.
-        # Existing rows keep ``NULL`` (unassigned) — no log data is read or
-        # reinterpreted here.  Bulk assignment to a profile is a separate,
-        # user-initiated action.  This must run after the ``feedings`` rebuild
-        # above (which recreates the table without ``child_id``) and before the
-        # medications early-return below.
-        insp = inspect(conn)
-        for table, index in (
-            ("diaper_changes", "idx_diaper_child"),
-            ("feedings", "idx_feeding_child"),
-            ("medications", "idx_medication_child"),
-            ("temperature_readings", "idx_temperature_child"),
-        ):
-            if not insp.has_table(table):
-                continue
-            if "child_id" not in {c["name"] for c in insp.get_columns(table)}:
-                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN child_id INTEGER"))
-                conn.commit()
-            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} (child_id)"))
-            conn.commit()
+    # Drop the obsolete NOT NULL ``dosage`` column if it is still lingering.
+    # ORM INSERTs don't supply ``dosage``, so leaving it in place causes
+    # every new medication save to fail with a NOT NULL constraint error.
+    med_cols = {c["name"] for c in inspect(conn).get_columns("medications")}
+    if "dosage" in med_cols:
+        conn.execute(text("ALTER TABLE medications DROP COLUMN dosage"))
+        conn.commit()
 
-        # Temperature readings gain a ``unit`` column recording how each reading
-        # was entered/displayed. Legacy rows predate this and have no known
-        # entry unit; the stored value is Celsius, so they are backfilled to
-        # 'C' — displaying the true canonical value without inventing an entry
-        # unit we can't recover. See issue #58.
-        insp = inspect(conn)
-        if insp.has_table("temperature_readings"):
-            temp_cols = {c["name"] for c in insp.get_columns("temperature_readings")}
-            if "unit" not in temp_cols:
-                conn.execute(
-                    text(
-                        "ALTER TABLE temperature_readings ADD COLUMN unit TEXT NOT NULL DEFAULT 'C'"
+    # Seed saved_medications from existing medication log entries (first casing wins)
+    if insp.has_table("saved_medications"):
+        saved_count = conn.execute(text("SELECT COUNT(*) FROM saved_medications")).scalar()
+        if saved_count == 0:
+            rows = conn.execute(
+                text("SELECT medication_name FROM medications ORDER BY timestamp ASC, id ASC")
+            ).fetchall()
+            seen_lower: set[str] = set()
+            now = datetime.now(UTC)
+            for (name,) in rows:
+                lower = name.lower()
+                if lower not in seen_lower:
+                    seen_lower.add(lower)
+                    # ``created_at`` is NOT NULL at the SQL level but only has
+                    # a Python-side default, so raw INSERTs must populate it
+                    # explicitly — without it, INSERT OR IGNORE would silently
+                    # skip every row.
+                    conn.execute(
+                        text(
+                            "INSERT OR IGNORE INTO saved_medications (name, created_at) "
+                            "VALUES (:name, :created_at)"
+                        ),
+                        {"name": name, "created_at": now},
                     )
-                )
+            if seen_lower:
                 conn.commit()
 
-        # Store temperatures as entered instead of normalized to Celsius: rename
-        # ``temperature_celsius`` to ``temperature`` and reconstruct the entered
-        # value from the recorded ``unit``. Fahrenheit rows are converted back
-        # from their stored Celsius value (best-effort — earlier rounding to
-        # Celsius isn't perfectly reversible); Celsius rows are kept as-is. This
-        # runs after the ``unit`` backfill above, which it depends on. See #60.
-        insp = inspect(conn)
-        if insp.has_table("temperature_readings"):
-            temp_cols = {c["name"] for c in insp.get_columns("temperature_readings")}
-            if "temperature_celsius" in temp_cols and "temperature" not in temp_cols:
-                conn.execute(text("ALTER TABLE temperature_readings ADD COLUMN temperature FLOAT"))
+
+def _encode_categorical_columns(conn) -> None:
+    """Rebuild log tables whose enum columns are still stored as strings.
+
+    Diaper/feeding types, units and locations used to be free VARCHARs
+    repeating the same few strings on every row.  They are now small integer
+    codes with CHECK constraints (see ``models._EnumCode``), and SQLite can
+    only add a CHECK by rebuilding the table.  Each table is renamed aside,
+    recreated from its model, refilled with the strings translated to codes
+    (case-insensitively), and the old copy dropped.  Runs last, after every
+    string-valued backfill above.
+
+    An unrecognized value is refused rather than guessed at: nothing is
+    touched and startup fails naming the offending column, with the
+    pre-migration snapshot in ``backups/`` to fall back on.
+    """
+    # Imported here (not at module top): models imports Base from this module.
+    from puffin.models import (
+        DiaperChange,
+        Feeding,
+        Medication,
+        TemperatureReading,
+        _EnumCode,
+    )
+
+    insp = inspect(conn)
+    for model in (DiaperChange, Feeding, Medication, TemperatureReading):
+        table = model.__table__
+        if not insp.has_table(table.name):
+            continue
+        db_cols = {c["name"]: c["type"] for c in insp.get_columns(table.name)}
+        coded = [c for c in table.columns if isinstance(c.type, _EnumCode) and c.name in db_cols]
+        if all(isinstance(db_cols[c.name], Integer) for c in coded):
+            continue
+
+        for col in coded:
+            known = ", ".join(f"'{m.value.lower()}'" for m in col.type.members)
+            bad = (
                 conn.execute(
                     text(
-                        "UPDATE temperature_readings SET temperature = CASE "
-                        "WHEN unit = 'F' THEN ROUND(temperature_celsius * 9.0 / 5.0 + 32, 1) "
-                        "ELSE temperature_celsius END"
+                        f"SELECT DISTINCT {col.name} FROM {table.name} "
+                        f"WHERE {col.name} IS NOT NULL AND lower({col.name}) NOT IN ({known})"
                     )
                 )
-                conn.execute(
-                    text("ALTER TABLE temperature_readings DROP COLUMN temperature_celsius")
+                .scalars()
+                .all()
+            )
+            if bad:
+                raise RuntimeError(
+                    f"Cannot encode {table.name}.{col.name}: unrecognized values {bad!r}"
                 )
-                conn.commit()
 
-        insp = inspect(conn)
-        if not insp.has_table("medications"):
-            return
-        med_cols = {c["name"] for c in insp.get_columns("medications")}
-        if "dosage_quantity" not in med_cols:
-            conn.execute(
-                text("ALTER TABLE medications ADD COLUMN dosage_quantity REAL NOT NULL DEFAULT 0.0")
-            )
+        names = [c.name for c in table.columns if c.name in db_cols]
+        exprs = []
+        for name in names:
+            col = table.columns[name]
+            if isinstance(col.type, _EnumCode):
+                whens = " ".join(
+                    f"WHEN '{m.value.lower()}' THEN {code}"
+                    for code, m in enumerate(col.type.members)
+                )
+                exprs.append(f"CASE lower({name}) {whens} END")
+            elif name == "created_at":
+                # NOT NULL in the recreated table but not in the oldest schemas;
+                # a row missing it was created when it was logged, near enough.
+                exprs.append("COALESCE(created_at, timestamp)")
+            else:
+                exprs.append(name)
+
+        old = f"{table.name}_old"
+        # Indexes follow a renamed table but keep their names, which the
+        # recreated table needs.
+        indexes = [index["name"] for index in insp.get_indexes(table.name)]
+        # foreign_keys cannot change inside a transaction, so it goes off
+        # first.  The rebuild itself is one transaction: pysqlite would
+        # autocommit the DDL statement by statement, and a crash between the
+        # rename and the copy would leave the logs in ``old`` and an empty
+        # table that the next start happily accepts.
+        conn.execute(text("PRAGMA foreign_keys=off"))
+        conn.exec_driver_sql("BEGIN")
+        try:
+            _drop_triggers(conn, table.name)
+            conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {old}"))
+            for index in indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+            table.create(conn)
             conn.execute(
                 text(
-                    "ALTER TABLE medications ADD COLUMN dosage_unit TEXT NOT NULL DEFAULT 'unit(s)'"
+                    f"INSERT INTO {table.name} ({', '.join(names)}) "
+                    f"SELECT {', '.join(exprs)} FROM {old}"
                 )
             )
+            _carry_autoincrement(conn, old, table.name)
+            conn.execute(text(f"DROP TABLE {old}"))
             conn.commit()
-            # Attempt to migrate existing free-text dosage values
-            rows = conn.execute(text("SELECT id, dosage FROM medications")).fetchall()
-            for row_id, dosage_text in rows:
-                qty, unit = _parse_dosage(dosage_text or "")
-                conn.execute(
-                    text(
-                        "UPDATE medications SET dosage_quantity = :qty, dosage_unit = :unit "
-                        "WHERE id = :id"
-                    ),
-                    {"qty": qty, "unit": unit, "id": row_id},
-                )
-            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("PRAGMA foreign_keys=on"))
 
-        # Drop the obsolete NOT NULL ``dosage`` column if it is still lingering.
-        # ORM INSERTs don't supply ``dosage``, so leaving it in place causes
-        # every new medication save to fail with a NOT NULL constraint error.
-        med_cols = {c["name"] for c in inspect(conn).get_columns("medications")}
-        if "dosage" in med_cols:
-            conn.execute(text("ALTER TABLE medications DROP COLUMN dosage"))
-            conn.commit()
 
-        # Seed saved_medications from existing medication log entries (first casing wins)
-        if insp.has_table("saved_medications"):
-            saved_count = conn.execute(text("SELECT COUNT(*) FROM saved_medications")).scalar()
-            if saved_count == 0:
-                rows = conn.execute(
-                    text("SELECT medication_name FROM medications ORDER BY timestamp ASC, id ASC")
-                ).fetchall()
-                seen_lower: set[str] = set()
-                now = datetime.now(UTC)
-                for (name,) in rows:
-                    lower = name.lower()
-                    if lower not in seen_lower:
-                        seen_lower.add(lower)
-                        # ``created_at`` is NOT NULL at the SQL level but only has
-                        # a Python-side default, so raw INSERTs must populate it
-                        # explicitly — without it, INSERT OR IGNORE would silently
-                        # skip every row.
-                        conn.execute(
-                            text(
-                                "INSERT OR IGNORE INTO saved_medications (name, created_at) "
-                                "VALUES (:name, :created_at)"
-                            ),
-                            {"name": name, "created_at": now},
-                        )
-                if seen_lower:
-                    conn.commit()
+def _carry_autoincrement(conn, old: str, new: str) -> None:
+    """Start *new*'s AUTOINCREMENT counter where *old*'s left off.
+
+    Copying the rows only brings the counter up to the highest id still
+    present; the ids of logs deleted from the top would be handed out again.
+    """
+    seq = conn.execute(
+        text("SELECT max(seq) FROM sqlite_sequence WHERE name IN (:old, :new)"),
+        {"old": old, "new": new},
+    ).scalar()
+    if seq is not None:
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :new"), {"new": new})
+        conn.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES (:new, :seq)"),
+            {"new": new, "seq": seq},
+        )
+
+
+def _index_medication_names(conn) -> None:
+    """Add the case-insensitive name indexes behind medication autocomplete.
+
+    Saved names were kept unique ignoring case only by a check-then-insert in
+    the app, which two concurrent saves could both pass.  Any duplicates that
+    slipped through are collapsed onto the first-saved casing (matching the
+    seeding rule above) before the NOCASE unique index can be built.
+    """
+    insp = inspect(conn)
+    if insp.has_table("saved_medications"):
+        conn.execute(
+            text(
+                "DELETE FROM saved_medications WHERE id NOT IN "
+                "(SELECT MIN(id) FROM saved_medications GROUP BY name COLLATE NOCASE)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_saved_medication_name "
+                "ON saved_medications (name COLLATE NOCASE)"
+            )
+        )
+    if insp.has_table("medications"):
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_medication_name "
+                "ON medications (medication_name COLLATE NOCASE)"
+            )
+        )
+    conn.commit()
+
+
+def _drop_triggers(conn, table: str) -> None:
+    """Drop every trigger on *table* ahead of rebuilding it.
+
+    A rename would carry them onto the old copy, where they would fire on the
+    refill and keep their names from the recreated table.  Whatever owns them
+    puts them back afterwards -- ``_index_log_text`` for the search index,
+    ``_track_data_version`` for the data version and change log.
+    """
+    triggers = conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"),
+        {"table": table},
+    ).scalars()
+    for trigger in list(triggers):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+
+
+def _index_log_text(conn) -> None:
+    """Attach the full-text search index to existing log tables.
+
+    ``create_all`` only indexes tables it creates, so this backfills logs that
+    predate search, and re-indexes any table rebuilt above.
+    """
+    from puffin.models import create_search_index
+
+    create_search_index(conn)
+    conn.commit()
+
+
+def _track_data_version(conn) -> None:
+    """Attach the data-version triggers to existing tables.
+
+    As with search, ``create_all`` only covers tables it creates, and any
+    table rebuilt above has lost its triggers.  The bump-only triggers that
+    predate the change log are replaced by ones that also keep it, and the
+    version gains the ``pruned_through`` mark tombstone pruning keeps.
+    """
+    from puffin.models import _VERSIONED_TABLES, create_version_triggers
+
+    insp = inspect(conn)
+    if insp.has_table("data_version") and "pruned_through" not in {
+        c["name"] for c in insp.get_columns("data_version")
+    }:
+        conn.execute(
+            text("ALTER TABLE data_version ADD COLUMN pruned_through INTEGER NOT NULL DEFAULT 0")
+        )
+    for table in _VERSIONED_TABLES:
+        for op in ("insert", "update", "delete"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_version_{op}"))
+    create_version_triggers(conn)
+    conn.commit()
 
 
 def init_db():
@@ -295,5 +523,9 @@ def init_db():
     from puffin.backup import backup_database
 
     backup_database(DB_PATH, reason="pre-migration")
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Takes effect only on a new database, before its first table; an
+        # existing one is switched by its first maintenance run.
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        Base.metadata.create_all(bind=conn)
     _run_migrations()
@@ -0,0 +1,339 @@
+"""Background export jobs.
+
+Laying out a PDF of several months can take longer than a phone browser will
+wait on a single request.  ``POST /api/exports`` instead hands the export to a
+worker process and answers at once with a job id; the client polls the job's
+status for progress and then downloads the finished file.
+
+Finished files are kept in an ``exports/`` directory beside the database,
+named by a key over everything that determines their bytes -- format, date
+range, child filter, local timezone and the data version (see
+``models.create_version_triggers``).  Asking for the same export again before
+anything has been logged or edited is therefore served straight from disk.
+The newest ``KEEP`` files are retained.  The worker renders from a single
+read snapshot and names the file by that snapshot's data version: if a
+write landed after the job was keyed, the file goes under the newer key, and
+the job points its download there.
+
+The worker reports through files rather than shared memory, so the API side
+needs nothing but the job's key to answer for it:
+
+* ``<key>.<format>`` -- the finished file, written as ``.part`` then renamed;
+* ``<key>.progress`` -- ``"<rows done> <rows total>"``, rewritten per batch;
+* ``<key>.cancel`` -- created to ask the worker to stop at its next batch.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger("uvicorn.error")
+
+# Worker processes.  Exports are occasional, and a second PDF rendering at the
+# same time would only compete for the one or two cores Puffin usually has.
+_WORKERS = 1
+
+# Finished exports kept on disk, newest first by modification time.
+KEEP = 10
+
+# Part of every key: bump it when a change to the renderers alters their
+# output, so files rendered by the old code are not served again.
+_RENDER_VERSION = 1
+
+# The formats a job can produce, which double as the files' extensions.
+FORMATS = ("csv", "json", "ndjson", "pdf", "parquet", "arrow")
+
+_executor: ProcessPoolExecutor | None = None
+# Jobs the files on disk cannot answer for: those still pending, failed or
+# cancelled (the newest ``KEEP``), and those whose file went under a newer key.
+_jobs: dict[str, tuple["ExportRequest", Future]] = {}
+# Reentrant: a future already done runs its callback inside ``submit``.
+_lock = threading.RLock()
+
+
+class ExportCancelledError(Exception):
+    """Raised inside the worker when its job's cancel marker appears."""
+
+
+@dataclass(frozen=True)
+class ExportRequest:
+    """What to export: the same parameters as ``GET /api/export``."""
+
+    export_format: str
+    start_date: datetime | None
+    end_date: datetime | None
+    child: int | str | None
+
+
+def export_dir(db_path) -> Path:
+    return Path(db_path).parent / "exports"
+
+
+def job_key(request: ExportRequest, data_version: int, tz_name: str) -> str:
+    """The job id, and the name its file is cached under."""
+    raw = json.dumps(
+        [
+            _RENDER_VERSION,
+            request.export_format,
+            request.start_date.isoformat() if request.start_date else None,
+            request.end_date.isoformat() if request.end_date else None,
+            request.child,
+            tz_name,
+            data_version,
+        ]
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def artifact_path(directory: Path, key: str) -> Path | None:
+    """The finished export for *key*, if there is one."""
+    for export_format in FORMATS:
+        path = directory / f"{key}.{export_format}"
+        if path.exists():
+            return path
+    return None
+
+
+def _read_progress(directory: Path, key: str) -> tuple[int, int | None]:
+    try:
+        done, total = (directory / f"{key}.progress").read_text().split()
+    except (OSError, ValueError):
+        return 0, None
+    return int(done), int(total)
+
+
+def _write_progress(path: Path, done: int, total: int) -> None:
+    tmp = path.with_suffix(".progress-tmp")
+    tmp.write_text(f"{done} {total}")
+    tmp.replace(path)
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned rather than forked: a fork would copy the server's open
+        # SQLite connections and threads into the child.
+        _executor = ProcessPoolExecutor(
+            max_workers=_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def submit(
+    db_url: str, directory: Path, request: ExportRequest, data_version: int, tz_name: str
+) -> str:
+    """Start rendering *request* unless it is already finished or under way; return its key."""
+    key = job_key(request, data_version, tz_name)
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and not job[1].done():
+            return key
+        if artifact_path(directory, key) is not None:
+            return key
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{key}.cancel").unlink(missing_ok=True)
+        future = _pool().submit(_run, db_url, str(directory), key, request, data_version, tz_name)
+        _jobs[key] = (request, future)
+        future.add_done_callback(lambda f: _finished(directory, key, f))
+    return key
+
+
+def _rendered_key(future: Future) -> str | None:
+    """The key a finished job's file went under, or ``None`` if it has none."""
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return None
+    return future.result()
+
+
+def _finished(directory: Path, key: str, future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        exc = future.exception()
+        if not isinstance(exc, ExportCancelledError):
+            logger.error("Export %s failed: %r", key, exc)
+    with _lock:
+        _prune(directory)
+        _evict(directory)
+
+
+def _evict(directory: Path) -> None:
+    """Forget the finished jobs the files on disk answer for, or that are long gone."""
+    unsuccessful = []
+    for key, (_, future) in list(_jobs.items()):
+        if not future.done():
+            continue
+        rendered = _rendered_key(future)
+        if rendered is None:
+            unsuccessful.append(key)
+        elif rendered == key or artifact_path(directory, rendered) is None:
+            del _jobs[key]
+    for key in unsuccessful[:-KEEP]:
+        del _jobs[key]
+
+
+def status(directory: Path, key: str) -> dict | None:
+    """The job's state for the status endpoint, or ``None`` if it is unknown."""
+    done, total = _read_progress(directory, key)
+    artifact = artifact_path(directory, key)
+    if artifact is not None:
+        return {
+            "id": key,
+            "format": artifact.suffix[1:],
+            "status": "done",
+            "rows_done": done,
+            "rows_total": total,
+            "download_url": f"/api/exports/{key}/file",
+        }
+    job = _jobs.get(key)
+    if job is None:
+        return None
+    request, future = job
+    result = {
+        "id": key,
+        "format": request.export_format,
+        "rows_done": done,
+        "rows_total": total,
+    }
+    if not future.done():
+        return {**result, "status": "running" if future.running() else "queued"}
+    if future.cancelled() or isinstance(future.exception(), ExportCancelledError):
+        return {**result, "status": "cancelled"}
+    if future.exception() is not None:
+        return {**result, "status": "failed", "error": str(future.exception())}
+    # Rendered after a write, under the newer version's key.
+    rendered = future.result()
+    if artifact_path(directory, rendered) is None:
+        return None  # pruned, or deleted by the user
+    done, total = _read_progress(directory, rendered)
+    return {
+        **result,
+        "status": "done",
+        "rows_done": done,
+        "rows_total": total,
+        "download_url": f"/api/exports/{rendered}/file",
+    }
+
+
+def running() -> bool:
+    """Whether any export is queued or rendering."""
+    with _lock:
+        return any(not future.done() for _, future in _jobs.values())
+
+
+def cancel(directory: Path, key: str) -> bool:
+    """Stop a pending job, or delete a finished one's file.
+
+    Returns whether there was anything to cancel or delete.
+    """
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and not job[1].done():
+            if not job[1].cancel():
+                # Already running in the worker; it checks for this per batch.
+                (directory / f"{key}.cancel").touch()
+            return True
+        _jobs.pop(key, None)
+        rendered = (_rendered_key(job[1]) if job is not None else None) or key
+        artifact = artifact_path(directory, rendered)
+        (directory / f"{rendered}.progress").unlink(missing_ok=True)
+        if artifact is None:
+            return job is not None
+        artifact.unlink(missing_ok=True)
+        return True
+
+
+def _prune(directory: Path) -> None:
+    """Keep only the newest ``KEEP`` finished exports."""
+    files = [p for p in directory.iterdir() if p.suffix[1:] in FORMATS]
+    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[KEEP:]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".progress").unlink(missing_ok=True)
+
+
+def shutdown() -> None:
+    """Stop the worker pool, abandoning queued jobs.  Called at app shutdown."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _run(
+    db_url: str,
+    directory: str,
+    key: str,
+    request: ExportRequest,
+    data_version: int,
+    tz_name: str,
+) -> str:
+    """Render *request* to ``<directory>/<key>.<format>``.  Runs in the worker.
+
+    Returns the key the file went under: *key*, unless the data changed since
+    *data_version*, when it is the key for the version actually rendered.
+    """
+    # Imported here: the worker is a fresh interpreter, and the API process
+    # should not pay for the renderers just to import this module.
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from puffin import crud
+    from puffin.models import (
+        DiaperChange,
+        Feeding,
+        Medication,
+        TemperatureReading,
+        read_data_version,
+    )
+    from puffin.routers.dashboard import render_export
+
+    directory = Path(directory)
+    progress_path = directory / f"{key}.progress"
+    cancel_marker = directory / f"{key}.cancel"
+    args = (request.start_date, request.end_date, request.child)
+    part = None
+
+    engine = create_engine(db_url)
+    try:
+        with Session(engine) as db:
+            # One read transaction, so the counts, the rows and the version
+            # all come from the same snapshot.
+            db.connection().exec_driver_sql("BEGIN")
+            version = read_data_version(db.connection())
+            rendered = key if version == data_version else job_key(request, version, tz_name)
+            artifact = directory / f"{rendered}.{request.export_format}"
+            part = artifact.with_name(artifact.name + ".part")
+            total = sum(
+                crud.count_log_rows(db, model, *args)
+                for model in (DiaperChange, Feeding, Medication, TemperatureReading)
+            )
+            done = 0
+            _write_progress(progress_path, done, total)
+
+            def progress(rows: int) -> None:
+                nonlocal done
+                done = min(done + rows, total)
+                _write_progress(progress_path, done, total)
+                if cancel_marker.exists():
+                    raise ExportCancelledError(key)
+
+            with part.open("wb") as out:
+                for chunk in render_export(db, request.export_format, *args, progress):
+                    out.write(chunk)
+        part.replace(artifact)
+        _write_progress(directory / f"{rendered}.progress", total, total)
+        if rendered != key:
+            progress_path.unlink(missing_ok=True)
+    except BaseException:
+        if part is not None:
+            part.unlink(missing_ok=True)
+        raise
+    finally:
+        cancel_marker.unlink(missing_ok=True)
+        engine.dispose()
+    return rendered
@@ -10,9 +10,24 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from puffin import backup_scheduler, export_jobs, maintenance, replica, writer
+from puffin.compression import CompressionMiddleware
 from puffin.crud import warn_if_tz_unconfigured
-from puffin.database import init_db
-from puffin.routers import activities, children, dashboard, diapers, feedings, health
+from puffin.database import DATABASE_URL, init_db
+from puffin.routers import (
+    activities,
+    backups,
+    batch,
+    bulk,
+    children,
+    dashboard,
+    diapers,
+    exports,
+    feedings,
+    health,
+    imports,
+    search,
+)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -31,7 +46,17 @@ class NoCacheAPIMiddleware(BaseHTTPMiddleware):
 async def lifespan(app: FastAPI):
     warn_if_tz_unconfigured()
     init_db()
+    replica.start(DATABASE_URL, replica.directory_from_env())
+    writer.start(DATABASE_URL, writer.window_from_env())
+    backup_scheduler.start(DATABASE_URL, *backup_scheduler.settings_from_env())
+    maintenance.start(DATABASE_URL, *maintenance.settings_from_env())
     yield
+    maintenance.stop()
+    backup_scheduler.stop()
+    writer.stop()
+    export_jobs.shutdown()
+    # Last, so the final writes are shipped.
+    replica.stop()
 
 
 app = FastAPI(
@@ -42,6 +67,7 @@ app = FastAPI(
 )
 
 app.add_middleware(NoCacheAPIMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 
 def _json_safe(value):
@@ -85,11 +111,17 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 # Include routers
 app.include_router(activities.router)
+app.include_router(backups.router)
+app.include_router(batch.router)
+app.include_router(bulk.router)
 app.include_router(children.router)
 app.include_router(diapers.router)
 app.include_router(feedings.router)
 app.include_router(health.router)
 app.include_router(dashboard.router)
+app.include_router(exports.router)
+app.include_router(imports.router)
+app.include_router(search.router)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -0,0 +1,305 @@
+"""Database maintenance: planner statistics and reclaiming free pages.
+
+Nothing else ever runs ``ANALYZE``, so without this the query planner picks
+indexes with no statistics to go on; and the pages freed by deleted rows and
+by the table rebuilds in ``_run_migrations`` stay in the file for good.
+``python -m puffin.maintenance`` -- or, with
+``PUFFIN_MAINTENANCE_INTERVAL_HOURS`` set, a thread of the app -- does four
+things:
+
+* drops the change log's delete tombstones older than
+  ``CHANGES_RETENTION_DAYS`` (see ``models.DataVersion``), which otherwise
+  pile up for good;
+* refreshes the statistics with an ``ANALYZE`` bounded by
+  ``ANALYSIS_LIMIT`` rows an index, so it costs about the same however
+  large the database grows;
+* switches the database to ``auto_vacuum=INCREMENTAL`` -- a one-off
+  ``VACUUM`` that rewrites the whole file; databases created since are
+  incremental from the start (``init_db``) -- and
+* hands the free pages back to the filesystem ``RECLAIM_STEP_PAGES`` at a
+  time, each step a short transaction of its own, so a write waits for one
+  step at most.
+
+``--snapshot`` (``PUFFIN_MAINTENANCE_SNAPSHOT`` for the thread) also writes
+a compacted ``VACUUM INTO`` copy among the backup snapshots, compressed and
+pruned with them.  Each run reports the database's size before and after and
+how long each part took.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from puffin import backup, export_jobs
+from puffin.database import DB_PATH, _leave_checkpoints_to_replica
+
+logger = logging.getLogger("uvicorn.error")
+
+# Rows ANALYZE samples from each index (``PRAGMA analysis_limit``).  SQLite
+# suggests a few hundred; statistics only need to be roughly right.
+ANALYSIS_LIMIT = 1000
+
+# Free pages handed back per step, and the pause between steps that lets
+# waiting writes in.
+RECLAIM_STEP_PAGES = 256
+RECLAIM_PAUSE = 0.01
+
+# How long a scheduled run waits for a running export to finish.
+EXPORT_RETRY = 60.0
+
+# Days a deleted row's tombstone stays in ``row_changes`` for
+# ``/api/export/changes`` to pass on; a consumer that syncs less often than
+# this must start again from 0.  PUFFIN_CHANGES_RETENTION_DAYS, 0 for ever.
+CHANGES_RETENTION_DAYS = 90
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class MaintenanceReport:
+    """What a maintenance run did, and how long each part took."""
+
+    size_before: int
+    size_after: int = 0
+    converted: bool = False
+    pruned_tombstones: int = 0
+    reclaimed_pages: int = 0
+    snapshot: Path | None = None
+    seconds: dict[str, float] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        lines = [
+            f"Size: {self.size_before / 1e6:.1f} MB -> {self.size_after / 1e6:.1f} MB",
+            f"Pruned {self.pruned_tombstones} deletion records",
+            f"Reclaimed {self.reclaimed_pages} free pages",
+        ]
+        if self.converted:
+            lines.append("Switched to auto_vacuum=INCREMENTAL")
+        if self.snapshot is not None:
+            lines.append(f"Compacted snapshot: {self.snapshot}")
+        lines.append(", ".join(f"{part} {secs:.2f}s" for part, secs in self.seconds.items()))
+        return "\n".join(lines)
+
+
+def _size(conn: sqlite3.Connection) -> int:
+    # The database's own size rather than the file's: in WAL mode the file
+    # only shrinks once the freed pages are checkpointed.
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    return page_count * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+@contextmanager
+def _timed(seconds: dict[str, float], part: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds[part] = round(time.perf_counter() - start, 3)
+
+
+def changes_retention_days() -> int:
+    raw = os.environ.get("PUFFIN_CHANGES_RETENTION_DAYS")
+    if not raw:
+        return CHANGES_RETENTION_DAYS
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Ignoring PUFFIN_CHANGES_RETENTION_DAYS=%r: not a whole number", raw)
+        return CHANGES_RETENTION_DAYS
+
+
+def _prune_tombstones(conn: sqlite3.Connection, days: int) -> int:
+    """Drop the delete tombstones older than *days*; return how many went.
+
+    Everything up to the newest one dropped goes, and that version is
+    recorded as ``pruned_through`` so the changes export can refuse a
+    watermark from before it.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(data_version)")}
+    if days <= 0 or "pruned_through" not in columns:
+        return 0  # kept for ever, or not migrated yet: the app does that
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        (horizon,) = conn.execute(
+            "SELECT max(seq) FROM row_changes WHERE deleted"
+            " AND updated_at < strftime('%Y-%m-%d %H:%M:%f', 'now', ?)",
+            (f"-{int(days)} days",),
+        ).fetchone()
+        pruned = 0
+        if horizon is not None:
+            pruned = conn.execute(
+                "DELETE FROM row_changes WHERE deleted AND seq <= ?", (horizon,)
+            ).rowcount
+            conn.execute(
+                "UPDATE data_version SET pruned_through = max(pruned_through, ?) WHERE id = 1",
+                (horizon,),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return pruned
+
+
+def _reclaim(conn: sqlite3.Connection, pages: int, pause: float) -> int:
+    """Free the free pages *pages* at a time; return how many were freed."""
+    freed = 0
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    while free:
+        # execute() would step it once, freeing one page; a script runs it out.
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if left >= free:  # not incremental after all: nothing more to do
+            break
+        freed += free - left
+        free = left
+        if free and pause:
+            time.sleep(pause)
+    return freed
+
+
+def _compacted_snapshot(conn: sqlite3.Connection, db_path: Path) -> Path:
+    backups = backup._backup_dir(db_path)
+    backups.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(UTC).strftime(backup._STAMP_FORMAT)
+    dest = backups / f"{db_path.stem}-{stamp}-compacted.db"
+    try:
+        conn.execute("VACUUM INTO ?", (str(dest),))
+    except sqlite3.Error:
+        dest.unlink(missing_ok=True)
+        raise
+    method = backup._compression()
+    if method is not None:
+        dest = backup._compress(dest, method)
+    backup._prune(
+        backups, db_path.stem, backup._keep_count(), reason="compacted", **backup._retention()
+    )
+    return dest
+
+
+def run_maintenance(db_path, *, snapshot: bool = False) -> MaintenanceReport | None:
+    """Prune old tombstones, analyze, go incremental if need be, and reclaim free pages.
+
+    With *snapshot*, also write a compacted copy into ``backups/``.  Returns
+    ``None`` when there is no database yet.  Safe to run beside the app: only
+    the one-off conversion holds the write lock for long.
+    """
+    db_path = Path(db_path)
+    if not db_path.exists() or db_path.stat().st_size == 0:
+        return None
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        _leave_checkpoints_to_replica(conn, None)
+        report = MaintenanceReport(size_before=_size(conn))
+        with _timed(report.seconds, "prune"):
+            report.pruned_tombstones = _prune_tombstones(conn, changes_retention_days())
+        with _timed(report.seconds, "analyze"):
+            conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+            logger.info("Switching %s to incremental auto-vacuum (a full VACUUM)", db_path)
+            with _timed(report.seconds, "convert"):
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            report.converted = True
+        with _timed(report.seconds, "reclaim"):
+            report.reclaimed_pages = _reclaim(conn, RECLAIM_STEP_PAGES, RECLAIM_PAUSE)
+        report.size_after = _size(conn)
+        if snapshot:
+            with _timed(report.seconds, "snapshot"):
+                report.snapshot = _compacted_snapshot(conn, db_path)
+    finally:
+        conn.close()
+    report.seconds["total"] = round(sum(report.seconds.values()), 3)
+    return report
+
+
+class MaintenanceScheduler:
+    """A thread that runs maintenance on the database at *url* every *interval* seconds."""
+
+    def __init__(self, url: str, interval: float, snapshot: bool = False):
+        self.db_path = Path(make_url(url).database)
+        self.interval = interval
+        self.snapshot = snapshot
+        self.last_report: MaintenanceReport | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="puffin-maintenance", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the thread, letting a run under way finish first."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        delay = self.interval
+        while not self._stop.wait(delay):
+            if export_jobs.running():
+                delay = min(EXPORT_RETRY, self.interval)
+                continue
+            delay = self.interval
+            try:
+                self.last_report = run_maintenance(self.db_path, snapshot=self.snapshot)
+            except (sqlite3.Error, OSError):
+                logger.exception("Scheduled maintenance of %s failed", self.db_path)
+                continue
+            if self.last_report is not None:
+                logger.info("Maintenance of %s:\n%s", self.db_path, self.last_report.describe())
+
+
+_scheduler: MaintenanceScheduler | None = None
+
+
+def settings_from_env() -> tuple[float | None, bool]:
+    """The interval in seconds, or ``None`` when scheduling is off, and whether to snapshot."""
+    snapshot = os.environ.get("PUFFIN_MAINTENANCE_SNAPSHOT", "").lower() in ("1", "true", "yes")
+    raw = os.environ.get("PUFFIN_MAINTENANCE_INTERVAL_HOURS")
+    if not raw:
+        return None, snapshot
+    try:
+        hours = float(raw)
+    except ValueError:
+        logger.warning("Ignoring PUFFIN_MAINTENANCE_INTERVAL_HOURS=%r: not a number", raw)
+        return None, snapshot
+    return (hours * 3600 if hours > 0 else None), snapshot
+
+
+def start(url: str, interval: float | None, snapshot: bool = False) -> None:
+    """Start the scheduler, unless *interval* is ``None``.  Called at app startup."""
+    global _scheduler
+    if interval is not None and _scheduler is None:
+        _scheduler = MaintenanceScheduler(url, interval, snapshot)
+
+
+def stop() -> None:
+    """Stop the scheduler, if running.  Called at app shutdown."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.close()
+        _scheduler = None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m puffin.maintenance")
+    parser.add_argument(
+        "--snapshot", action="store_true", help="also write a compacted copy into backups/"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    report = run_maintenance(DB_PATH, snapshot=args.snapshot)
+    print("No database yet." if report is None else report.describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,34 @@
 from datetime import UTC, datetime
-
-from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text
+from enum import StrEnum
+
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    event,
+    inspect,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import TypeDecorator
 
 from puffin.database import Base
+from puffin.schemas import (
+    BottleType,
+    BottleUnit,
+    DiaperType,
+    DosageUnit,
+    FeedingType,
+    TemperatureLocation,
+    TemperatureUnit,
+)
 
 
 class _UTCDateTime(TypeDecorator):
@@ -38,6 +62,71 @@ class _UTCDateTime(TypeDecorator):
 _TZ_DATETIME = _UTCDateTime()
 
 
+class _EnumCode(TypeDecorator):
+    """A closed ``StrEnum`` column stored as a small integer code.
+
+    These columns hold one of a handful of strings on every row, so storing
+    the member's position in *members* instead keeps rows compact and turns
+    equality filters into integer compares.  Reads hand back the enum member,
+    which is a ``str`` equal to its value, so callers see no difference.
+
+    *members* is append-only: a stored code is a position in it, so reordering
+    or removing a member would silently relabel every existing row.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, members: tuple[StrEnum, ...]):
+        super().__init__()
+        self.members = members
+        self._codes = {m.value: code for code, m in enumerate(members)}
+
+    def process_bind_param(self, value: str | None, dialect) -> int | None:
+        if value is None:
+            return None
+        try:
+            return self._codes[value]
+        except KeyError:
+            allowed = ", ".join(m.value for m in self.members)
+            raise ValueError(f"{value!r} is not one of: {allowed}") from None
+
+    def process_result_value(self, value: int | None, dialect) -> StrEnum | None:
+        if value is None:
+            return None
+        return self.members[value]
+
+    def check(self, column: str) -> CheckConstraint:
+        """A CHECK keeping *column* within the known codes (``NULL`` passes)."""
+        return CheckConstraint(f"{column} BETWEEN 0 AND {len(self.members) - 1}")
+
+
+_DIAPER_TYPE = _EnumCode((DiaperType.pee, DiaperType.poop, DiaperType.both, DiaperType.dry))
+_FEEDING_TYPE = _EnumCode((FeedingType.breast_left, FeedingType.breast_right, FeedingType.bottle))
+_BOTTLE_TYPE = _EnumCode((BottleType.breastmilk, BottleType.formula))
+_BOTTLE_UNIT = _EnumCode((BottleUnit.oz, BottleUnit.ml))
+_TEMPERATURE_UNIT = _EnumCode((TemperatureUnit.celsius, TemperatureUnit.fahrenheit))
+_TEMPERATURE_LOCATION = _EnumCode(
+    (
+        TemperatureLocation.rectal,
+        TemperatureLocation.oral,
+        TemperatureLocation.axillary,
+        TemperatureLocation.temporal,
+    )
+)
+_DOSAGE_UNIT = _EnumCode(
+    (
+        DosageUnit.ml,
+        DosageUnit.tsp,
+        DosageUnit.tbsp,
+        DosageUnit.drop,
+        DosageUnit.spray,
+        DosageUnit.tablet,
+        DosageUnit.unit,
+    )
+)
+
+
 def _utcnow() -> datetime:
     return datetime.now(UTC)
 
@@ -66,19 +155,27 @@ def _child_fk() -> Mapped[int | None]:
     return mapped_column(Integer, ForeignKey("children.id", ondelete="SET NULL"), nullable=True)
 
 
+# AUTOINCREMENT, so the id of a deleted log is never handed out again: the
+# change log (``RowChange``) and idempotency-key replays both take an id to
+# mean one log for good.  The feedings table had it from the start.
+_NO_ID_REUSE = {"sqlite_autoincrement": True}
+
+
 class DiaperChange(Base):
     __tablename__ = "diaper_changes"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     timestamp: Mapped[datetime] = mapped_column(_TZ_DATETIME, nullable=False, default=_utcnow)
-    type: Mapped[str] = mapped_column(String, nullable=False)  # pee, poop, both
+    type: Mapped[str] = mapped_column(_DIAPER_TYPE, nullable=False)  # pee, poop, both, dry
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     child_id: Mapped[int | None] = _child_fk()
     created_at: Mapped[datetime] = mapped_column(_TZ_DATETIME, default=_utcnow)
 
     __table_args__ = (
         Index("idx_diaper_timestamp", "timestamp"),
-        Index("idx_diaper_child", "child_id"),
+        Index("idx_diaper_child_timestamp", "child_id", "timestamp"),
+        _DIAPER_TYPE.check("type"),
+        _NO_ID_REUSE,
     )
 
 
@@ -88,20 +185,26 @@ class Feeding(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     timestamp: Mapped[datetime] = mapped_column(_TZ_DATETIME, nullable=False, default=_utcnow)
     feeding_type: Mapped[str] = mapped_column(
-        String, nullable=False
+        _FEEDING_TYPE, nullable=False
     )  # breast_left, breast_right, bottle
     duration_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
     amount: Mapped[float | None] = mapped_column(Float, nullable=True)
-    amount_unit: Mapped[str | None] = mapped_column(String, nullable=True)
+    amount_unit: Mapped[str | None] = mapped_column(_BOTTLE_UNIT, nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     session_id: Mapped[str | None] = mapped_column(String, nullable=True)
-    bottle_type: Mapped[str | None] = mapped_column(String, nullable=True)  # breastmilk, formula
+    bottle_type: Mapped[str | None] = mapped_column(
+        _BOTTLE_TYPE, nullable=True
+    )  # breastmilk, formula
     child_id: Mapped[int | None] = _child_fk()
     created_at: Mapped[datetime] = mapped_column(_TZ_DATETIME, default=_utcnow)
 
     __table_args__ = (
         Index("idx_feeding_timestamp", "timestamp"),
-        Index("idx_feeding_child", "child_id"),
+        Index("idx_feeding_child_timestamp", "child_id", "timestamp"),
+        _FEEDING_TYPE.check("feeding_type"),
+        _BOTTLE_UNIT.check("amount_unit"),
+        _BOTTLE_TYPE.check("bottle_type"),
+        _NO_ID_REUSE,
     )
 
 
@@ -112,14 +215,16 @@ class Medication(Base):
     timestamp: Mapped[datetime] = mapped_column(_TZ_DATETIME, nullable=False, default=_utcnow)
     medication_name: Mapped[str] = mapped_column(String, nullable=False)
     dosage_quantity: Mapped[float] = mapped_column(Float, nullable=False)
-    dosage_unit: Mapped[str] = mapped_column(String, nullable=False)
+    dosage_unit: Mapped[str] = mapped_column(_DOSAGE_UNIT, nullable=False)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     child_id: Mapped[int | None] = _child_fk()
     created_at: Mapped[datetime] = mapped_column(_TZ_DATETIME, default=_utcnow)
 
     __table_args__ = (
         Index("idx_medication_timestamp", "timestamp"),
-        Index("idx_medication_child", "child_id"),
+        Index("idx_medication_child_timestamp", "child_id", "timestamp"),
+        _DOSAGE_UNIT.check("dosage_unit"),
+        _NO_ID_REUSE,
     )
 
 
@@ -132,9 +237,9 @@ class TemperatureReading(Base):
     # below — no normalization to Celsius. Interpret it together with ``unit``.
     temperature: Mapped[float] = mapped_column(Float, nullable=False)
     # The unit ``temperature`` is expressed in ("C" or "F").
-    unit: Mapped[str] = mapped_column(String, nullable=False, default="F")
+    unit: Mapped[str] = mapped_column(_TEMPERATURE_UNIT, nullable=False, default="F")
     location: Mapped[str | None] = mapped_column(
-        String, nullable=True
+        _TEMPERATURE_LOCATION, nullable=True
     )  # rectal, oral, axillary, temporal
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     child_id: Mapped[int | None] = _child_fk()
@@ -142,7 +247,10 @@ class TemperatureReading(Base):
 
     __table_args__ = (
         Index("idx_temperature_timestamp", "timestamp"),
-        Index("idx_temperature_child", "child_id"),
+        Index("idx_temperature_child_timestamp", "child_id", "timestamp"),
+        _TEMPERATURE_UNIT.check("unit"),
+        _TEMPERATURE_LOCATION.check("location"),
+        _NO_ID_REUSE,
     )
 
 
@@ -152,3 +260,244 @@ class SavedMedication(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
     created_at: Mapped[datetime] = mapped_column(_TZ_DATETIME, default=_utcnow)
+
+
+class IdempotencyKey(Base):
+    """A client's key for a create in ``POST /api/batch``, and the log it made.
+
+    The web client queues logs while offline and sends each with a fresh key.
+    If a response is lost and the batch is sent again, the key finds the log
+    the first attempt made rather than adding it twice.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    log_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(_TZ_DATETIME, nullable=False, default=_utcnow)
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+
+# Both name lookups are case-insensitive -- "Tylenol" and "tylenol" are one
+# medication -- so they are indexed under NOCASE, which lets the autocomplete's
+# prefix range scan and the usage join seek rather than scan.  The NOCASE
+# unique index is what actually keeps saved names unique ignoring case; the
+# column's own ``unique`` is the older, case-sensitive constraint.
+Index("idx_saved_medication_name", SavedMedication.name.collate("NOCASE"), unique=True)
+Index("idx_medication_name", Medication.medication_name.collate("NOCASE"))
+
+
+# --- Full-text search ---
+#
+# One FTS5 index over the free text of every log: notes everywhere, plus the
+# medication name.  Virtual tables and triggers are outside what
+# ``create_all`` manages, so ``create_search_index`` builds them -- hooked onto
+# ``create_all`` below for new tables, and re-run by ``_run_migrations`` for
+# existing ones.
+#
+# A log's FTS rowid packs its type into the low bits (``id * 4 + kind``), so
+# one index covers all four log tables and each trigger reaches its own row
+# by rowid, which FTS5 looks up directly.  ``timestamp`` and ``child_id`` ride
+# along unindexed so results can be dated and scoped without joining back to
+# four tables.
+
+SEARCH_KINDS = ("diaper", "feeding", "medication", "temperature")
+
+# (table, expression for the indexed ``name`` column) per kind, in kind order.
+_SEARCH_SOURCES = (
+    ("diaper_changes", None),
+    ("feedings", None),
+    ("medications", "medication_name"),
+    ("temperature_readings", None),
+)
+
+
+def _search_row(kind: int, name_col: str | None, ref: str) -> tuple[str, str]:
+    """The FTS row of one log read from *ref*, and whether it has any text."""
+    name = f"{ref}.{name_col}" if name_col else "NULL"
+    values = f"{ref}.id * 4 + {kind}, {name}, {ref}.notes, {ref}.timestamp, {ref}.child_id"
+    return values, f"{ref}.notes IS NOT NULL OR {name} IS NOT NULL"
+
+
+def create_search_index(conn, tables: list[str] | None = None) -> None:
+    """Create the search index and attach it to the log tables that exist.
+
+    Idempotent.  A table whose insert trigger is missing -- never indexed, or
+    rebuilt by a migration, which drops its triggers -- has its entries
+    re-derived from scratch before the triggers go back on.  *tables* limits
+    which log tables are considered.  The caller commits.
+    """
+    conn.execute(
+        text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS log_search USING fts5("
+            "name, notes, timestamp UNINDEXED, child_id UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    )
+    insp = inspect(conn)
+    for kind, (table, name_col) in enumerate(_SEARCH_SOURCES):
+        if tables is not None and table not in tables:
+            continue
+        if not insp.has_table(table):
+            continue
+        insert_trigger = f"{table}_search_insert"
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+            {"name": insert_trigger},
+        ).first()
+        if exists:
+            continue
+        insert = "INSERT INTO log_search (rowid, name, notes, timestamp, child_id)"
+        values, has_text = _search_row(kind, name_col, table)
+        conn.execute(text(f"DELETE FROM log_search WHERE rowid % 4 = {kind}"))
+        conn.execute(text(f"{insert} SELECT {values} FROM {table} WHERE {has_text}"))
+
+        for trigger in ("delete", "update", "insert"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_search_{trigger}"))
+        values, has_text = _search_row(kind, name_col, "new")
+        insert_new = f"{insert} SELECT {values} WHERE {has_text};"
+        delete_old = f"DELETE FROM log_search WHERE rowid = old.id * 4 + {kind};"
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} "
+                f"BEGIN {delete_old} END"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {table}_search_update AFTER UPDATE ON {table} "
+                f"BEGIN {delete_old} {insert_new} END"
+            )
+        )
+        conn.execute(
+            text(f"CREATE TRIGGER {insert_trigger} AFTER INSERT ON {table} BEGIN {insert_new} END")
+        )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index_for_new_tables(target, connection, tables=(), **kw):
+    create_search_index(connection, tables=[t.name for t in tables])
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    connection.execute(text("DROP TABLE IF EXISTS log_search"))
+
+
+# --- Data version and change log ---
+#
+# A counter bumped by every write to the tables an export reads, so a file
+# derived from them (a cached export) can tell whether it is stale without
+# comparing the data itself.  Kept by triggers, like the search index, so
+# every write counts -- the API, a migration, or a sqlite3 shell alike.
+#
+# The same triggers keep ``row_changes``: one entry per row ever written,
+# holding the data version its last write produced (``seq``), when that was,
+# and whether it was a delete.  That is what an incremental export reads --
+# the rows whose ``seq`` is past the consumer's watermark, then the new
+# watermark.  A back-dated edit or a deleted log is caught like any other
+# write, which a date range on ``timestamp`` never could.  Versions rather
+# than wall-clock times, since the clock can step back and writes within one
+# millisecond would tie.
+#
+# A live row's entry is replaced by its next write, so those are bounded by
+# the tables; delete tombstones are not, and maintenance prunes the old ones
+# (``maintenance.CHANGES_RETENTION_DAYS``).  ``pruned_through`` is the newest
+# version pruned: a watermark behind it may have missed deletions.
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pruned_through: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+class RowChange(Base):
+    __tablename__ = "row_changes"
+
+    table_name: Mapped[str] = mapped_column(String, primary_key=True)
+    row_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(_TZ_DATETIME, nullable=False)
+    # A tombstone: the row is gone.  Kept so a consumer can delete its copy;
+    # replaced if SQLite hands the id out again.
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    # Keyed by the row rather than a rowid: the log is as large as the tables
+    # it covers, and this stores its key once instead of twice.
+    __table_args__ = (Index("idx_row_change_seq", "seq"), {"sqlite_with_rowid": False})
+
+
+_VERSIONED_TABLES = (
+    "children",
+    "diaper_changes",
+    "feedings",
+    "medications",
+    "temperature_readings",
+)
+
+
+def create_version_triggers(conn) -> None:
+    """Seed the data version and attach its triggers to the tables that exist.
+
+    Idempotent, so it is safe to re-run after a migration rebuilds a table
+    (which drops its triggers).  A table without them -- rebuilt, or
+    predating the change log -- first has any rows missing from
+    ``row_changes`` entered under a fresh version, so the next incremental
+    export picks them up.  The caller commits.
+    """
+    insp = inspect(conn)
+    if not insp.has_table("data_version") or not insp.has_table("row_changes"):
+        return
+    conn.execute(text("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)"))
+    bump = "UPDATE data_version SET version = version + 1 WHERE id = 1;"
+    version = "(SELECT version FROM data_version WHERE id = 1)"
+    now = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+    for table in _VERSIONED_TABLES:
+        if not insp.has_table(table):
+            continue
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+            {"name": f"{table}_change_insert"},
+        ).first()
+        if exists:
+            continue
+        conn.execute(text(bump))
+        conn.execute(
+            text(
+                "INSERT OR IGNORE INTO row_changes (table_name, row_id, seq, updated_at, deleted) "
+                f"SELECT '{table}', id, {version}, COALESCE(created_at, {now}), 0 FROM {table}"
+            )
+        )
+        # The insert trigger last: its presence is what marks the table done.
+        for op, ref, deleted in (("delete", "old", 1), ("update", "new", 0), ("insert", "new", 0)):
+            record = (
+                "INSERT OR REPLACE INTO row_changes (table_name, row_id, seq, updated_at, deleted) "
+                f"VALUES ('{table}', {ref}.id, {version}, {now}, {deleted});"
+            )
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_change_{op}"))
+            conn.execute(
+                text(
+                    f"CREATE TRIGGER {table}_change_{op} "
+                    f"AFTER {op.upper()} ON {table} BEGIN {bump} {record} END"
+                )
+            )
+
+
+def read_data_version(conn) -> int:
+    """The current data version; it only ever goes up."""
+    return conn.execute(text("SELECT version FROM data_version WHERE id = 1")).scalar_one()
+
+
+def read_pruned_through(conn) -> int:
+    """The newest data version whose delete tombstones have been pruned, or 0."""
+    return conn.execute(text("SELECT pruned_through FROM data_version WHERE id = 1")).scalar_one()
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_version_triggers(target, connection, **kw):
+    create_version_triggers(connection)
@@ -0,0 +1,359 @@
+"""Continuous WAL shipping to a replica directory, for point-in-time restore.
+
+With ``PUFFIN_REPLICA_DIR`` set -- a second disk, an NFS mount -- the app
+switches the database to WAL mode and a background thread ships every
+committed write there within about a second (``SYNC_INTERVAL``), copying only
+the WAL frames written since the last time.  The replica holds generations,
+one directory each, named by the UTC stamp at which they began::
+
+    <replica dir>/<db stem>/<stamp>/base.db[.zst|.gz]       a snapshot
+    <replica dir>/<db stem>/<stamp>/wal/<seq>-<stamp>.wal   frames, zlib'd
+
+``python -m puffin.backup restore-replica [--at TIME]`` rebuilds the
+database from the newest generation begun by *TIME*: its snapshot, with the
+frames shipped by then written over it.
+
+Frames must reach the replica before the WAL is restarted over them, so
+while replicating only the replicator checkpoints: the app's own connections
+run with ``wal_autocheckpoint=0`` (see ``database``).  It reads new frames
+holding the write lock, so none is half-written, and once
+``CHECKPOINT_PAGES`` have been shipped it checkpoints before letting go: the
+WAL then holds nothing unread to copy back, and the next write starts it
+afresh.  A generation begins whenever the replicator starts, once a day
+(``GENERATION_AGE``), and whenever it sees the WAL was restarted without it
+-- some other program checkpointed -- since frames may then be missing.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from puffin import backup
+
+logger = logging.getLogger("uvicorn.error")
+
+# Seconds between syncs: the most that can be lost with the disk.
+SYNC_INTERVAL = 1.0
+
+# Frames shipped between checkpoints, as SQLite's own wal_autocheckpoint.
+CHECKPOINT_PAGES = 1000
+
+# A generation's age, in seconds, at which the next sync starts another, so
+# a restore replays at most a day of frames.  ``KEEP_GENERATIONS`` are kept.
+GENERATION_AGE = 24 * 3600
+KEEP_GENERATIONS = 7
+
+# After a failure -- the replica disk full or unmounted -- a new generation
+# is tried again after a pause that doubles each time, up to this many
+# seconds, rather than a full snapshot attempted every second.
+RETRY_MAX = 300.0
+
+_WAL_HEADER = struct.Struct(">8I")
+_FRAME_HEADER = struct.Struct(">6I")
+
+_replicator: "Replicator | None" = None
+
+
+def directory_from_env() -> Path | None:
+    """The replica directory, or ``None`` when replication is off."""
+    raw = os.environ.get("PUFFIN_REPLICA_DIR")
+    return Path(raw) if raw else None
+
+
+def _stamp() -> str:
+    return datetime.now(UTC).strftime(backup._STAMP_FORMAT)
+
+
+def _parse_stamp(stamp: str) -> datetime | None:
+    try:
+        return datetime.strptime(stamp, backup._STAMP_FORMAT).replace(tzinfo=UTC)
+    except ValueError:
+        return None
+
+
+def _generations(replica: Path) -> list[tuple[datetime, Path]]:
+    """The complete generations in *replica*, oldest first."""
+    if not replica.is_dir():
+        return []
+    found = [(_parse_stamp(path.name), path) for path in replica.iterdir() if path.is_dir()]
+    return sorted((taken, path) for taken, path in found if taken is not None)
+
+
+def _write_durably(path: Path, data: bytes) -> None:
+    """Write *data* to *path* under a temporary name, sync it, and rename it into place."""
+    partial = path.with_name(f".{path.name}.partial")
+    with open(partial, "wb") as out:
+        out.write(data)
+        out.flush()
+        os.fsync(out.fileno())
+    partial.replace(path)
+    fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _WalGapError(Exception):
+    """The WAL was restarted by someone else: frames may have been lost."""
+
+
+class Replicator:
+    """A thread that ships the WAL of the database at *url* to *directory*."""
+
+    def __init__(self, url: str, directory, interval: float = SYNC_INTERVAL):
+        self.interval = interval
+        self.db_path = Path(make_url(url).database)
+        self.replica = Path(directory) / self.db_path.stem
+        self.wal_path = Path(f"{self.db_path}-wal")
+        # The replicator's connection, and one to hold the write lock while
+        # it reads the WAL and checkpoints (which needs no transaction open).
+        self._conn = self._connect()
+        self._lock_conn = self._connect()
+        mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if mode != "wal":
+            self._close_connections()
+            raise sqlite3.OperationalError(f"Could not switch {self.db_path} to WAL: {mode}")
+        self.generation: Path | None = None
+        self.last_sync: datetime | None = None
+        self._generation_started = 0.0
+        self._salts: tuple[int, int] | None = None
+        self._checkpoint_seq = 0
+        # Whether the replicator's own checkpoint emptied the WAL after it
+        # was last read: the only restart that cannot have lost frames.
+        self._checkpointed = False
+        self._offset = 0
+        self._segments = 0
+        self._unchecked = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="puffin-replica", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA wal_autocheckpoint = 0")
+        return conn
+
+    def _close_connections(self) -> None:
+        self._lock_conn.close()
+        self._conn.close()
+
+    def close(self) -> None:
+        """Stop the thread, shipping whatever was committed since the last sync."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        try:
+            self.sync()
+        except (sqlite3.Error, OSError):
+            logger.exception("Final WAL shipping to %s failed", self.replica)
+        self._close_connections()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sync()
+            except (sqlite3.Error, OSError):
+                logger.exception(
+                    "WAL shipping to %s failed; trying again in %.0fs", self.replica, self._backoff
+                )
+            if self._stop.wait(self.interval):
+                return
+
+    def sync(self) -> int:
+        """Ship the frames committed since the last sync; return how many."""
+        with self._lock:
+            if self.generation is None and time.monotonic() < self._retry_at:
+                # With no generation there is nothing unshipped to protect,
+                # and the replicator is the only checkpointer: without this
+                # the WAL would grow for as long as the replica is down.
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+                return 0
+            if time.monotonic() - self._generation_started > GENERATION_AGE:
+                self.generation = None
+            try:
+                try:
+                    count = self._ship()
+                except _WalGapError:
+                    logger.warning("The WAL was checkpointed behind the replicator's back")
+                    self.generation = None
+                    count = self._ship()
+            except BaseException:
+                # What was read is gone: start afresh rather than leave a hole.
+                self.generation = None
+                self._backoff = min(max(self._backoff * 2, SYNC_INTERVAL), RETRY_MAX)
+                self._retry_at = time.monotonic() + self._backoff
+                raise
+            self._backoff = 0.0
+            return count
+
+    def _ship(self) -> int:
+        if self.generation is None:
+            self._start_generation()
+        self._lock_conn.execute("BEGIN IMMEDIATE")
+        try:
+            frames, count = self._committed_frames()
+            self._unchecked += count
+            if self._unchecked >= CHECKPOINT_PAGES:
+                _, frames_left, backfilled = self._conn.execute(
+                    "PRAGMA wal_checkpoint(PASSIVE)"
+                ).fetchone()
+                # Held back by a reader, it is tried again next sync.
+                if backfilled == frames_left:
+                    self._checkpointed = True
+                    self._unchecked = 0
+        finally:
+            self._lock_conn.execute("ROLLBACK")
+        if count:
+            self._segments += 1
+            name = f"{self._segments:08d}-{_stamp()}.wal"
+            _write_durably(self.generation / "wal" / name, zlib.compress(frames))
+        self.last_sync = datetime.now(UTC)
+        return count
+
+    def _start_generation(self) -> None:
+        """Snapshot the database as the base of a new generation, and prune old ones."""
+        stamp = _stamp()
+        partial = self.replica / f".{stamp}.partial"
+        (partial / "wal").mkdir(parents=True)
+        try:
+            base = partial / "base.db"
+            backup.copy_database(self._conn, base, pages=backup._step_pages())
+            method = backup._compression()
+            if method is not None:
+                backup._compress(base, method)
+            generation = partial.rename(self.replica / stamp)
+        except BaseException:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+        self.generation = generation
+        self._generation_started = time.monotonic()
+        # Ship the whole WAL over the snapshot: frames it already holds
+        # rewrite pages with what the snapshot has, so replay is unaffected.
+        self._salts = None
+        self._checkpointed = False
+        self._segments = 0
+        logger.info("Replicating %s to %s", self.db_path, generation)
+        for _, old in _generations(self.replica)[:-KEEP_GENERATIONS]:
+            shutil.rmtree(old, ignore_errors=True)
+        for leftover in self.replica.glob(".*.partial"):
+            shutil.rmtree(leftover, ignore_errors=True)
+
+    def _committed_frames(self) -> tuple[bytes, int]:
+        """The frames committed past the last shipped one, and how many.
+
+        Called holding the write lock.  Only frames up to the last commit are
+        taken, so a transaction is shipped whole; frames from before the WAL
+        was last restarted carry the old salts and end the scan.  A restart
+        the replicator's own checkpoint did not lead to -- another program
+        checkpointed -- raises ``_WalGapError``: frames written since the
+        last read may be gone.
+        """
+        try:
+            with open(self.wal_path, "rb") as wal:
+                header = wal.read(_WAL_HEADER.size)
+                if len(header) < _WAL_HEADER.size:
+                    return b"", 0
+                _, _, page_size, seq, salt1, salt2, _, _ = _WAL_HEADER.unpack(header)
+                if (salt1, salt2) != self._salts:
+                    if self._salts is not None and (
+                        not self._checkpointed or seq != self._checkpoint_seq + 1
+                    ):
+                        raise _WalGapError
+                    self._salts, self._checkpoint_seq = (salt1, salt2), seq
+                    self._checkpointed = False
+                    self._offset = _WAL_HEADER.size
+                wal.seek(self._offset)
+                tail = wal.read()
+        except FileNotFoundError:
+            return b"", 0
+
+        frame_size = _FRAME_HEADER.size + page_size
+        end = count = committed = 0
+        for start in range(0, len(tail) - frame_size + 1, frame_size):
+            _, commit, salt1, salt2, _, _ = _FRAME_HEADER.unpack_from(tail, start)
+            if (salt1, salt2) != self._salts:
+                break
+            count += 1
+            if commit:
+                end, committed = start + frame_size, count
+        self._offset += end
+        return tail[:end], committed
+
+
+def _page_size(base: Path) -> int:
+    with backup._open_snapshot(base) as src:
+        header = src.read(100)
+    (size,) = struct.unpack_from(">H", header, 16)
+    return 65536 if size == 1 else size
+
+
+def restore_replica(directory, db_path, at: datetime | None = None) -> Path | None:
+    """``backup.restore_database`` from the replica in *directory*, as it was at *at*.
+
+    Without *at*, as of the last sync.  Raises ``LookupError`` if no
+    generation had begun by then.
+    """
+    db_path = Path(db_path)
+    replica = Path(directory) / db_path.stem
+    generations = [(t, path) for t, path in _generations(replica) if at is None or t <= at]
+    if not generations:
+        raise LookupError(f"No replica of {db_path.name} in {directory} from before {at}")
+    _, generation = generations[-1]
+    base = next(generation.glob("base.db*"))
+    segments = sorted(generation.glob("wal/*.wal"))
+    if at is not None:
+        segments = [s for s in segments if _parse_stamp(s.stem.split("-", 1)[1]) <= at]
+
+    def unpack(out):
+        with backup._open_snapshot(base) as src:
+            shutil.copyfileobj(src, out, backup._CHUNK_SIZE)
+        page_size = _page_size(base)
+        frame_size = _FRAME_HEADER.size + page_size
+        pages = None
+        for segment in segments:
+            frames = zlib.decompress(segment.read_bytes())
+            for start in range(0, len(frames), frame_size):
+                pgno, commit, *_ = _FRAME_HEADER.unpack_from(frames, start)
+                out.seek((pgno - 1) * page_size)
+                out.write(frames[start + _FRAME_HEADER.size : start + frame_size])
+                if commit:
+                    pages = commit
+        if pages is not None:
+            out.truncate(pages * page_size)
+
+    label = f"replica {generation.name} + {len(segments)} WAL segments"
+    return backup._restore(db_path, unpack, label)
+
+
+def start(url: str, directory: Path | None) -> None:
+    """Start replicating, unless *directory* is ``None``.  Called at app startup."""
+    global _replicator
+    if directory is None or _replicator is not None:
+        return
+    try:
+        _replicator = Replicator(url, directory)
+    except (sqlite3.Error, OSError):
+        logger.exception("WAL replication to %s could not start", directory)
+
+
+def stop() -> None:
+    """Ship the last writes and stop replicating.  Called at app shutdown."""
+    global _replicator
+    if _replicator is not None:
+        _replicator.close()
+        _replicator = None
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from puffin import backup_scheduler
+from puffin.schemas import BackupStatus
+
+router = APIRouter(prefix="/api/backups", tags=["backups"])
+
+
+@router.get("/status", response_model=BackupStatus)
+def get_backup_status():
+    """The scheduled backups' settings and how the last one went."""
+    return backup_scheduler.status()
@@ -0,0 +1,174 @@
+"""Several log writes in one request, for entries queued while offline.
+
+A phone that comes back online with a night's worth of entries would
+otherwise send one request per entry, each its own transaction and fsync.
+``POST /api/batch`` takes them as a list of operations and applies them
+through the same endpoint functions, in order, in one transaction.
+
+Each operation succeeds or fails on its own, as it would have as a separate
+request, and gets the status and body that request would have returned.  A
+failure is found before anything is written (validation, a missing log, an
+unknown child), so it leaves nothing to undo and the others still commit.
+
+A create may carry a ``key`` the client chose for it.  Sent again with the
+same key -- a retry after a lost response -- the create is not repeated: the
+result is the log the first one made, or a 404 if that has since been
+deleted.  Keys are remembered for ``KEY_RETENTION``.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from pydantic import ValidationError
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from puffin.database import get_db
+from puffin.models import Child, IdempotencyKey
+from puffin.routers import diapers, feedings, health
+from puffin.schemas import (
+    BatchOperation,
+    BatchResult,
+    DiaperChangeCreate,
+    DiaperChangeResponse,
+    DiaperChangeUpdate,
+    FeedingCreate,
+    FeedingResponse,
+    FeedingUpdate,
+    MedicationCreate,
+    MedicationResponse,
+    MedicationUpdate,
+    TemperatureCreate,
+    TemperatureResponse,
+    TemperatureUpdate,
+)
+from puffin.writer import grouped
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+# Operations per request: a long night offline, with room to spare.
+MAX_OPERATIONS = 500
+
+# How long a create's key is remembered.  The web client retries until it
+# hears back, and a phone can be offline for days.
+KEY_RETENTION = timedelta(days=30)
+
+# Per kind: the create/get/update/delete endpoint functions, and their schemas.
+_ENDPOINTS = {
+    "diaper": (
+        (diapers.create_diaper, diapers.get_diaper, diapers.update_diaper, diapers.delete_diaper),
+        (DiaperChangeCreate, DiaperChangeUpdate, DiaperChangeResponse),
+    ),
+    "feeding": (
+        (
+            feedings.create_feeding,
+            feedings.get_feeding,
+            feedings.update_feeding,
+            feedings.delete_feeding,
+        ),
+        (FeedingCreate, FeedingUpdate, FeedingResponse),
+    ),
+    "medication": (
+        (
+            health.create_medication,
+            health.get_medication,
+            health.update_medication,
+            health.delete_medication,
+        ),
+        (MedicationCreate, MedicationUpdate, MedicationResponse),
+    ),
+    "temperature": (
+        (
+            health.create_temperature,
+            health.get_temperature,
+            health.update_temperature,
+            health.delete_temperature,
+        ),
+        (TemperatureCreate, TemperatureUpdate, TemperatureResponse),
+    ),
+}
+
+
+@router.post("", response_model=list[BatchResult])
+@grouped
+def apply_batch(
+    operations: list[BatchOperation] = Body(..., max_length=MAX_OPERATIONS),
+    db: Session = Depends(get_db),
+):
+    # The endpoint functions commit after every write.  Run against a session
+    # joined to *db*'s transaction in "rollback_only" mode those commits only
+    # flush, and the one real commit comes at the end.  ``expire_on_commit``
+    # is off so the children loaded here stay loaded: each endpoint's
+    # ``validate_child_id`` then finds its child without a query.
+    session = Session(
+        bind=db.connection(), join_transaction_mode="rollback_only", expire_on_commit=False
+    )
+    try:
+        child_ids = {
+            op.data["child_id"] for op in operations if isinstance(op.data.get("child_id"), int)
+        }
+        # Held for the loop: the session's identity map only keeps weak references.
+        children = session.scalars(select(Child).where(Child.id.in_(child_ids))).all()
+        known = {c.id for c in children}
+        keys = {op.key for op in operations if op.key is not None}
+        used = {}
+        if keys:
+            query = select(IdempotencyKey).where(IdempotencyKey.key.in_(keys))
+            used = {k.key: k for k in session.scalars(query)}
+        results = [_apply(session, op, known, used) for op in operations]
+        session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.created_at < datetime.now(UTC) - KEY_RETENTION
+            )
+        )
+        session.flush()
+    finally:
+        session.close()
+    db.commit()
+    return results
+
+
+def _apply(
+    session: Session,
+    op: BatchOperation,
+    known_children: set[int],
+    used_keys: dict[str, IdempotencyKey],
+) -> BatchResult:
+    (create, get, update, remove), (create_schema, update_schema, response) = _ENDPOINTS[op.kind]
+    if op.op == "create" and op.key in used_keys:
+        return _replay(get, response, op, used_keys[op.key], session)
+    if op.op != "create" and op.id is None:
+        return BatchResult(status=422, detail=f"{op.op} needs the id of the {op.kind}")
+    child_id = op.data.get("child_id")
+    if isinstance(child_id, int) and child_id not in known_children:
+        return BatchResult(status=422, detail=f"Child {child_id} not found")
+    try:
+        if op.op == "delete":
+            remove(op.id, db=session)
+            return BatchResult(status=204)
+        if op.op == "create":
+            obj = create(create_schema.model_validate(op.data), db=session)
+            if op.key is not None:
+                used_keys[op.key] = IdempotencyKey(key=op.key, kind=op.kind, log_id=obj.id)
+                session.add(used_keys[op.key])
+        else:
+            obj = update(op.id, update_schema.model_validate(op.data), db=session)
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False, include_context=False, include_input=False)
+        return BatchResult(status=422, detail=errors)
+    except HTTPException as exc:
+        return BatchResult(status=exc.status_code, detail=exc.detail)
+    item = response.model_validate(obj).model_dump(mode="json")
+    return BatchResult(status=201 if op.op == "create" else 200, item=item)
+
+
+def _replay(get, response, op: BatchOperation, used: IdempotencyKey, session: Session):
+    """The result of a create whose key was seen before: the log it made."""
+    if used.kind != op.kind:
+        return BatchResult(status=422, detail=f"Key {op.key!r} was used for a {used.kind}")
+    try:
+        obj = get(used.log_id, db=session)
+    except HTTPException as exc:
+        # Made, then deleted: the retry must not bring it back.
+        return BatchResult(status=exc.status_code, detail=exc.detail)
+    return BatchResult(status=201, item=response.model_validate(obj).model_dump(mode="json"))
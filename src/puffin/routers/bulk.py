@@ -0,0 +1,51 @@
+"""Bulk edit and delete: many logs, selected by ids or a filter.
+
+Cleaning up after a mis-set child or a bad timer session one
+``PUT``/``DELETE`` at a time costs a statement and a commit per log.
+``POST /api/bulk/update`` and ``POST /api/bulk/delete`` instead take a
+selection -- ids of one kind, or any of kinds, a child and a time range --
+and run one ``UPDATE`` or ``DELETE`` per table in a single transaction,
+returning how many logs of each kind were affected.
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from puffin import crud
+from puffin.crud import UNASSIGNED, ChildFilter
+from puffin.database import get_db
+from puffin.dependencies import validate_child_id
+from puffin.schemas import BulkResult, BulkSelection, BulkUpdate
+from puffin.writer import grouped
+
+router = APIRouter(prefix="/api/bulk", tags=["bulk"])
+
+
+@router.post("/update", response_model=BulkResult)
+@grouped
+def bulk_update(data: BulkUpdate, db: Session = Depends(get_db)):
+    # Like a single update: only the fields sent are written, and an explicit
+    # null is how logs are moved back to unassigned or have notes cleared.
+    values = data.set.model_dump(include=data.set.model_fields_set)
+    if "child_id" in values:
+        validate_child_id(db, values["child_id"])
+    counts = crud.bulk_update_logs(db, values=values, **_selection(data.where))
+    return BulkResult(counts=counts, total=sum(counts.values()))
+
+
+@router.post("/delete", response_model=BulkResult)
+@grouped
+def bulk_delete(data: BulkSelection, db: Session = Depends(get_db)):
+    counts = crud.bulk_delete_logs(db, **_selection(data))
+    return BulkResult(counts=counts, total=sum(counts.values()))
+
+
+def _selection(where: BulkSelection) -> dict:
+    child: ChildFilter = UNASSIGNED if where.unassigned else where.child_id
+    return {
+        "kinds": list(dict.fromkeys(where.kinds)),
+        "ids": where.ids,
+        "child": child,
+        "start_date": where.start_date,
+        "end_date": where.end_date,
+    }
@@ -1,18 +1,48 @@
+import copy
 import csv
+import importlib.util
 import io
 import json
+import os
+import tempfile
+import threading
+import zipfile
+import zlib
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
+from itertools import chain, islice
+from operator import itemgetter
 from pathlib import Path
+from typing import BinaryIO
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from puffin import crud
+from puffin.backup import copy_database
 from puffin.crud import ChildFilter
 from puffin.database import get_db
 from puffin.dependencies import child_filter
-from puffin.schemas import DashboardSummary
+from puffin.models import (
+    Child,
+    DiaperChange,
+    Feeding,
+    Medication,
+    TemperatureReading,
+    read_data_version,
+    read_pruned_through,
+)
+from puffin.schemas import (
+    ChildrenDashboard,
+    ChildResponse,
+    DashboardSummary,
+    DiaperChangeResponse,
+    FeedingResponse,
+    MedicationResponse,
+    TemperatureResponse,
+)
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
@@ -63,12 +93,61 @@ def _register_pdf_fonts(pdf) -> str:
     through ``_latin1_safe`` before rendering.
     """
     if _FONT_REGULAR.exists() and _FONT_BOLD.exists():
-        pdf.add_font("DejaVu", "", str(_FONT_REGULAR))
-        pdf.add_font("DejaVu", "B", str(_FONT_BOLD))
+        for face, data in _parsed_pdf_fonts():
+            pdf.fonts[face.fontkey] = _pdf_font_copy(pdf, face, data)
         return "DejaVu"
     return "Helvetica"
 
 
+# The bundled faces as parsed by ``FPDF.add_font``, with their file bytes.
+# Parsing both TTFs (cmap, widths, glyph ids) took ~45 ms per export, more than
+# the rest of a small PDF; it is done once per process on the first export.
+# ``_pdf_font_copy`` relies on fpdf2's ``TTFFont`` fields, which is why
+# pyproject pins fpdf2 to the minor release it was checked against.
+_pdf_fonts: list[tuple] = []
+_pdf_fonts_lock = threading.Lock()
+
+
+def _parsed_pdf_fonts() -> list[tuple]:
+    global _pdf_fonts
+    with _pdf_fonts_lock:
+        if not _pdf_fonts:
+            from fpdf import FPDF
+
+            template = FPDF()
+            parsed = []
+            for style, path in (("", _FONT_REGULAR), ("B", _FONT_BOLD)):
+                template.add_font("DejaVu", style, str(path))
+                face = template.fonts[f"dejavu{style}"]
+                parsed.append((face, path.read_bytes()))
+            # Only a complete list is cached: a failed parse is retried next time.
+            _pdf_fonts = parsed
+    return _pdf_fonts
+
+
+def _pdf_font_copy(pdf, face, data: bytes):
+    """A per-document copy of the cached *face*, ready for ``pdf.fonts``.
+
+    The parsed tables are shared; what a document changes is not.  ``output()``
+    subsets the font's ``ttfont`` in place so that only the glyphs used are
+    embedded, so each copy gets its own, opened lazily from the cached bytes,
+    along with fresh width and subset bookkeeping.  Mirrors the fields
+    ``TTFFont.__init__`` sets up per instance.
+    """
+    from fontTools import ttLib
+    from fpdf.fonts import SubsetMap
+
+    font = copy.copy(face)
+    font.i = len(pdf.fonts) + 1
+    font.ttfont = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, lazy=True)
+    font.cw = face.cw.copy()
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    font._hbfont = None
+    font.subset = SubsetMap(font)
+    return font
+
+
 def _format_bottle_amount(amount: float | None, amount_unit: str | None) -> str:
     if amount is None or amount_unit is None:
         return ""
@@ -104,316 +183,648 @@ def get_dashboard(
     return crud.get_dashboard(db, date_str=date, child=child)
 
 
+@router.get("/dashboard/children", response_model=ChildrenDashboard)
+def get_children_dashboard(
+    date: str | None = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    db: Session = Depends(get_db),
+):
+    """Every profile's dashboard summary in one call, for side-by-side views."""
+    return crud.get_children_dashboard(db, date_str=date)
+
+
+# Media type of each export format.
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "pdf": "application/pdf",
+    "parquet": "application/zip",
+    "arrow": "application/zip",
+    "sqlite": "application/gzip",
+}
+# Formats rendered from the logs, which background export jobs can produce.
+EXPORT_FORMAT_PATTERN = "^(csv|json|ndjson|pdf|parquet|arrow)$"
+# ...plus the raw database snapshot, which is only ever a direct download.
+_DOWNLOAD_FORMAT_PATTERN = "^(csv|json|ndjson|pdf|parquet|arrow|sqlite)$"
+
+# Formats written with pyarrow, an optional dependency (``puffin[parquet]``).
+_COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+def export_filename(export_format: str) -> str:
+    """The download's file name: columnar exports are a zip of one file per table."""
+    if export_format in _COLUMNAR_FORMATS:
+        return f"puffin_export_{export_format}.zip"
+    if export_format == "sqlite":
+        return "puffin_export.db.gz"
+    return f"puffin_export.{export_format}"
+
+
+def check_export_format(export_format: str) -> None:
+    """Refuse a columnar export up front when pyarrow is not installed."""
+    if export_format in _COLUMNAR_FORMATS and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(
+            status_code=501,
+            detail=f"{export_format} export needs pyarrow (install puffin[parquet])",
+        )
+
+
 @router.get("/export")
 def export_data(
-    export_format: str = Query("csv", alias="format", pattern="^(csv|json|pdf)$"),
+    export_format: str = Query("csv", alias="format", pattern=_DOWNLOAD_FORMAT_PATTERN),
     start_date: datetime | None = Query(None),
     end_date: datetime | None = Query(None, description="Exclusive upper bound"),
     child: ChildFilter = Depends(child_filter),
     db: Session = Depends(get_db),
 ):
-    # limit=None means every matching row: an export must never silently drop
-    # the oldest records (the old fixed 10k cap did so with no indication).
-    diapers = crud.get_diapers(
-        db, start_date=start_date, end_date=end_date, limit=None, child=child
-    )
-    feedings = crud.get_feedings(
-        db, start_date=start_date, end_date=end_date, limit=None, child=child
-    )
-    medications = crud.get_medications(
-        db, start_date=start_date, end_date=end_date, limit=None, child=child
+    check_export_format(export_format)
+    if export_format == "sqlite":
+        if start_date or end_date or child is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="A database snapshot is always the whole database; "
+                "date and child filters do not apply",
+            )
+        chunks = _snapshot_chunks(db)
+    else:
+        chunks = render_export(db, export_format, start_date, end_date, child)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={export_filename(export_format)}"},
     )
-    temperatures = crud.get_temperatures(
-        db, start_date=start_date, end_date=end_date, limit=None, child=child
+
+
+@router.get("/export/changes")
+def export_changes(
+    since: int = Query(
+        0, ge=0, description="The previous sync's next_since; 0 (the default) for everything"
+    ),
+    db: Session = Depends(get_db),
+):
+    """What changed after the watermark *since*, and the watermark to use next.
+
+    For mirroring Puffin elsewhere: apply ``deleted`` first, then upsert the
+    rows by id.  Every row is sent as it is now, once however often it was
+    edited, with the ``updated_at`` of its last write.  Deletions are kept
+    for ``PUFFIN_CHANGES_RETENTION_DAYS``; a watermark older than those
+    pruned is refused with a 410, to sync again from 0.
+    """
+    until = read_data_version(db.connection())
+    if since > until:
+        raise HTTPException(
+            status_code=409,
+            detail=f"since={since} is ahead of this database (at {until}); sync again from 0",
+        )
+    pruned = read_pruned_through(db.connection())
+    if 0 < since < pruned:
+        raise HTTPException(
+            status_code=410,
+            detail=f"Deletions up to {pruned} have been pruned since {since}; sync again from 0",
+        )
+    return StreamingResponse(
+        _encoded_chunks(_changes_document(db, since, until)),
+        media_type="application/json",
+        headers={"Content-Disposition": "attachment; filename=puffin_changes.json"},
     )
 
+
+def _changes_document(db: Session, since: int, until: int) -> Iterator[str]:
+    """The incremental export: profiles and logs written in ``(since, until]``."""
+    yield f'{{\n  "since": {since},\n  "next_since": {until}'
+    sections = (("children", Child, ChildResponse),) + tuple(
+        (key, model, schema) for key, _, model, schema in _JSON_SECTIONS
+    )
+    for key, model, schema in sections:
+        yield f',\n  "{key}": ['
+        separator = "\n    "
+        rows = crud.iter_changed_rows(db, model, since, until)
+        for record in _json_rows(model, schema, rows, extra=("updated_at",)):
+            yield separator + json.dumps(record)
+            separator = ",\n    "
+        yield "\n  ]"
+    yield ',\n  "deleted": ['
+    separator = "\n    "
+    keys = {model.__tablename__: key for key, model, _ in sections}
+    for table_name, row_id, deleted_at in crud.iter_deleted_rows(db, since, until):
+        record = {"table": keys[table_name], "id": row_id}
+        yield separator + json.dumps({**record, "deleted_at": _json_timestamp(deleted_at)})
+        separator = ",\n    "
+    yield "\n  ]\n}\n"
+
+
+def _snapshot_chunks(db: Session) -> Iterator[bytes]:
+    """A consistent copy of the whole database file, gzipped as it is sent.
+
+    The copy is taken first, with SQLite's online backup a step at a time
+    (``backup.copy_database``), into a temporary file beside the database.
+    Only then does the download start, so a slow client holds no lock and
+    writes from other devices carry on throughout.  The file is unlinked as
+    soon as it is open: nothing is left behind if the client goes away.
+    """
+    database = db.get_bind().url.database
+    directory = Path(database).parent if database and database != ":memory:" else None
+    fd, path = tempfile.mkstemp(prefix=".snapshot-", suffix=".db", dir=directory)
+    os.close(fd)
+    try:
+        copy_database(db.connection().connection.driver_connection, path)
+        snapshot = open(path, "rb")  # closed by _gzip_chunks
+    finally:
+        os.unlink(path)
+    return _gzip_chunks(snapshot)
+
+
+def _gzip_chunks(snapshot: BinaryIO) -> Iterator[bytes]:
+    # Level 1: a database compresses ~8x either way, and level 6 was four
+    # times slower for about 7% less.
+    compressor = zlib.compressobj(1, wbits=31)  # wbits 31: gzip framing
+    with snapshot:
+        while block := snapshot.read(16 * _EXPORT_CHUNK_SIZE):
+            if chunk := compressor.compress(block):
+                yield chunk
+    yield compressor.flush()
+
+
+def render_export(
+    db: Session,
+    export_format: str,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """The export file as encoded chunks.
+
+    CSV, JSON and the columnar zips are generated as the iterator is consumed;
+    the PDF is laid out up front, since FPDF holds the whole document until
+    ``output()``.
+    *progress* is passed to ``crud.iter_log_rows`` for every table read.
+    Shared by the download endpoint and background export jobs.
+    """
     # A child column only earns its place when the export spans more than one
     # child.  Scoped exports are already about a single child, and installs
     # with no profiles would just get a blank column.
     child_names = {c.id: c.name for c in crud.get_children(db)}
     include_child = child is None and bool(child_names)
 
-    def child_name(obj) -> str:
-        return child_names.get(obj.child_id, _UNASSIGNED_LABEL)
-
     # Timestamps are stored in UTC; the app's UI shows them in the configured
     # local zone. The human-facing CSV and PDF exports do the same so they
     # don't contradict what the user saw when logging. (JSON stays UTC ISO-8601
     # — unambiguous and standard for machine consumption.)
     local_tz = crud.get_local_tz()
 
+    if export_format == "csv":
+        return _csv_chunks(
+            db, start_date, end_date, child, child_names, include_child, local_tz, progress
+        )
     if export_format == "json":
-        from puffin.schemas import (
-            DiaperChangeResponse,
-            FeedingResponse,
-            MedicationResponse,
-            TemperatureResponse,
+        return _encoded_chunks(
+            _json_document(db, start_date, end_date, child, child_names, include_child, progress)
         )
-
-        data = {
-            "diapers": [
-                DiaperChangeResponse.model_validate(d).model_dump(mode="json") for d in diapers
-            ],
-            "feedings": [
-                FeedingResponse.model_validate(f).model_dump(mode="json") for f in feedings
-            ],
-            "medications": [
-                MedicationResponse.model_validate(m).model_dump(mode="json") for m in medications
-            ],
-            "temperatures": [
-                TemperatureResponse.model_validate(t).model_dump(mode="json") for t in temperatures
-            ],
-        }
-        if include_child:
-            # Records carry ``child_id``; this resolves those ids to names
-            # without repeating the name on every row.
-            data["children"] = {str(cid): name for cid, name in child_names.items()}
-        content = json.dumps(data, indent=2, default=str)
-        return StreamingResponse(
-            io.BytesIO(content.encode()),
-            media_type="application/json",
-            headers={"Content-Disposition": "attachment; filename=puffin_export.json"},
+    if export_format == "ndjson":
+        return _encoded_chunks(
+            _ndjson_lines(db, start_date, end_date, child, child_names, include_child, progress)
         )
+    if export_format in _COLUMNAR_FORMATS:
+        return _columnar_chunks(
+            db, export_format, start_date, end_date, child, child_names, include_child, progress
+        )
+    return iter(
+        [
+            _pdf_bytes(
+                db, start_date, end_date, child, child_names, include_child, local_tz, progress
+            )
+        ]
+    )
 
-    if export_format == "pdf":
-        from fpdf import FPDF
-
-        class PuffinPDF(FPDF):
-            def header(self):
-                self.set_font(self.body_family, "B", 16)
-                self.cell(
-                    0, 10, "Puffin Baby Tracker Report", align="C", new_x="LMARGIN", new_y="NEXT"
-                )
-                self.set_font(self.body_family, "", 9)
-                report_range = _build_date_range_label(start_date, end_date)
-                self.cell(0, 6, report_range, align="C", new_x="LMARGIN", new_y="NEXT")
-                self.set_font(self.body_family, "", 8)
-                self.cell(
-                    0,
-                    5,
-                    f"Times shown in {self.tz_label}",
-                    align="C",
-                    new_x="LMARGIN",
-                    new_y="NEXT",
-                )
-                self.ln(3)
-
-            def footer(self):
-                self.set_y(-15)
-                # Page numbers are ASCII, so the Latin-1 core font is always safe.
-                self.set_font("Helvetica", "I", 8)
-                self.cell(0, 10, f"Page {self.page_no()}", align="C")
-
-        pdf = PuffinPDF()
-        # Fonts must be registered before add_page(), which triggers header().
-        pdf.body_family = _register_pdf_fonts(pdf)
-        pdf.sanitize = pdf.body_family == "Helvetica"
-        pdf.tz_label = str(local_tz)
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.add_page()
-
-        def with_child(headers: list[str], rows: list[list[str]], objs) -> tuple:
-            """Append a trailing Child column when the export spans children."""
-            if not include_child:
-                return headers, rows
-            return headers + ["Child"], [
-                row + [child_name(obj)] for row, obj in zip(rows, objs, strict=True)
-            ]
 
-        _pdf_section(
-            pdf,
+def _pdf_bytes(
+    db: Session,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    child_names: dict[int, str],
+    include_child: bool,
+    local_tz,
+    progress: Callable[[int], None] | None = None,
+) -> bytes:
+    from fpdf import FPDF
+
+    class PuffinPDF(FPDF):
+        def header(self):
+            self.set_font(self.body_family, "B", 16)
+            self.cell(0, 10, "Puffin Baby Tracker Report", align="C", new_x="LMARGIN", new_y="NEXT")
+            self.set_font(self.body_family, "", 9)
+            report_range = _build_date_range_label(start_date, end_date)
+            self.cell(0, 6, report_range, align="C", new_x="LMARGIN", new_y="NEXT")
+            self.set_font(self.body_family, "", 8)
+            self.cell(
+                0,
+                5,
+                f"Times shown in {self.tz_label}",
+                align="C",
+                new_x="LMARGIN",
+                new_y="NEXT",
+            )
+            self.ln(3)
+
+        def footer(self):
+            self.set_y(-15)
+            # Page numbers are ASCII, so the Latin-1 core font is always safe.
+            self.set_font("Helvetica", "I", 8)
+            self.cell(0, 10, f"Page {self.page_no()}", align="C")
+
+    pdf = PuffinPDF()
+    # Fonts must be registered before add_page(), which triggers header().
+    pdf.body_family = _register_pdf_fonts(pdf)
+    pdf.sanitize = pdf.body_family == "Helvetica"
+    pdf.tz_label = str(local_tz)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    sections = (
+        (
             "Diaper Changes",
-            *with_child(
-                ["Time", "Type", "Notes"],
-                [
-                    [
-                        _fmt_ts(d.timestamp, local_tz),
-                        str(d.type),
-                        d.notes or "",
-                    ]
-                    for d in diapers
-                ],
-                diapers,
-            ),
-        )
-
-        _pdf_section(
-            pdf,
+            DiaperChange,
+            ["Time", "Type", "Notes"],
+            lambda d: [_fmt_ts(d.timestamp, local_tz), str(d.type), d.notes or ""],
+        ),
+        (
             "Feedings",
-            *with_child(
-                ["Time", "Type", "Duration (min)", "Amount", "Notes"],
-                [
-                    [
-                        _fmt_ts(f.timestamp, local_tz),
-                        _feeding_type_label(f.feeding_type, f.bottle_type),
-                        str(f.duration_minutes) if f.duration_minutes is not None else "",
-                        _format_bottle_amount(f.amount, f.amount_unit),
-                        f.notes or "",
-                    ]
-                    for f in feedings
-                ],
-                feedings,
-            ),
-        )
-
-        _pdf_section(
-            pdf,
+            Feeding,
+            ["Time", "Type", "Duration (min)", "Amount", "Notes"],
+            lambda f: [
+                _fmt_ts(f.timestamp, local_tz),
+                _feeding_type_label(f.feeding_type, f.bottle_type),
+                str(f.duration_minutes) if f.duration_minutes is not None else "",
+                _format_bottle_amount(f.amount, f.amount_unit),
+                f.notes or "",
+            ],
+        ),
+        (
             "Medications",
-            *with_child(
-                ["Time", "Medication", "Dosage", "Notes"],
-                [
-                    [
-                        _fmt_ts(m.timestamp, local_tz),
-                        m.medication_name,
-                        f"{m.dosage_quantity:.2f} {m.dosage_unit}",
-                        m.notes or "",
-                    ]
-                    for m in medications
-                ],
-                medications,
-            ),
-        )
-
-        _pdf_section(
-            pdf,
+            Medication,
+            ["Time", "Medication", "Dosage", "Notes"],
+            lambda m: [
+                _fmt_ts(m.timestamp, local_tz),
+                m.medication_name,
+                f"{m.dosage_quantity:.2f} {m.dosage_unit}",
+                m.notes or "",
+            ],
+        ),
+        (
             "Temperature Readings",
-            *with_child(
-                ["Time", "Temp", "Location", "Notes"],
-                [
-                    [
-                        _fmt_ts(t.timestamp, local_tz),
-                        _fmt_temperature(t),
-                        str(t.location) if t.location else "",
-                        t.notes or "",
-                    ]
-                    for t in temperatures
-                ],
-                temperatures,
-            ),
-        )
-
-        pdf_bytes = pdf.output()
-        return StreamingResponse(
-            io.BytesIO(bytes(pdf_bytes)),
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=puffin_export.pdf"},
-        )
-
-    # CSV export
+            TemperatureReading,
+            ["Time", "Temp", "Location", "Notes"],
+            lambda t: [
+                _fmt_ts(t.timestamp, local_tz),
+                _fmt_temperature(t),
+                str(t.location) if t.location else "",
+                t.notes or "",
+            ],
+        ),
+    )
+    for title, model, headers, cells in sections:
+        records = crud.iter_log_rows(db, model, start_date, end_date, child, progress)
+        if include_child:
+            # A trailing Child column when the export spans children.
+            headers = headers + ["Child"]
+            rows = (cells(r) + [child_names.get(r.child_id, _UNASSIGNED_LABEL)] for r in records)
+        else:
+            rows = (cells(r) for r in records)
+        _pdf_section(pdf, title, headers, rows)
+
+    return bytes(pdf.output())
+
+
+# One (title, model, columns) entry per CSV section, in file order.  Cells are
+# the row's attributes verbatim, except the datetime columns in _CSV_TIMESTAMPS.
+_CSV_SECTIONS = (
+    ("Diaper Changes", DiaperChange, ["id", "timestamp", "type", "notes", "created_at"]),
+    (
+        "Feedings",
+        Feeding,
+        [
+            "id",
+            "timestamp",
+            "feeding_type",
+            "duration_minutes",
+            "amount",
+            "amount_unit",
+            "notes",
+            "session_id",
+            "bottle_type",
+            "created_at",
+        ],
+    ),
+    (
+        "Medications",
+        Medication,
+        [
+            "id",
+            "timestamp",
+            "medication_name",
+            "dosage_quantity",
+            "dosage_unit",
+            "notes",
+            "created_at",
+        ],
+    ),
+    (
+        "Temperature Readings",
+        TemperatureReading,
+        ["id", "timestamp", "temperature", "unit", "location", "notes", "created_at"],
+    ),
+)
+_CSV_TIMESTAMPS = {"timestamp", "created_at"}
+
+# Encoded bytes buffered before a chunk is handed to the response.
+_EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _csv_chunks(
+    db: Session,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    child_names: dict[int, str],
+    include_child: bool,
+    local_tz,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """Yield the CSV export as encoded chunks, reading each table as it goes.
+
+    Rows come from ``crud.iter_log_rows`` a batch at a time and are written
+    out before the next batch is fetched, so neither the rows nor the file are
+    ever held whole: memory and time to first byte stay flat however long
+    the history is.
+    """
     output = io.StringIO()
     writer = csv.writer(output)
 
-    def header(cols: list[str]) -> list[str]:
-        return cols + ["child"] if include_child else cols
-
-    def row(cells: list, obj) -> list:
-        return cells + [child_name(obj)] if include_child else cells
+    def flush() -> bytes:
+        chunk = output.getvalue().encode()
+        output.seek(0)
+        output.truncate()
+        return chunk
 
     def ts(value: datetime | None) -> str:
         # Local ISO-8601 with offset (e.g. 2026-07-19T14:30:00-04:00): matches
         # the time the UI showed, and the offset keeps it unambiguous.
         return value.astimezone(local_tz).isoformat() if value else ""
 
-    writer.writerow(["--- Diaper Changes ---"])
-    writer.writerow(header(["id", "timestamp", "type", "notes", "created_at"]))
-    for d in diapers:
-        writer.writerow(row([d.id, ts(d.timestamp), d.type, d.notes, ts(d.created_at)], d))
-
-    writer.writerow([])
-    writer.writerow(["--- Feedings ---"])
-    writer.writerow(
-        header(
-            [
-                "id",
-                "timestamp",
-                "feeding_type",
-                "duration_minutes",
-                "amount",
-                "amount_unit",
-                "notes",
-                "session_id",
-                "bottle_type",
-                "created_at",
+    for index, (title, model, columns) in enumerate(_CSV_SECTIONS):
+        if index:
+            writer.writerow([])
+        writer.writerow([f"--- {title} ---"])
+        writer.writerow(columns + ["child"] if include_child else columns)
+        for record in crud.iter_log_rows(db, model, start_date, end_date, child, progress):
+            cells = [
+                ts(getattr(record, col)) if col in _CSV_TIMESTAMPS else getattr(record, col)
+                for col in columns
             ]
-        )
-    )
-    for f in feedings:
-        writer.writerow(
-            row(
-                [
-                    f.id,
-                    ts(f.timestamp),
-                    f.feeding_type,
-                    f.duration_minutes,
-                    f.amount,
-                    f.amount_unit,
-                    f.notes,
-                    f.session_id,
-                    f.bottle_type,
-                    ts(f.created_at),
-                ],
-                f,
-            )
-        )
+            if include_child:
+                cells.append(child_names.get(record.child_id, _UNASSIGNED_LABEL))
+            writer.writerow(cells)
+            if output.tell() >= _EXPORT_CHUNK_SIZE:
+                yield flush()
+    yield flush()
+
+
+# One (document key, NDJSON kind, model, response schema) entry per JSON
+# section.  The schema only names the fields; rows are not validated through
+# it, which is most of the cost of dumping a long history.
+_JSON_SECTIONS = (
+    ("diapers", "diaper", DiaperChange, DiaperChangeResponse),
+    ("feedings", "feeding", Feeding, FeedingResponse),
+    ("medications", "medication", Medication, MedicationResponse),
+    ("temperatures", "temperature", TemperatureReading, TemperatureResponse),
+)
+
+
+def _json_timestamp(value: datetime | None) -> str | None:
+    """A stored UTC datetime as Pydantic's ``mode="json"`` writes it (``...Z``)."""
+    return value.isoformat().replace("+00:00", "Z") if value else None
+
+
+def _json_records(
+    db: Session,
+    model,
+    schema,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[dict]:
+    """*schema*'s fields for each row, ready for ``json.dumps``.
+
+    Enums are ``str`` and numbers are already JSON-native, so only the
+    datetime fields need converting.  Values are picked by position: a
+    ``getattr`` per field per row was the largest single cost.
+    """
+    rows = crud.iter_log_rows(db, model, start_date, end_date, child, progress)
+    yield from _json_rows(model, schema, rows)
 
-    writer.writerow([])
-    writer.writerow(["--- Medications ---"])
-    writer.writerow(
-        header(
-            [
-                "id",
-                "timestamp",
-                "medication_name",
-                "dosage_quantity",
-                "dosage_unit",
-                "notes",
-                "created_at",
-            ]
-        )
-    )
-    for m in medications:
-        writer.writerow(
-            row(
-                [
-                    m.id,
-                    ts(m.timestamp),
-                    m.medication_name,
-                    m.dosage_quantity,
-                    m.dosage_unit,
-                    m.notes,
-                    ts(m.created_at),
-                ],
-                m,
-            )
-        )
 
-    writer.writerow([])
-    writer.writerow(["--- Temperature Readings ---"])
-    writer.writerow(
-        header(["id", "timestamp", "temperature", "unit", "location", "notes", "created_at"])
-    )
-    for t in temperatures:
-        writer.writerow(
-            row(
-                [
-                    t.id,
-                    ts(t.timestamp),
-                    t.temperature,
-                    t.unit,
-                    t.location,
-                    t.notes,
-                    ts(t.created_at),
-                ],
-                t,
-            )
-        )
+def _json_rows(model, schema, rows: Iterable[Row], extra: tuple[str, ...] = ()) -> Iterator[dict]:
+    """Shape *rows* of *model*'s table (plus *extra* datetime columns) as records."""
+    fields = [*schema.model_fields, *extra]
+    columns = [*(c.name for c in model.__table__.columns), *extra]
+    pick = itemgetter(*(columns.index(field) for field in fields))
+    stamps = [f for f, info in schema.model_fields.items() if info.annotation is datetime]
+    stamps.extend(extra)
+    for row in rows:
+        record = dict(zip(fields, pick(row), strict=True))
+        for field in stamps:
+            record[field] = _json_timestamp(record[field])
+        yield record
+
+
+def _json_document(
+    db: Session,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    child_names: dict[int, str],
+    include_child: bool,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[str]:
+    """The JSON export, one record per line, written as the rows are read.
+
+    Same document as before streaming: the four lists, then the ``children``
+    lookup when the export spans profiles.
+    """
+    yield "{"
+    for index, (key, _, model, schema) in enumerate(_JSON_SECTIONS):
+        yield f'{"," if index else ""}\n  "{key}": ['
+        separator = "\n    "
+        for record in _json_records(db, model, schema, start_date, end_date, child, progress):
+            yield separator + json.dumps(record)
+            separator = ",\n    "
+        yield "\n  ]"
+    if include_child:
+        # Records carry ``child_id``; this resolves those ids to names
+        # without repeating the name on every row.
+        names = {str(cid): name for cid, name in child_names.items()}
+        yield f',\n  "children": {json.dumps(names)}'
+    yield "\n}\n"
+
+
+def _ndjson_lines(
+    db: Session,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    child_names: dict[int, str],
+    include_child: bool,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[str]:
+    """The export as one compact JSON record per line, tagged with its kind.
+
+    Profiles come first (``"kind": "child"``) when the export spans them, so a
+    consumer can resolve ``child_id`` as it reads.
+    """
+    if include_child:
+        for cid, name in child_names.items():
+            yield json.dumps({"kind": "child", "id": cid, "name": name}) + "\n"
+    for _, kind, model, schema in _JSON_SECTIONS:
+        for record in _json_records(db, model, schema, start_date, end_date, child, progress):
+            yield json.dumps({"kind": kind, **record}) + "\n"
+
+
+def _encoded_chunks(parts: Iterable[str]) -> Iterator[bytes]:
+    """Join *parts* into encoded chunks of about ``_EXPORT_CHUNK_SIZE`` bytes."""
+    pending: list[str] = []
+    size = 0
+    for part in parts:
+        pending.append(part)
+        size += len(part)
+        if size >= _EXPORT_CHUNK_SIZE:
+            yield "".join(pending).encode()
+            pending, size = [], 0
+    yield "".join(pending).encode()
+
+
+# Rows per Arrow record batch, which is also a Parquet row group.  The rows
+# of one batch are held as Python tuples while it is converted; 50,000 was no
+# faster and doubled peak memory.
+_COLUMNAR_BATCH = 10_000
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only, unseekable file whose bytes are collected by ``drain()``.
+
+    ``zipfile`` writes to it as a stream (sizes go in data descriptors), so
+    the zip can be sent as each table is written instead of assembled first.
+    """
 
-    content = output.getvalue()
-    return StreamingResponse(
-        io.BytesIO(content.encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=puffin_export.csv"},
-    )
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_field(pa, column):
+    """The Arrow field for a table *column*, typed from its SQLAlchemy type."""
+    kind = column.type
+    if hasattr(kind, "members"):
+        # ``models._EnumCode``: dictionary-encoded over the enum's fixed members,
+        # so every batch shares one dictionary (the Arrow IPC file format
+        # cannot replace it mid-file).
+        arrow_type = pa.dictionary(pa.int8(), pa.string())
+    else:
+        arrow_type = {
+            datetime: pa.timestamp("us", tz="UTC"),
+            int: pa.int64(),
+            float: pa.float64(),
+            str: pa.string(),
+        }[getattr(kind, "impl", kind).python_type]
+    return pa.field(column.name, arrow_type, nullable=column.nullable)
+
+
+def _arrow_array(pa, field, column, values):
+    if not pa.types.is_dictionary(field.type):
+        return pa.array(values, type=field.type)
+    members = column.type.members
+    codes = {member: code for code, member in enumerate(members)}
+    indices = pa.array([None if v is None else codes[v] for v in values], type=pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, pa.array([m.value for m in members]))
+
+
+def _columnar_chunks(
+    db: Session,
+    export_format: str,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    child: ChildFilter,
+    child_names: dict[int, str],
+    include_child: bool,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """A zip of one typed Parquet (or Arrow IPC) file per log table.
+
+    Each table is read ``_COLUMNAR_BATCH`` rows at a time, converted to an
+    Arrow record batch and written before the next is fetched, so memory is
+    bounded by one batch however long the history is.  Timestamps are UTC
+    timestamp columns and enum columns are dictionary-encoded.  A
+    ``children`` table resolves ``child_id`` when the export spans profiles,
+    as in the JSON export.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def open_writer(sink, schema):
+        if export_format == "parquet":
+            return pq.ParquetWriter(sink, schema)
+        return pa.ipc.new_file(sink, schema)
+
+    def write(writer, batch):
+        if export_format == "parquet":
+            writer.write_batch(batch, row_group_size=len(batch))
+        else:
+            writer.write_batch(batch)
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for key, _, model, _ in _JSON_SECTIONS:
+            columns = list(model.__table__.columns)
+            schema = pa.schema([_arrow_field(pa, c) for c in columns])
+            rows = crud.iter_log_rows(db, model, start_date, end_date, child, progress)
+            # force_zip64: the member's size is not known until it is written.
+            with archive.open(f"{key}.{export_format}", "w", force_zip64=True) as member:
+                writer = open_writer(member, schema)
+                while batch := list(islice(rows, _COLUMNAR_BATCH)):
+                    arrays = [
+                        _arrow_array(pa, field, column, values)
+                        for field, column, values in zip(
+                            schema, columns, zip(*batch, strict=True), strict=True
+                        )
+                    ]
+                    write(writer, pa.record_batch(arrays, schema=schema))
+                    yield sink.drain()
+                writer.close()
+            yield sink.drain()
+        if include_child:
+            children = pa.table(
+                {"id": list(child_names), "name": list(child_names.values())},
+                schema=pa.schema([("id", pa.int64()), ("name", pa.string())]),
+            )
+            with archive.open(f"children.{export_format}", "w") as member:
+                writer = open_writer(member, children.schema)
+                writer.write_table(children)
+                writer.close()
+    yield sink.drain()
 
 
 def _fmt_ts(ts: datetime, tz) -> str:
@@ -436,7 +847,7 @@ def _build_date_range_label(start: datetime | None, end: datetime | None) -> str
     return "All records"
 
 
-def _pdf_section(pdf, title: str, headers: list[str], rows: list[list[str]]) -> None:
+def _pdf_section(pdf, title: str, headers: list[str], rows: Iterable[list[str]]) -> None:
     """Render a titled table section into the PDF."""
     family = pdf.body_family
 
@@ -446,7 +857,10 @@ def _pdf_section(pdf, title: str, headers: list[str], rows: list[list[str]]) ->
     pdf.cell(0, 8, title, fill=True, new_x="LMARGIN", new_y="NEXT")
     pdf.ln(1)
 
-    if not rows:
+    # Rows may be a lazy generator, so peek rather than test its truthiness.
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
         # "No records" is ASCII, so the core italic font is always safe here.
         pdf.set_font("Helvetica", "I", 9)
         pdf.cell(0, 6, "No records", new_x="LMARGIN", new_y="NEXT")
@@ -470,7 +884,7 @@ def _pdf_section(pdf, title: str, headers: list[str], rows: list[list[str]]) ->
     pdf.set_font(family, "", 8)
     fill = False
     pdf.set_fill_color(245, 248, 255)
-    for row in rows:
+    for row in chain([first], rows):
         # Truncate long cells with an ellipsis so a cut is visible (the full
         # text remains in the CSV/JSON exports).
         cells = [_truncate_cell(str(v)) for v in row]
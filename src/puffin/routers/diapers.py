@@ -8,11 +8,13 @@ from puffin.crud import ChildFilter
 from puffin.database import get_db
 from puffin.dependencies import child_filter, validate_child_id
 from puffin.schemas import DiaperChangeCreate, DiaperChangeResponse, DiaperChangeUpdate, PeriodStats
+from puffin.writer import grouped
 
 router = APIRouter(prefix="/api/diapers", tags=["diapers"])
 
 
 @router.post("", response_model=DiaperChangeResponse, status_code=201)
+@grouped
 def create_diaper(data: DiaperChangeCreate, db: Session = Depends(get_db)):
     validate_child_id(db, data.child_id)
     return crud.create_diaper(
@@ -55,6 +57,7 @@ def get_diaper(diaper_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{diaper_id}", response_model=DiaperChangeResponse)
+@grouped
 def update_diaper(diaper_id: int, data: DiaperChangeUpdate, db: Session = Depends(get_db)):
     updates = {}
     if data.timestamp is not None:
@@ -75,6 +78,7 @@ def update_diaper(diaper_id: int, data: DiaperChangeUpdate, db: Session = Depend
 
 
 @router.delete("/{diaper_id}", status_code=204)
+@grouped
 def delete_diaper(diaper_id: int, db: Session = Depends(get_db)):
     if not crud.delete_diaper(db, diaper_id):
         raise HTTPException(status_code=404, detail="Diaper change not found")
@@ -0,0 +1,99 @@
+import re
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from puffin import crud, export_jobs
+from puffin.crud import ChildFilter
+from puffin.database import get_db
+from puffin.dependencies import child_filter
+from puffin.models import read_data_version
+from puffin.routers.dashboard import (
+    EXPORT_FORMAT_PATTERN,
+    EXPORT_MEDIA_TYPES,
+    check_export_format,
+    export_filename,
+)
+from puffin.schemas import ExportJob
+
+router = APIRouter(prefix="/api/exports", tags=["exports"])
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _export_dir(db: Session) -> Path:
+    """Where this database's exports are kept, beside the database file."""
+    database = db.get_bind().url.database
+    if not database or database == ":memory:":
+        raise HTTPException(
+            status_code=409, detail="Background exports need a file-backed database"
+        )
+    return export_jobs.export_dir(database)
+
+
+def _job_id(job_id: str) -> str:
+    # Job ids name files on disk, so only ever accept the shape we hand out.
+    if not _JOB_ID.match(job_id):
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job_id
+
+
+@router.post("", response_model=ExportJob, status_code=202)
+def create_export(
+    export_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    start_date: datetime | None = Query(None),
+    end_date: datetime | None = Query(None, description="Exclusive upper bound"),
+    child: ChildFilter = Depends(child_filter),
+    db: Session = Depends(get_db),
+):
+    """Start rendering an export in the background and return its job.
+
+    Takes the same parameters as ``GET /api/export``.  Repeating a request
+    while its export is still current returns the finished job straight away.
+    """
+    check_export_format(export_format)
+    directory = _export_dir(db)
+    request = export_jobs.ExportRequest(export_format, start_date, end_date, child)
+    key = export_jobs.submit(
+        db.get_bind().url.render_as_string(False),
+        directory,
+        request,
+        read_data_version(db.connection()),
+        str(crud.get_local_tz()),
+    )
+    return export_jobs.status(directory, key)
+
+
+@router.get("/{job_id}", response_model=ExportJob)
+def get_export(job_id: str = Depends(_job_id), db: Session = Depends(get_db)):
+    job = export_jobs.status(_export_dir(db), job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+
+@router.get("/{job_id}/file")
+def download_export(job_id: str = Depends(_job_id), db: Session = Depends(get_db)):
+    """The finished file.  Byte ranges are honoured, so downloads can resume."""
+    directory = _export_dir(db)
+    path = export_jobs.artifact_path(directory, job_id)
+    if path is None:
+        if export_jobs.status(directory, job_id) is None:
+            raise HTTPException(status_code=404, detail="Export not found")
+        raise HTTPException(status_code=409, detail="Export is not finished")
+    export_format = path.suffix[1:]
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        filename=export_filename(export_format),
+    )
+
+
+@router.delete("/{job_id}", status_code=204)
+def delete_export(job_id: str = Depends(_job_id), db: Session = Depends(get_db)):
+    """Cancel a pending export, or delete a finished one."""
+    if not export_jobs.cancel(_export_dir(db), job_id):
+        raise HTTPException(status_code=404, detail="Export not found")
@@ -8,11 +8,13 @@ from puffin.crud import ChildFilter
 from puffin.database import get_db
 from puffin.dependencies import child_filter, validate_child_id
 from puffin.schemas import FeedingCreate, FeedingResponse, FeedingUpdate, PeriodStats
+from puffin.writer import grouped
 
 router = APIRouter(prefix="/api/feedings", tags=["feedings"])
 
 
 @router.post("", response_model=FeedingResponse, status_code=201)
+@grouped
 def create_feeding(data: FeedingCreate, db: Session = Depends(get_db)):
     validate_child_id(db, data.child_id)
     return crud.create_feeding(
@@ -60,16 +62,21 @@ def get_feeding(feeding_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{feeding_id}", response_model=FeedingResponse)
+@grouped
 def update_feeding(feeding_id: int, data: FeedingUpdate, db: Session = Depends(get_db)):
-    existing = crud.get_feeding(db, feeding_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Feeding not found")
-    target_type = data.feeding_type.value if data.feeding_type else existing.feeding_type
-    if target_type == "bottle" and (data.amount is None) != (data.amount_unit is None):
-        raise HTTPException(
-            status_code=422,
-            detail="Bottle feeds require amount and amount_unit together",
-        )
+    if (data.amount is None) != (data.amount_unit is None):
+        # Only a bottle needs both, and only then is the stored type wanted.
+        target_type = data.feeding_type.value if data.feeding_type else None
+        if target_type is None:
+            existing = crud.get_feeding(db, feeding_id)
+            if not existing:
+                raise HTTPException(status_code=404, detail="Feeding not found")
+            target_type = existing.feeding_type
+        if target_type == "bottle":
+            raise HTTPException(
+                status_code=422,
+                detail="Bottle feeds require amount and amount_unit together",
+            )
     updates = {}
     if data.timestamp is not None:
         updates["timestamp"] = data.timestamp
@@ -90,10 +97,14 @@ def update_feeding(feeding_id: int, data: FeedingUpdate, db: Session = Depends(g
     if "child_id" in data.model_fields_set:
         validate_child_id(db, data.child_id)
         updates["child_id"] = data.child_id
-    return crud.update_feeding(db, feeding_id, **updates)
+    obj = crud.update_feeding(db, feeding_id, **updates)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Feeding not found")
+    return obj
 
 
 @router.delete("/{feeding_id}", status_code=204)
+@grouped
 def delete_feeding(feeding_id: int, db: Session = Depends(get_db)):
     if not crud.delete_feeding(db, feeding_id):
         raise HTTPException(status_code=404, detail="Feeding not found")
@@ -17,6 +17,7 @@ from puffin.schemas import (
     TemperatureUpdate,
     _temperature_in_range,
 )
+from puffin.writer import grouped
 
 router = APIRouter(tags=["health"])
 
@@ -25,6 +26,7 @@ router = APIRouter(tags=["health"])
 
 
 @router.post("/api/medications", response_model=MedicationResponse, status_code=201)
+@grouped
 def create_medication(data: MedicationCreate, db: Session = Depends(get_db)):
     validate_child_id(db, data.child_id)
     result = crud.create_medication(
@@ -41,8 +43,16 @@ def create_medication(data: MedicationCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/api/medications/saved-names", response_model=list[str])
-def list_saved_medication_names(db: Session = Depends(get_db)):
-    return crud.get_saved_medications(db)
+def list_saved_medication_names(
+    prefix: str | None = Query(
+        None, description="Search names starting with this, ranked by use; omit for all A→Z"
+    ),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results for a prefix search"),
+    db: Session = Depends(get_db),
+):
+    if prefix is None:
+        return crud.get_saved_medications(db)
+    return crud.search_saved_medications(db, prefix.strip(), limit)
 
 
 @router.get("/api/medications", response_model=list[MedicationResponse])
@@ -76,6 +86,7 @@ def get_medication(medication_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/api/medications/{medication_id}", response_model=MedicationResponse)
+@grouped
 def update_medication(medication_id: int, data: MedicationUpdate, db: Session = Depends(get_db)):
     updates = {}
     if data.timestamp is not None:
@@ -100,6 +111,7 @@ def update_medication(medication_id: int, data: MedicationUpdate, db: Session =
 
 
 @router.delete("/api/medications/{medication_id}", status_code=204)
+@grouped
 def delete_medication(medication_id: int, db: Session = Depends(get_db)):
     if not crud.delete_medication(db, medication_id):
         raise HTTPException(status_code=404, detail="Medication record not found")
@@ -109,6 +121,7 @@ def delete_medication(medication_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/api/temperatures", response_model=TemperatureResponse, status_code=201)
+@grouped
 def create_temperature(data: TemperatureCreate, db: Session = Depends(get_db)):
     validate_child_id(db, data.child_id)
     return crud.create_temperature(
@@ -145,15 +158,15 @@ def get_temperature(temp_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/api/temperatures/{temp_id}", response_model=TemperatureResponse)
+@grouped
 def update_temperature(temp_id: int, data: TemperatureUpdate, db: Session = Depends(get_db)):
-    existing = crud.get_temperature(db, temp_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Temperature reading not found")
-
     # A partial update may change the value or the unit independently, so
     # range-check the resulting (value, unit) pair against the existing row.
-    # (The schema validator only covers the case where both are supplied.)
-    if data.temperature is not None or data.unit is not None:
+    # (The schema validator covers the case where both are supplied.)
+    if (data.temperature is None) != (data.unit is None):
+        existing = crud.get_temperature(db, temp_id)
+        if not existing:
+            raise HTTPException(status_code=404, detail="Temperature reading not found")
         eff_temp = data.temperature if data.temperature is not None else existing.temperature
         eff_unit = data.unit.value if data.unit is not None else existing.unit
         if not _temperature_in_range(eff_temp, eff_unit):
@@ -184,6 +197,7 @@ def update_temperature(temp_id: int, data: TemperatureUpdate, db: Session = Depe
 
 
 @router.delete("/api/temperatures/{temp_id}", status_code=204)
+@grouped
 def delete_temperature(temp_id: int, db: Session = Depends(get_db)):
     if not crud.delete_temperature(db, temp_id):
         raise HTTPException(status_code=404, detail="Temperature reading not found")
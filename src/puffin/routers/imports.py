@@ -0,0 +1,312 @@
+"""Bulk import: Puffin's own exports back in, or a simple CSV from elsewhere.
+
+``POST /api/import`` takes an uploaded file in one of:
+
+* ``json`` / ``ndjson`` -- Puffin's JSON and NDJSON exports (and the JSON of
+  ``/api/export/changes``);
+* ``csv`` -- Puffin's CSV export, or a generic CSV: a header row, then one
+  log per row.  A ``kind`` column says what each row is (``diaper``,
+  ``feeding``, ``medication`` or ``temperature``); the other columns are the
+  fields that kind's ``POST`` endpoint takes, blank for none.  An optional
+  ``child`` column names the profile a row belongs to.
+
+Every row is validated with its ``POST`` endpoint's schema.  Rows that fail
+are skipped and reported by position; the rest are inserted ``_BATCH`` at a
+time, one ``executemany`` per table and one transaction per batch, instead
+of a commit and refresh per row.  Ids in the file are not kept -- rows are
+added alongside what is already here -- and children are matched to
+profiles by name, creating any that are missing.  A timestamp without an
+offset is local time.  ``dry_run`` checks everything and writes nothing.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import PurePath
+from typing import BinaryIO
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+
+from puffin import crud
+from puffin.database import get_db
+from puffin.dependencies import validate_child_id
+from puffin.models import DiaperChange, Feeding, Medication, TemperatureReading
+from puffin.schemas import (
+    DiaperChangeCreate,
+    FeedingCreate,
+    ImportResult,
+    ImportRowError,
+    MedicationCreate,
+    TemperatureCreate,
+)
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+# Rows per transaction.  Larger batches were no faster: the time goes on
+# validation and the per-row triggers, not on commits.
+_BATCH = 5000
+
+# Row errors listed in the response; the rest are only counted.
+_MAX_ERRORS = 100
+
+# Each kind's table and the schema its ``POST`` endpoint validates with.
+_KINDS = {
+    "diaper": (DiaperChange, DiaperChangeCreate),
+    "feeding": (Feeding, FeedingCreate),
+    "medication": (Medication, MedicationCreate),
+    "temperature": (TemperatureReading, TemperatureCreate),
+}
+
+# How the exports name each kind: JSON document keys and CSV section titles.
+_JSON_KEYS = {
+    "diapers": "diaper",
+    "feedings": "feeding",
+    "medications": "medication",
+    "temperatures": "temperature",
+}
+_CSV_TITLES = {
+    "Diaper Changes": "diaper",
+    "Feedings": "feeding",
+    "Medications": "medication",
+    "Temperature Readings": "temperature",
+}
+
+_FORMATS = {".csv": "csv", ".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# (position in the file, kind, fields) for each log read from it.
+_Record = tuple[int, str | None, dict]
+
+# What the CSV export writes in its child column for a log with no profile.
+_UNASSIGNED_LABEL = "Unassigned"
+
+
+@router.post("", response_model=ImportResult)
+def import_data(
+    file: UploadFile = File(...),
+    import_format: str | None = Query(
+        None,
+        alias="format",
+        pattern="^(csv|json|ndjson)$",
+        description="Defaults to the file's extension",
+    ),
+    child_id: int | None = Query(None, description="Assign every imported log to this child"),
+    dry_run: bool = Query(False, description="Validate only; write nothing"),
+    db: Session = Depends(get_db),
+):
+    import_format = import_format or _FORMATS.get(PurePath(file.filename or "").suffix.lower())
+    if import_format is None:
+        raise HTTPException(status_code=422, detail="Give a format: csv, json or ndjson")
+    validate_child_id(db, child_id)
+
+    children = _Children(db, dry_run)
+    if import_format == "json":
+        records = _json_records(file.file, children)
+    elif import_format == "ndjson":
+        records = _ndjson_records(file.file, children)
+    else:
+        records = _csv_records(file.file)
+
+    local_tz = crud.get_local_tz()
+    imported = dict.fromkeys(_KINDS, 0)
+    errors: list[ImportRowError] = []
+    failed = 0
+    pending: dict[type, list[dict]] = {}
+    batched = 0
+    try:
+        for row, kind, record in records:
+            try:
+                values = _log_values(kind, record, children, child_id, local_tz)
+            except ValueError as exc:
+                failed += 1
+                if len(errors) < _MAX_ERRORS:
+                    errors.append(ImportRowError(row=row, kind=kind, message=_message(exc)))
+                continue
+            imported[kind] += 1
+            if dry_run:
+                continue
+            pending.setdefault(_KINDS[kind][0], []).append(values)
+            batched += 1
+            if batched >= _BATCH:
+                crud.insert_logs(db, pending)
+                pending, batched = {}, 0
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Not UTF-8 text; {sum(imported.values())} rows before it were read",
+        ) from None
+    if pending:
+        crud.insert_logs(db, pending)
+
+    return ImportResult(
+        dry_run=dry_run,
+        imported=imported,
+        children_created=children.created,
+        failed=failed,
+        errors=errors,
+    )
+
+
+class _Children:
+    """Resolves the children a file refers to into profiles here.
+
+    Exports identify a log's child by the exporting database's id, with a
+    separate id-to-name list, or (CSV) by name.  Names are what carry over
+    between databases, so they are matched; an id the file does not name is
+    taken to be an id here.
+    """
+
+    def __init__(self, db: Session, dry_run: bool):
+        self.db = db
+        self.dry_run = dry_run
+        profiles = crud.get_children(db)
+        self.ids = {c.id for c in profiles}
+        self.by_name: dict[str, int | None] = {c.name: c.id for c in profiles}
+        self.file_names: dict[str, str] = {}  # the file's child ids -> names
+        self.created: list[str] = []
+
+    def named(self, name: str | None) -> int | None:
+        if not name or name == _UNASSIGNED_LABEL:
+            return None
+        if name not in self.by_name:
+            self.created.append(name)
+            # A dry run only reports the profile it would create.
+            self.by_name[name] = None if self.dry_run else crud.create_child(self.db, name).id
+        return self.by_name[name]
+
+    def resolve(self, record: dict) -> int | None:
+        if "child" in record:
+            return self.named(record["child"])
+        source_id = record.get("child_id")
+        if source_id is None:
+            return None
+        if str(source_id) in self.file_names:
+            return self.named(self.file_names[str(source_id)])
+        try:
+            local_id = int(source_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"child_id {source_id!r} is not a number") from None
+        if local_id not in self.ids:
+            raise ValueError(f"Child {local_id} not found")
+        return local_id
+
+
+def _log_values(
+    kind: str | None, record, children: _Children, child_id: int | None, local_tz
+) -> dict:
+    """The column values to insert for one record, or ``ValueError`` saying why not."""
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    if kind not in _KINDS:
+        raise ValueError(f"unknown kind {kind!r}")
+    schema = _KINDS[kind][1]
+    if not record.get("timestamp"):
+        # The API fills in "now"; for a log from the past that would be wrong.
+        raise ValueError("timestamp is required")
+    data = schema.model_validate({**record, "child_id": None})
+    values = data.model_dump()
+    values["child_id"] = child_id if child_id is not None else children.resolve(record)
+    values["timestamp"] = _aware(data.timestamp, local_tz)
+    created_at = record.get("created_at")
+    try:
+        values["created_at"] = _aware(datetime.fromisoformat(created_at), local_tz)
+    except (TypeError, ValueError):
+        values["created_at"] = datetime.now(UTC)
+    return values
+
+
+def _aware(value: datetime, local_tz) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=local_tz)
+
+
+def _message(exc: ValueError) -> str:
+    errors = getattr(exc, "errors", None)
+    if errors is None:
+        return str(exc)
+    # A pydantic ValidationError: one "field: problem" per failed field.
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"] for e in errors()
+    )
+
+
+def _text(upload: BinaryIO) -> io.TextIOWrapper:
+    # utf-8-sig: spreadsheets often start a saved CSV with a byte-order mark.
+    return io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+
+
+def _json_records(upload: BinaryIO, children: _Children) -> Iterator[_Record]:
+    try:
+        document = json.load(_text(upload))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise HTTPException(status_code=422, detail=f"Not a JSON document: {exc}") from None
+    if not isinstance(document, dict):
+        raise HTTPException(status_code=422, detail="Expected a Puffin JSON export")
+    if "next_since" in document:
+        # Its rows are edits to logs that already exist, and it lists deletions:
+        # imported as new logs it would duplicate every edited one.
+        raise HTTPException(
+            status_code=422,
+            detail="This is a changes export (/api/export/changes); import a full JSON export",
+        )
+    names = document.get("children") or {}
+    children.file_names.update({str(cid): name for cid, name in names.items()})
+    for key, kind in _JSON_KEYS.items():
+        for position, record in enumerate(document.get(key) or [], start=1):
+            yield position, kind, record
+
+
+def _ndjson_records(upload: BinaryIO, children: _Children) -> Iterator[_Record]:
+    for line_number, line in enumerate(_text(upload), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, None, None
+            continue
+        kind = record.pop("kind", None) if isinstance(record, dict) else None
+        if kind == "child":
+            children.file_names[str(record.get("id"))] = record.get("name")
+            continue
+        yield line_number, kind, record
+
+
+def _csv_records(upload: BinaryIO) -> Iterator[_Record]:
+    """Rows of either CSV layout, with blank cells as ``None``.
+
+    The export is told apart by its first line, a ``--- Section ---`` title;
+    within it each section is a title, a header row, its rows, and a blank.
+    """
+    reader = csv.reader(_text(upload))
+    header = next(reader, None)
+    if not header:
+        return
+    sectioned = header[0].startswith("--- ")
+    if not sectioned and "kind" not in header:
+        raise HTTPException(
+            status_code=422,
+            detail="Expected a Puffin CSV export, or a CSV with a 'kind' column",
+        )
+    kind = _section_kind(header[0]) if sectioned else None
+    columns = None if sectioned else header
+    for cells in reader:
+        if sectioned:
+            if not any(cells):
+                columns = None
+                continue
+            if cells[0].startswith("--- "):
+                kind = _section_kind(cells[0])
+                continue
+            if columns is None:
+                columns = cells
+                continue
+        record = {name: value or None for name, value in zip(columns, cells, strict=False)}
+        yield reader.line_num, kind if sectioned else record.pop("kind", None), record
+
+
+def _section_kind(title: str) -> str:
+    # An unknown title is passed through, so its rows fail as an unknown kind.
+    name = title.strip("- ")
+    return _CSV_TITLES.get(name, name)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from puffin import crud
+from puffin.crud import ChildFilter
+from puffin.database import get_db
+from puffin.dependencies import child_filter
+from puffin.schemas import SearchResult
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("", response_model=list[SearchResult])
+def search(
+    q: str = Query(..., min_length=1, description="Words to find in notes and medication names"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    child: ChildFilter = Depends(child_filter),
+    db: Session = Depends(get_db),
+):
+    return crud.search_logs(db, q, limit=limit, offset=offset, child=child)
@@ -2,7 +2,7 @@ import math
 from datetime import datetime
 from decimal import Decimal
 from enum import StrEnum
-from typing import Self
+from typing import Any, Literal, Self
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
@@ -354,3 +354,156 @@ class DashboardSummary(BaseModel):
     last_feeding: FeedingResponse | None = None
     last_temperature: TemperatureResponse | None = None
     recent_activities: list[ActivityItem] = []
+
+
+class ChildDashboard(BaseModel):
+    child_id: int | None
+    name: str
+    diaper_stats: PeriodStats
+    feeding_stats: PeriodStats
+    medication_count_today: int = 0
+    last_diaper: DiaperChangeResponse | None = None
+    last_feeding: FeedingResponse | None = None
+    last_temperature: TemperatureResponse | None = None
+
+
+class ChildrenDashboard(BaseModel):
+    children: list[ChildDashboard]
+    unassigned: ChildDashboard | None = None
+    unassigned_count: int = 0
+
+
+# --- Search Schemas ---
+
+
+class SearchResult(BaseModel):
+    type: str
+    id: int
+    timestamp: datetime
+    snippet: str
+
+
+# --- Export Job Schemas ---
+
+
+class ExportJob(BaseModel):
+    id: str
+    format: str
+    status: str  # queued, running, done, failed, cancelled
+    rows_done: int = 0
+    rows_total: int | None = None
+    download_url: str | None = None
+    error: str | None = None
+
+
+# --- Backup Schemas ---
+
+
+class BackupRun(BaseModel):
+    started_at: datetime
+    duration_seconds: float
+    outcome: str  # done, skipped, failed
+    detail: str  # the snapshot or incremental stamp, or why it was skipped
+
+
+class BackupStatus(BaseModel):
+    enabled: bool  # PUFFIN_BACKUP_INTERVAL_MINUTES is set
+    mode: str | None = None  # snapshot or incremental
+    interval_minutes: float | None = None
+    running: bool = False
+    last_run: BackupRun | None = None
+
+
+# --- Import Schemas ---
+
+
+class ImportRowError(BaseModel):
+    row: int  # line in a CSV or NDJSON file; 1-based position in its list in JSON
+    kind: str | None = None
+    message: str
+
+
+class ImportResult(BaseModel):
+    dry_run: bool
+    imported: dict[str, int]  # per log kind; what would be imported on a dry run
+    children_created: list[str] = []
+    failed: int = 0
+    errors: list[ImportRowError] = []  # the first _MAX_ERRORS of ``failed``
+
+
+# --- Batch Schemas ---
+
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    kind: Literal["diaper", "feeding", "medication", "temperature"]
+    id: int | None = None  # the log to update or delete
+    data: dict[str, Any] = {}  # the create or update request body
+    # Chosen by the client for a create: sent again, the create is not repeated.
+    key: str | None = Field(None, min_length=1, max_length=100)
+
+
+class BatchResult(BaseModel):
+    status: int  # what the single-log endpoint would have answered
+    item: dict[str, Any] | None = None
+    detail: Any = None
+
+
+# --- Bulk Edit Schemas ---
+
+LogKind = Literal["diaper", "feeding", "medication", "temperature"]
+
+# Ids per bulk request; SQLite binds each as its own parameter.
+_MAX_BULK_IDS = 5000
+
+
+class BulkSelection(BaseModel):
+    """The logs a bulk edit or delete applies to.
+
+    Every criterion given must match.  At least one of ``ids``, a child or a
+    time bound is required, so an empty body cannot select every log.
+    """
+
+    kinds: list[LogKind] = ["diaper", "feeding", "medication", "temperature"]
+    ids: list[int] | None = Field(None, max_length=_MAX_BULK_IDS)  # of a single kind
+    child_id: int | None = None
+    unassigned: bool = False  # logs belonging to no child; wins over child_id
+    start_date: datetime | None = None
+    end_date: datetime | None = None  # exclusive
+
+    @model_validator(mode="after")
+    def _check_selection(self) -> Self:
+        if self.ids is not None and len(set(self.kinds)) != 1:
+            raise ValueError("ids need exactly one kind")
+        if (
+            self.ids is None
+            and self.child_id is None
+            and not self.unassigned
+            and self.start_date is None
+            and self.end_date is None
+        ):
+            raise ValueError("Select logs by ids, child_id, unassigned, start_date or end_date")
+        return self
+
+
+class BulkChanges(BaseModel):
+    """Fields every selected log shares.  An explicit null clears the field."""
+
+    child_id: int | None = None
+    notes: str | None = None
+
+    @model_validator(mode="after")
+    def _check_changes(self) -> Self:
+        if not self.model_fields_set:
+            raise ValueError("Nothing to change")
+        return self
+
+
+class BulkUpdate(BaseModel):
+    where: BulkSelection
+    set: BulkChanges
+
+
+class BulkResult(BaseModel):
+    counts: dict[str, int]  # per log kind
+    total: int = 0
@@ -0,0 +1,216 @@
+"""Group commit: one writer thread, one commit for a burst of writes.
+
+Every log write commits on its own, and with SQLite's default
+``synchronous=FULL`` each commit waits for the disk -- several fsyncs in
+rollback-journal mode.  On an SD card or a NAS volume that is tens of
+milliseconds a log, and concurrent writers queue for the file lock to pay it
+one after another.
+
+With ``PUFFIN_GROUP_COMMIT_MS`` set, the log write endpoints (the ones
+decorated with ``@grouped``) instead hand their work to a single writer
+thread.  It takes the first write waiting, keeps collecting for that many
+milliseconds or until ``MAX_GROUP`` have arrived, and runs them in one
+transaction with one commit.  Each write runs in its own savepoint, so one
+that fails -- a 404, a validation error -- is rolled back alone and its
+caller gets the error, while the rest commit.  Callers hear back only once
+the group's commit is on disk; if that commit fails, every write in the
+group fails with it.
+
+Unset, the default, writes commit on the request's own connection.  ``0``
+groups only the writes already queued when the writer is free, adding no
+wait.
+"""
+
+import functools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from puffin.database import _enable_foreign_keys, _leave_checkpoints_to_replica
+
+logger = logging.getLogger("uvicorn.error")
+
+# Writes per transaction.  A burst larger than this is committed in several.
+MAX_GROUP = 64
+
+# How long a request waits for its write before giving up with a 503.  Far
+# more than a group takes even on a slow card; reached only if the writer
+# is stuck.
+SUBMIT_TIMEOUT = 30.0
+
+_writer: "GroupCommitWriter | None" = None
+
+
+def window_from_env() -> float | None:
+    """The collection window in seconds, or ``None`` when group commit is off."""
+    raw = os.environ.get("PUFFIN_GROUP_COMMIT_MS")
+    if not raw:
+        return None
+    try:
+        return max(float(raw), 0.0) / 1000
+    except ValueError:
+        logger.warning("Ignoring PUFFIN_GROUP_COMMIT_MS=%r: not a number", raw)
+        return None
+
+
+def _manual_transactions(dbapi_connection, connection_record):
+    # pysqlite's own transaction handling would let the first SAVEPOINT
+    # start -- and its RELEASE commit -- the transaction.  Hand BEGIN to
+    # SQLAlchemy instead (see ``_begin_immediate``).
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(conn):
+    # IMMEDIATE takes the write lock up front: a group never gets halfway
+    # through and then waits for another connection's write to finish.
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+class GroupCommitWriter:
+    """A thread that runs queued writes in groups, one transaction per group."""
+
+    def __init__(self, url: str, window: float, max_group: int = MAX_GROUP):
+        self.window = window
+        self.max_group = max_group
+        self.engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", _enable_foreign_keys)
+        event.listen(self.engine, "connect", _leave_checkpoints_to_replica)
+        event.listen(self.engine, "connect", _manual_transactions)
+        event.listen(self.engine, "begin", _begin_immediate)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="puffin-writer", daemon=True)
+        self._thread.start()
+
+    def on_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, work):
+        """Run ``work(session)`` in the next group; return its result once committed.
+
+        Raises whatever *work* raised, or the group's commit error; a 503
+        when the writer thread has stopped or does not get to *work* within
+        ``SUBMIT_TIMEOUT``.
+        """
+        if not self._thread.is_alive():
+            raise HTTPException(status_code=503, detail="The database writer is not running")
+        future: Future = Future()
+        self._queue.put((work, future))
+        try:
+            return future.result(timeout=SUBMIT_TIMEOUT)
+        except TimeoutError:
+            # Cancelled, the writer skips it; already running, it may yet commit.
+            future.cancel()
+            raise HTTPException(
+                status_code=503, detail="Timed out waiting for the database writer"
+            ) from None
+
+    def close(self) -> None:
+        """Finish the writes already queued, then stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self.engine.dispose()
+
+    def _run(self) -> None:
+        try:
+            self._loop()
+        except BaseException as exc:
+            logger.exception("The group commit writer stopped")
+            self._fail_queued(exc)
+
+    def _fail_queued(self, exc: BaseException) -> None:
+        # Nobody is left to run them: fail them now rather than at the timeout.
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job[1].set_running_or_notify_cancel():
+                job[1].set_exception(exc)
+
+    def _loop(self) -> None:
+        with self.engine.connect() as conn:
+            while True:
+                first = self._queue.get()
+                if first is None:
+                    return
+                group = [first]
+                deadline = time.monotonic() + self.window
+                stopping = False
+                while len(group) < self.max_group:
+                    try:
+                        job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stopping = True
+                        break
+                    group.append(job)
+                self._commit(conn, group)
+                if stopping:
+                    return
+
+    def _commit(self, conn, group) -> None:
+        results = []
+        try:
+            with conn.begin():
+                for work, future in group:
+                    if not future.set_running_or_notify_cancel():
+                        continue  # its caller gave up waiting
+                    # Its own savepoint: the endpoint's commits release it,
+                    # and an error rolls back this write alone.
+                    session = Session(
+                        bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False
+                    )
+                    try:
+                        results.append((future, work(session)))
+                    except Exception as exc:
+                        future.set_exception(exc)
+                    finally:
+                        session.close()
+        except Exception as exc:
+            logger.error("Group commit of %d writes failed: %r", len(results), exc)
+            for future, _ in results:
+                future.set_exception(exc)
+            return
+        for future, result in results:
+            future.set_result(result)
+
+
+def start(url: str, window: float | None) -> None:
+    """Start the writer thread, unless *window* is ``None``.  Called at app startup."""
+    global _writer
+    if window is not None and _writer is None:
+        _writer = GroupCommitWriter(url, window)
+
+
+def stop() -> None:
+    """Stop the writer thread, if running.  Called at app shutdown."""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def grouped(endpoint):
+    """Run a write endpoint on the writer thread while group commit is on.
+
+    The endpoint is called as usual, with the writer's session as its
+    ``db``.  Calls already on the writer thread -- ``/api/batch`` applying
+    its operations -- run in place.
+    """
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, db: Session, **kwargs):
+        writer = _writer
+        if writer is None or writer.on_writer_thread():
+            return endpoint(*args, db=db, **kwargs)
+        return writer.submit(lambda session: endpoint(*args, db=session, **kwargs))
+
+    return wrapper
@@ -86,7 +86,6 @@ onModalOpen = (id) => {
     } else if (id === 'diaper-modal') {
         loadNoteSuggestions('/api/diapers', 'diaper-note-suggestions', 'diaper-notes');
     } else if (id === 'health-modal') {
-        loadSavedMedNames();
         loadMedDosageMap();
         loadNoteSuggestions('/api/medications', 'med-note-suggestions', 'med-notes');
         loadNoteSuggestions('/api/temperatures', 'temp-note-suggestions', 'temp-notes');
@@ -494,7 +493,7 @@ async function endTimer() {
             return;
         }
         const sessionId = activeSides.length > 1 ? generateUUID() : null;
-        const promises = [];
+        const feedings = [];
         for (const [side, totalMs] of activeSides) {
             const durationMinutes = Math.max(1, Math.round(totalMs / 60000));
             const body = {
@@ -505,9 +504,9 @@ async function endTimer() {
                 child_id: state.childId ?? null,
             };
             if (sessionId) body.session_id = sessionId;
-            promises.push(api.post('/api/feedings', body));
+            feedings.push(body);
         }
-        await Promise.all(promises);
+        await queueLogs(feedings.map(data => ({ kind: 'feeding', data })));
 
         localStorage.removeItem(TIMER_KEY);
         showTimerUI();
@@ -526,7 +525,6 @@ async function endTimer() {
             });
             showToast(`Feeding logged: ${parts.join(' + ')}`);
         }
-        reloadAfterLogChange();
     } catch (e) {
         confirmBtn.disabled = false;
         showToast('Error saving feeding: ' + e.message);
@@ -730,15 +728,17 @@ function initFeedingForm() {
 }
 
 /* ===== Medication Autocomplete ===== */
-let savedMedNames = []; // sorted A→Z from /api/medications/saved-names
 let medDosageMap = {};  // name -> { dosage_quantity, dosage_unit } from recent logs
+let medSearchSeq = 0;   // bumps per keystroke so a slow, stale response can't overwrite a newer one
 
-async function loadSavedMedNames() {
+// Saved names are searched server-side: the server ranks prefix matches by
+// how often and how recently each was logged, with an exact match first.
+async function searchSavedMedNames(query) {
     try {
-        savedMedNames = await api.get('/api/medications/saved-names');
+        return await api.get(`/api/medications/saved-names?prefix=${encodeURIComponent(query)}`);
     } catch (e) {
-        console.error('Failed to load saved medication names:', e);
-        savedMedNames = [];
+        console.error('Failed to search saved medication names:', e);
+        return [];
     }
 }
 
@@ -799,15 +799,12 @@ function selectMedName(name) {
     }
 }
 
-function renderMedDropdown(query) {
+async function renderMedDropdown(query) {
     const dropdown = document.getElementById('med-dropdown');
+    const seq = ++medSearchSeq;
+    const matches = await searchSavedMedNames(query.trim());
+    if (seq !== medSearchSeq) return;
     const q = query.trim().toLowerCase();
-    let matches;
-    if (q === '') {
-        matches = savedMedNames;
-    } else {
-        matches = savedMedNames.filter(n => n.toLowerCase().includes(q));
-    }
 
     const items = [];
     for (const name of matches) {
@@ -815,7 +812,7 @@ function renderMedDropdown(query) {
     }
 
     // Show "+ Add" only when query is non-empty and no exact case-insensitive match exists
-    const hasExact = savedMedNames.some(n => n.toLowerCase() === q);
+    const hasExact = matches.some(n => n.toLowerCase() === q);
     if (q !== '' && !hasExact) {
         items.push(`<div class="med-dropdown-item add-new" role="option" data-add="${escapeAttr(query.trim())}">+ Add &ldquo;${escapeHtml(query.trim())}&rdquo;</div>`);
     }
@@ -891,6 +888,193 @@ async function loadNoteSuggestions(endpoint, containerId, textareaId) {
     }
 }
 
+/* ===== Outbox ===== */
+// New logs are saved on the device first and sent in the background, so a
+// log tapped in a dead spot is not lost and a form never waits on the
+// network. Each queued log carries a key generated here, and POST /api/batch
+// remembers the keys it has seen: a batch sent again after a lost response
+// logs nothing twice. The queue is kept in IndexedDB, so it survives a reload
+// or a closed tab; where IndexedDB is unavailable it lasts as long as the page.
+const OUTBOX_DB_NAME = 'puffin';
+const OUTBOX_STORE = 'outbox';
+const OUTBOX_BATCH = 500;       // operations per request: the server's cap
+const OUTBOX_RETRY_MS = 30000;  // after a failed send; coming back online retries at once
+const OUTBOX_RETRY_MAX_MS = 600000;  // the longest wait while the server keeps failing
+let outboxItems = [];           // queued logs, oldest first: { key, kind, data, queuedAt }
+let outboxDb = null;            // promise of the IDBDatabase, or of null without one
+let outboxFlush = null;         // the send in progress, if any
+let outboxRetry = null;
+let outboxRetryMs = OUTBOX_RETRY_MS;  // doubles with each server error in a row
+
+function openOutbox() {
+    if (outboxDb) return outboxDb;
+    outboxDb = new Promise((resolve) => {
+        if (typeof indexedDB === 'undefined') { resolve(null); return; }
+        const req = indexedDB.open(OUTBOX_DB_NAME, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(OUTBOX_STORE, { keyPath: 'key' });
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => {
+            console.error('Outbox storage unavailable, queueing in memory:', req.error);
+            resolve(null);
+        };
+    });
+    return outboxDb;
+}
+
+/** Run `fn(store)` in one outbox transaction; resolves with its request's result once committed. */
+async function outboxTransaction(mode, fn) {
+    const db = await openOutbox();
+    if (!db) return undefined;
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(OUTBOX_STORE, mode);
+        const req = fn(tx.objectStore(OUTBOX_STORE));
+        tx.oncomplete = () => resolve(req ? req.result : undefined);
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+    });
+}
+
+/** Pick up logs a previous visit queued but never sent. */
+async function loadOutbox() {
+    try {
+        const stored = await outboxTransaction('readonly', store => store.getAll());
+        if (!stored) return;
+        const inMemory = new Set(outboxItems.map(i => i.key));
+        outboxItems = [...stored.filter(i => !inMemory.has(i.key)), ...outboxItems]
+            .sort((a, b) => a.queuedAt - b.queuedAt);
+    } catch (err) {
+        console.error('Failed to read the outbox:', err);
+    }
+}
+
+/**
+ * Queue new logs and start sending them.
+ *
+ * `entries` are `{ kind, data }`, where `data` is the body the kind's POST
+ * endpoint takes. A log without a timestamp is stamped now -- not whenever
+ * the server finally receives it. Resolves once the logs are stored on the
+ * device; rejects only if they could not be.
+ */
+async function queueLogs(entries) {
+    const queuedAt = Date.now();
+    const items = entries.map(({ kind, data }) => ({
+        key: generateUUID(),
+        kind,
+        data: { ...data, timestamp: data.timestamp || new Date(queuedAt).toISOString() },
+        queuedAt,
+    }));
+    await outboxTransaction('readwrite', store => { items.forEach(item => store.put(item)); });
+    outboxItems.push(...items);
+    renderTimeline();
+    flushOutbox();
+}
+
+/** Send the queue, unless a send is already under way; resolves when it is done. */
+function flushOutbox() {
+    if (!outboxFlush) {
+        outboxFlush = sendOutbox().finally(() => { outboxFlush = null; });
+    }
+    return outboxFlush;
+}
+
+function reportRejected(item, detail) {
+    const message = Array.isArray(detail) ? detail.map(e => e.msg).join('; ') : detail;
+    console.error(`Outbox ${item.kind} rejected:`, message, item.data);
+    showToast(`Couldn't save ${item.kind}: ${message}`);
+}
+
+async function sendOutbox() {
+    clearTimeout(outboxRetry);
+    let sent = 0;
+    let batchSize = OUTBOX_BATCH;
+    while (outboxItems.length) {
+        const batch = outboxItems.slice(0, batchSize);
+        let results;
+        try {
+            results = await api.post('/api/batch', batch.map(item => ({
+                op: 'create', kind: item.kind, key: item.key, data: item.data,
+            })));
+        } catch (err) {
+            if (err.status >= 400 && err.status < 500) {
+                // The server refused the request as a whole. Halve the batch
+                // until the log it chokes on is alone, then drop that one.
+                if (batch.length > 1) {
+                    batchSize = Math.ceil(batch.length / 2);
+                    continue;
+                }
+                results = [{ status: err.status, detail: err.detail || err.message }];
+            } else if (err.status) {
+                // A server error: keep everything, and wait longer each time in a row.
+                console.error(`Outbox send failed (${err.status}), retrying in ${outboxRetryMs / 1000}s:`, err);
+                outboxRetry = setTimeout(flushOutbox, outboxRetryMs);
+                outboxRetryMs = Math.min(outboxRetryMs * 2, OUTBOX_RETRY_MAX_MS);
+                break;
+            } else {
+                // Offline, or the server is unreachable: keep everything and retry.
+                console.error('Outbox send failed, will retry:', err);
+                outboxRetry = setTimeout(flushOutbox, OUTBOX_RETRY_MS);
+                break;
+            }
+        }
+        outboxRetryMs = OUTBOX_RETRY_MS;
+        batch.forEach((item, i) => {
+            const { status, detail } = results[i];
+            // A 404 is a log that was saved, then deleted before we heard back.
+            if (status < 400 || status === 404) return;
+            // Rejected outright (a 422): sending it again would fail the same way.
+            reportRejected(item, detail);
+        });
+        const done = new Set(batch.map(item => item.key));
+        outboxItems = outboxItems.filter(item => !done.has(item.key));
+        sent += batch.length;
+        try {
+            await outboxTransaction('readwrite', store => { batch.forEach(item => store.delete(item.key)); });
+        } catch (err) {
+            // Left in storage they are sent again next visit; their keys make that harmless.
+            console.error('Failed to clear sent logs from the outbox:', err);
+        }
+    }
+    if (sent) reloadAfterLogChange();
+}
+
+// The labels /api/activities gives feedings; getActivityLabel() swaps in
+// the breast names set in Settings.
+const FEEDING_LABELS = { breast_left: 'Left Breast', breast_right: 'Right Breast', bottle: 'Bottle' };
+
+function formatBottleAmount(amount, unit) {
+    return unit === 'mL' ? `${amount.toFixed(0)} mL` : `${amount.toFixed(2)} oz`;
+}
+
+/** The viewed day's queued logs, shaped like /api/activities items. */
+function pendingActivities() {
+    return outboxItems
+        .filter(item => isSameDay(new Date(item.data.timestamp), currentDate))
+        .filter(item => selectedChild === null || (item.data.child_id ?? null) === currentChildId())
+        .map(({ kind, data }) => {
+            const activity = { type: kind, timestamp: data.timestamp, notes: data.notes, detail: '' };
+            if (kind === 'diaper') {
+                Object.assign(activity, { emoji: '🧷', label: `Diaper: ${data.type}` });
+            } else if (kind === 'feeding') {
+                const bottle = data.bottle_type === 'formula' ? 'Formula' : 'Breastmilk';
+                Object.assign(activity, {
+                    emoji: data.feeding_type === 'bottle' ? '🍼' : '🤱',
+                    subtype: data.feeding_type,
+                    label: FEEDING_LABELS[data.feeding_type] || data.feeding_type,
+                    detail: data.amount != null && data.amount_unit
+                        ? `${bottle} · ${formatBottleAmount(data.amount, data.amount_unit)}`
+                        : data.duration_minutes ? `${data.duration_minutes} min` : '',
+                });
+            } else if (kind === 'medication') {
+                Object.assign(activity, {
+                    emoji: '💊', label: data.medication_name, detail: `${data.dosage_quantity} ${data.dosage_unit}`,
+                });
+            } else {
+                Object.assign(activity, { emoji: '🌡️', label: 'Temperature', detail: `${data.temperature}°${data.unit}` });
+            }
+            return { ...activity, pending: true };
+        });
+}
+
 /* ===== Form Submissions ===== */
 function initForms() {
     // Diaper form
@@ -904,10 +1088,9 @@ function initForms() {
         const submitBtn = e.target.querySelector('button[type="submit"]');
         submitBtn.disabled = true;
         try {
-            await api.post('/api/diapers', { type, notes, timestamp, child_id: currentChildId() });
+            await queueLogs([{ kind: 'diaper', data: { type, notes, timestamp, child_id: currentChildId() } }]);
             closeModal('diaper-modal');
             showToast('Diaper change logged!');
-            reloadAfterLogChange();
         } catch (err) {
             submitBtn.disabled = false;
             showToast('Error: ' + err.message);
@@ -936,7 +1119,7 @@ function initForms() {
                 const bottleType = document.getElementById('feeding-bottle-type-timer-select').value;
                 saveBtn.disabled = true;
                 try {
-                    await api.post('/api/feedings', {
+                    await queueLogs([{ kind: 'feeding', data: {
                         feeding_type: 'bottle',
                         amount: parseFloat(amount),
                         amount_unit: amountUnit,
@@ -944,10 +1127,9 @@ function initForms() {
                         notes,
                         timestamp,
                         child_id: currentChildId(),
-                    });
+                    } }]);
                     closeModal('feeding-modal');
                     showToast('Feeding logged!');
-                    reloadAfterLogChange();
                 } catch (err) {
                     saveBtn.disabled = false;
                     showToast('Error: ' + err.message);
@@ -976,7 +1158,7 @@ function initForms() {
 
         saveBtn.disabled = true;
         try {
-            const promises = [];
+            const feedings = [];
             let notesAttached = false;
             // Link paired breast feedings with a shared session_id
             const manualSessionId = (leftDur && rightDur) ? generateUUID() : null;
@@ -989,7 +1171,7 @@ function initForms() {
                     child_id: currentChildId(),
                 };
                 if (manualSessionId) body.session_id = manualSessionId;
-                promises.push(api.post('/api/feedings', body));
+                feedings.push(body);
                 notesAttached = true;
             }
             if (rightDur) {
@@ -1001,12 +1183,12 @@ function initForms() {
                     child_id: currentChildId(),
                 };
                 if (manualSessionId) body.session_id = manualSessionId;
-                promises.push(api.post('/api/feedings', body));
+                feedings.push(body);
                 notesAttached = true;
             }
             if (bottleAmount) {
                 const bottleType = document.getElementById('feeding-bottle-type-manual-select').value;
-                promises.push(api.post('/api/feedings', {
+                feedings.push({
                     feeding_type: 'bottle',
                     amount: parseFloat(bottleAmount),
                     amount_unit: bottleUnit,
@@ -1014,12 +1196,11 @@ function initForms() {
                     notes: notesAttached ? undefined : notes,
                     timestamp,
                     child_id: currentChildId(),
-                }));
+                });
             }
-            await Promise.all(promises);
+            await queueLogs(feedings.map(data => ({ kind: 'feeding', data })));
             closeModal('feeding-modal');
             showToast('Feeding logged!');
-            reloadAfterLogChange();
         } catch (err) {
             saveBtn.disabled = false;
             showToast('Error: ' + err.message);
@@ -1052,10 +1233,9 @@ function initForms() {
         const submitBtn = e.target.querySelector('button[type="submit"]');
         submitBtn.disabled = true;
         try {
-            await api.post('/api/medications', { medication_name: name, dosage_quantity, dosage_unit, notes, timestamp, child_id: currentChildId() });
+            await queueLogs([{ kind: 'medication', data: { medication_name: name, dosage_quantity, dosage_unit, notes, timestamp, child_id: currentChildId() } }]);
             closeModal('health-modal');
             showToast('Medication logged!');
-            reloadAfterLogChange();
         } catch (err) {
             submitBtn.disabled = false;
             showToast('Error: ' + err.message);
@@ -1076,17 +1256,16 @@ function initForms() {
         submitBtn.disabled = true;
         try {
             // Store the value as entered, in the chosen unit — no conversion.
-            await api.post('/api/temperatures', {
+            await queueLogs([{ kind: 'temperature', data: {
                 temperature: Math.round(tempValue * 10) / 10,
                 unit: unit.toUpperCase(),
                 location,
                 notes,
                 timestamp,
                 child_id: currentChildId(),
-            });
+            } }]);
             closeModal('health-modal');
             showToast('Temperature logged!');
-            reloadAfterLogChange();
         } catch (err) {
             submitBtn.disabled = false;
             showToast('Error: ' + err.message);
@@ -1608,31 +1787,48 @@ function initCalendar() {
     updateCalendarUI();
 }
 
+let dayActivities = [];          // the viewed day's activities, as last fetched
+let dayActivitiesFailed = false;
+
 async function loadDayActivities() {
-    const timeline = document.getElementById('timeline');
     try {
         const dateStr = toDateString(currentDate);
-        const activities = await api.get(`/api/activities?date=${dateStr}${childQuery()}`);
-        if (activities.length === 0) {
-            timeline.innerHTML = '<p class="empty-state">No entries for this day.</p>';
-            return;
-        }
-        timeline.innerHTML = activities.map(a => {
-            const secondaryArg = a.secondary_id != null ? `, ${a.secondary_id}` : '';
-            return `
-            <div class="timeline-item" onclick="openEditModal('${a.type}', ${a.id}${secondaryArg})">
-                <span class="timeline-emoji">${a.emoji || ''}</span>
-                <span class="timeline-label">${escapeHtml(getActivityLabel(a))}</span>
-                ${a.detail ? `<span class="timeline-detail">${escapeHtml(a.detail)}</span>` : ''}
-                <span class="timeline-time">${formatTime(a.timestamp)}</span>
-                ${a.notes ? `<div class="timeline-notes">${escapeHtml(a.notes)}</div>` : ''}
-            </div>
-        `;
-        }).join('');
+        dayActivities = await api.get(`/api/activities?date=${dateStr}${childQuery()}`);
+        dayActivitiesFailed = false;
     } catch (err) {
         console.error('Failed to load day activities:', err);
-        timeline.innerHTML = '<p class="empty-state">Failed to load activities.</p>';
+        dayActivities = [];
+        dayActivitiesFailed = true;
     }
+    renderTimeline();
+}
+
+/** The fetched activities with the outbox's unsent logs for the day merged in, newest first. */
+function renderTimeline() {
+    const timeline = document.getElementById('timeline');
+    const activities = [...pendingActivities(), ...dayActivities]
+        .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+    if (activities.length === 0) {
+        timeline.innerHTML = dayActivitiesFailed
+            ? '<p class="empty-state">Failed to load activities.</p>'
+            : '<p class="empty-state">No entries for this day.</p>';
+        return;
+    }
+    timeline.innerHTML = activities.map(a => {
+        // Not saved yet, so there is nothing to open for editing.
+        const attrs = a.pending
+            ? 'class="timeline-item pending" title="Saved on this device, waiting to sync"'
+            : `class="timeline-item" onclick="openEditModal('${a.type}', ${a.id}${a.secondary_id != null ? `, ${a.secondary_id}` : ''})"`;
+        return `
+        <div ${attrs}>
+            <span class="timeline-emoji">${a.emoji || ''}</span>
+            <span class="timeline-label">${escapeHtml(getActivityLabel(a))}</span>
+            ${a.detail ? `<span class="timeline-detail">${escapeHtml(a.detail)}</span>` : ''}
+            <span class="timeline-time">${formatTime(a.timestamp)}</span>
+            ${a.notes ? `<div class="timeline-notes">${escapeHtml(a.notes)}</div>` : ''}
+        </div>
+    `;
+    }).join('') + (dayActivitiesFailed ? '<p class="empty-state">Failed to load activities.</p>' : '');
 }
 
 /* ===== Dashboard Loading ===== */
@@ -1775,29 +1971,57 @@ function initExport() {
         const start = document.getElementById('export-start-date').value;
         const end = document.getElementById('export-end-date').value;
 
-        let url = `/api/export?format=${encodeURIComponent(fmt)}`;
-        if (start) url += `&start_date=${encodeURIComponent(start + 'T00:00:00')}`;
+        let query = `format=${encodeURIComponent(fmt)}`;
+        if (start) query += `&start_date=${encodeURIComponent(start + 'T00:00:00')}`;
         // end_date is an exclusive bound, so send the following midnight rather
         // than 23:59:59 — the latter silently dropped anything logged in the
         // final second of the chosen day.
         if (end) {
             const endExclusive = new Date(end + 'T00:00:00');
             endExclusive.setDate(endExclusive.getDate() + 1);
-            url += `&end_date=${encodeURIComponent(toDateString(endExclusive) + 'T00:00:00')}`;
+            query += `&end_date=${encodeURIComponent(toDateString(endExclusive) + 'T00:00:00')}`;
         }
 
         const childEl = document.getElementById('export-child');
         if (hasProfiles() && childEl.value !== EXPORT_ALL_CHILDREN) {
-            url += childEl.value === UNASSIGNED_VIEW
+            query += childEl.value === UNASSIGNED_VIEW
                 ? '&unassigned=true'
                 : `&child_id=${encodeURIComponent(childEl.value)}`;
         }
 
-        window.location.href = url;
         closeModal('export-modal');
+        runExportJob(query);
     });
 }
 
+const EXPORT_POLL_MS = 1000;
+
+/**
+ * Render an export in the background and download it when it is ready.
+ *
+ * A long PDF can take longer to lay out than a phone browser will wait on one
+ * request, so the server renders it as a job and we poll for progress. A
+ * repeat of an export that is still current comes back already done.
+ */
+async function runExportJob(query) {
+    try {
+        let job = await api.post(`/api/exports?${query}`);
+        while (job.status === 'queued' || job.status === 'running') {
+            const pct = job.rows_total ? Math.floor((100 * job.rows_done) / job.rows_total) : 0;
+            showToast(`Preparing export… ${pct}%`);
+            await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_MS));
+            job = await api.get(`/api/exports/${job.id}`);
+        }
+        if (job.status !== 'done') {
+            showToast(job.error ? `Export failed: ${job.error}` : 'Export cancelled');
+            return;
+        }
+        window.location.href = job.download_url;
+    } catch (err) {
+        showToast(`Export failed: ${err.message}`);
+    }
+}
+
 /* ===== Event Listeners ===== */
 document.addEventListener('DOMContentLoaded', () => {
     initTheme();
@@ -1819,6 +2043,13 @@ document.addEventListener('DOMContentLoaded', () => {
     loadChildren().then(() => {
         loadDashboard();
     });
+    // Send whatever an earlier visit queued, and again whenever the device
+    // reconnects.
+    loadOutbox().then(() => {
+        renderTimeline();
+        flushOutbox();
+    });
+    window.addEventListener('online', flushOutbox);
 
     // Theme toggle
     document.getElementById('theme-toggle').addEventListener('click', toggleTheme);
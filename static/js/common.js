@@ -36,7 +36,8 @@ const api = {
         const res = await fetch(url, opts);
         if (!res.ok && res.status !== 204) {
             const err = await res.json().catch(() => ({ detail: 'Request failed' }));
-            throw new Error(err.detail || 'Request failed');
+            // `status` tells a refused request from one that never got an answer.
+            throw Object.assign(new Error(err.detail || 'Request failed'), { status: res.status, detail: err.detail });
         }
         if (res.status === 204) return null;
         return res.json();
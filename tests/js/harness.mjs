@@ -58,6 +58,9 @@ const EXPOSED_FUNCTIONS = [
     'refreshDashboard',
     'updateCalendarUI',
     'loadChildren',
+    'queueLogs',
+    'flushOutbox',
+    'pendingActivities',
 ];
 
 // Mutable module-level `let`s tests need to drive. Exposed as getter/setters so
@@ -68,6 +71,7 @@ const EXPOSED_STATE = [
     'unassignedCount',
     'currentDate',
     'lastKnownToday',
+    'outboxItems',
 ];
 
 const EXPOSED_CONSTANTS = ['UNASSIGNED_VIEW', 'SELECTED_CHILD_KEY', 'QUICK_ADD_KEYS'];
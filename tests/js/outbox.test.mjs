@@ -0,0 +1,133 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import { loadApp } from './harness.mjs';
+
+const NOW = Date.UTC(2026, 6, 19, 12, 0, 0);
+
+// A fetch that fails like a phone with no signal until `online` is set, then
+// answers each batch with `answer(ops)`.
+function network(answer) {
+    const net = { online: false, posts: [] };
+    net.fetch = async (url, opts) => {
+        if (!net.online) throw new TypeError('Failed to fetch');
+        const ops = JSON.parse(opts.body);
+        net.posts.push({ url, ops });
+        return { ok: true, status: 200, json: async () => answer(ops) };
+    };
+    return net;
+}
+
+function loadOffline(answer) {
+    const net = network(answer);
+    const app = loadApp({ dom: true, now: NOW, fetch: net.fetch });
+    app.state.childProfiles = [];
+    let reloads = 0;
+    app.override.loadDashboard(() => { reloads += 1; });
+    return { app, net, reloads: () => reloads };
+}
+
+test('a log queued offline is kept, shown, and sent once back online', async () => {
+    const { app, net, reloads } = loadOffline((ops) => ops.map(() => ({ status: 201, item: {} })));
+
+    await app.fns.queueLogs([{ kind: 'diaper', data: { type: 'pee', child_id: null } }]);
+    await app.fns.flushOutbox();
+
+    assert.equal(app.state.outboxItems.length, 1, 'the log waits in the outbox');
+    const queued = app.state.outboxItems[0];
+    assert.equal(queued.data.timestamp, new Date(NOW).toISOString(), 'stamped when tapped, not when sent');
+    assert.match(app.document.getElementById('timeline').innerHTML, /timeline-item pending/);
+    assert.ok(app.timers.scheduled.some((t) => t.kind === 'timeout'), 'a retry is scheduled');
+    assert.equal(reloads(), 0);
+
+    net.online = true;
+    await app.fns.flushOutbox();
+
+    assert.equal(net.posts.length, 1);
+    assert.equal(net.posts[0].url, '/api/batch');
+    assert.deepEqual(net.posts[0].ops, [{ op: 'create', kind: 'diaper', key: queued.key, data: queued.data }]);
+    assert.equal(app.state.outboxItems.length, 0, 'sent logs leave the outbox');
+    assert.equal(reloads(), 1, 'the dashboard reloads to show the saved log');
+});
+
+test('a log the server rejects is dropped with a toast, and the rest are saved', async () => {
+    const { app, net } = loadOffline((ops) => ops.map((op) => (op.data.temperature > 50
+        ? { status: 422, detail: [{ loc: ['temperature'], msg: 'Input should be less than or equal to 50' }] }
+        : { status: 201, item: {} })));
+
+    await app.fns.queueLogs([
+        { kind: 'temperature', data: { temperature: 98.6, unit: 'C' } },
+        { kind: 'diaper', data: { type: 'poop' } },
+    ]);
+    await app.fns.flushOutbox(); // the attempt made while offline
+    net.online = true;
+    await app.fns.flushOutbox();
+
+    assert.equal(net.posts[0].ops.length, 2, 'both go in one request');
+    assert.notEqual(net.posts[0].ops[0].key, net.posts[0].ops[1].key, 'each log has its own key');
+    assert.equal(app.state.outboxItems.length, 0, 'a rejected log is not retried forever');
+    assert.equal(
+        app.document.getElementById('toast').textContent,
+        "Couldn't save temperature: Input should be less than or equal to 50",
+    );
+});
+
+// Answers every batch with `respond(ops)`, a { status, body } pair.
+function server(respond) {
+    const posts = [];
+    const fetch = async (url, opts) => {
+        const ops = JSON.parse(opts.body);
+        posts.push(ops);
+        const { status, body } = respond(ops);
+        return { ok: status < 400, status, json: async () => body };
+    };
+    const app = loadApp({ dom: true, now: NOW, fetch });
+    app.state.childProfiles = [];
+    app.override.loadDashboard(() => {});
+    return { app, posts };
+}
+
+test('a batch refused as a whole is split until the bad log is dropped', async () => {
+    const { app, posts } = server((ops) => (ops.some((op) => op.kind === 'bogus')
+        ? { status: 400, body: { detail: 'Unknown kind' } }
+        : { status: 200, body: ops.map(() => ({ status: 201, item: {} })) }));
+
+    await app.fns.queueLogs([
+        { kind: 'diaper', data: { type: 'pee' } },
+        { kind: 'bogus', data: {} },
+        { kind: 'diaper', data: { type: 'poop' } },
+    ]);
+    await app.fns.flushOutbox();
+
+    assert.deepEqual(posts.map((ops) => ops.length), [3, 2, 1, 1, 1]);
+    assert.equal(app.state.outboxItems.length, 0, 'the good logs are saved, the bad one dropped');
+    assert.equal(app.document.getElementById('toast').textContent, "Couldn't save bogus: Unknown kind");
+    assert.ok(!app.timers.scheduled.some((t) => t.ms === 30000), 'nothing left to retry');
+});
+
+test('server errors are retried less and less often', async () => {
+    const { app } = server(() => ({ status: 503, body: { detail: 'Service Unavailable' } }));
+
+    await app.fns.queueLogs([{ kind: 'diaper', data: { type: 'pee' } }]);
+    await app.fns.flushOutbox();
+    for (let i = 0; i < 8; i++) await app.fns.flushOutbox();
+
+    const waits = app.timers.scheduled.filter((t) => t.ms >= 30000).map((t) => t.ms);
+    assert.deepEqual(waits.slice(0, 3), [30000, 60000, 120000]);
+    assert.equal(Math.max(...waits), 600000, 'capped');
+    assert.equal(app.state.outboxItems.length, 1, 'the log is kept');
+});
+
+test('a queued feeding is labelled as the timeline labels it', async () => {
+    const { app } = loadOffline(() => []);
+    app.state.currentDate = new Date(NOW);
+    await app.fns.queueLogs([
+        { kind: 'feeding', data: { feeding_type: 'breast_left', duration_minutes: 12 } },
+        { kind: 'feeding', data: { feeding_type: 'bottle', bottle_type: 'formula', amount: 4, amount_unit: 'oz' } },
+    ]);
+
+    const [breast, bottle] = app.fns.pendingActivities();
+    assert.equal(breast.label, 'Left Breast');
+    assert.equal(breast.detail, '12 min');
+    assert.equal(bottle.label, 'Bottle');
+    assert.equal(bottle.detail, 'Formula · 4.00 oz');
+});
@@ -83,7 +83,7 @@ test('endTimer logs a real session and reports it', async () => {
     const posts = [];
     const fetch = async (url, opts) => {
         posts.push({ url, body: JSON.parse(opts.body) });
-        return { ok: true, status: 201, json: async () => ({}) };
+        return { ok: true, status: 200, json: async () => [{ status: 201, item: {} }] };
     };
     const app = loadApp({
         dom: true,
@@ -99,10 +99,12 @@ test('endTimer logs a real session and reports it', async () => {
     await app.fns.endTimer();
 
     assert.equal(posts.length, 1, 'one feeding is posted');
-    assert.equal(posts[0].url, '/api/feedings');
-    assert.equal(posts[0].body.feeding_type, 'breast_left');
-    assert.equal(posts[0].body.duration_minutes, 2, '90s rounds to 2 minutes');
-    assert.equal(posts[0].body.child_id, 1, 'the timer keeps the child it started under');
+    assert.equal(posts[0].url, '/api/batch');
+    const [op] = posts[0].body;
+    assert.equal(op.kind, 'feeding');
+    assert.equal(op.data.feeding_type, 'breast_left');
+    assert.equal(op.data.duration_minutes, 2, '90s rounds to 2 minutes');
+    assert.equal(op.data.child_id, 1, 'the timer keeps the child it started under');
     assert.equal(app.localStorage.getItem(TIMER_KEY), null, 'the timer is cleared');
     assert.match(toastText(app), /^Feeding logged/);
 });
@@ -225,7 +227,7 @@ test('endTimer after beginEndConfirmation logs the frozen time, not the wall-clo
     const posts = [];
     const fetch = async (url, opts) => {
         posts.push({ url, body: JSON.parse(opts.body) });
-        return { ok: true, status: 201, json: async () => ({}) };
+        return { ok: true, status: 200, json: async () => [{ status: 201, item: {} }] };
     };
     const app = loadApp({ dom: true, now: NOW, fetch, localStorage: { [TIMER_KEY]: JSON.stringify(frozen) } });
     app.state.childProfiles = [];
@@ -234,7 +236,7 @@ test('endTimer after beginEndConfirmation logs the frozen time, not the wall-clo
     await app.fns.endTimer();
 
     assert.equal(posts.length, 1, 'one feeding is posted');
-    assert.equal(posts[0].body.duration_minutes, 2, '90s frozen at end-click rounds to 2 minutes');
+    assert.equal(posts[0].body[0].data.duration_minutes, 2, '90s frozen at end-click rounds to 2 minutes');
 });
 
 test('repeated switches while paused flip the side in place without piling up segments', () => {
@@ -199,3 +199,30 @@ def test_activity_at_local_midnight_belongs_to_exactly_one_day(client, monkeypat
     # Midnight opens the new day; it must not also close the previous one.
     assert len(previous_day) == 0
     assert len(boundary_day) == 1
+
+
+def test_timeline_reads_are_not_tracked_by_the_session(client):
+    """Read-only paths return plain rows, never identity-mapped ORM objects.
+
+    The timeline and list reads are converted to dicts or response models
+    straight away; loading them as ORM instances made every row of a long
+    history pay for session bookkeeping it never used.
+    """
+    from datetime import UTC, datetime, timedelta
+
+    from puffin import crud
+    from tests.conftest import TestingSessionLocal
+
+    client.post("/api/diapers", json={"type": "pee"})
+    client.post("/api/feedings", json={"feeding_type": "bottle", "amount": 3, "amount_unit": "oz"})
+
+    db = TestingSessionLocal()
+    try:
+        now = datetime.now(UTC)
+        activities = crud.get_activities(db, start=now - timedelta(hours=1), end=now)
+        diapers = crud.get_diapers(db)
+        assert len(activities) == 2
+        assert diapers[0].type == "pee"
+        assert len(db.identity_map) == 0
+    finally:
+        db.close()
@@ -1,6 +1,10 @@
 import sqlite3
+from datetime import datetime, timedelta
 
-from puffin.backup import backup_database
+import pytest
+
+from puffin import backup
+from puffin.backup import backup_database, copy_database
 
 
 def _make_db(path, rows):
@@ -105,3 +109,254 @@ def test_backup_failure_returns_none_without_raising(tmp_path, monkeypatch):
     monkeypatch.setattr(sqlite3, "connect", boom)
     # Must swallow the error and report failure, not propagate it.
     assert backup_database(db) is None
+
+
+def test_copy_is_stepped_and_finishes_under_constant_writes(tmp_path, monkeypatch):
+    """Each write between steps restarts the copy; it must still finish, whole."""
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["x" * 2000 for _ in range(100)])
+    monkeypatch.setattr(backup, "STEP_PAGES", 4)
+
+    writer = sqlite3.connect(str(db))
+    steps = []
+    real_guard = backup._restart_guard
+
+    def writing_guard():
+        guard = real_guard()
+
+        def progress(status, remaining, total):
+            steps.append(remaining)
+            writer.execute("INSERT INTO feedings (note) VALUES ('during the copy')")
+            writer.commit()
+            guard(status, remaining, total)
+
+        return progress
+
+    monkeypatch.setattr(backup, "_restart_guard", writing_guard)
+    source = sqlite3.connect(str(db))
+    try:
+        copy_database(source, tmp_path / "copy.db")
+    finally:
+        source.close()
+        writer.close()
+
+    assert len(steps) == backup.MAX_RESTARTS + 2, "gave up stepping after the restarts"
+    assert _read_notes(tmp_path / "copy.db") == _read_notes(db)
+
+
+def test_steps_are_throttled_and_logged(tmp_path, monkeypatch, caplog):
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["x" * 2000 for _ in range(100)])
+    monkeypatch.setenv("PUFFIN_BACKUP_STEP_PAGES", "8")
+    monkeypatch.setenv("PUFFIN_BACKUP_STEP_SLEEP_MS", "2")
+    pauses = []
+    monkeypatch.setattr(backup.time, "sleep", pauses.append)
+
+    with caplog.at_level("INFO", logger="uvicorn.error"):
+        dest = backup_database(db)
+
+    assert _read_notes(dest) == _read_notes(db)
+    total = sqlite3.connect(str(db)).execute("PRAGMA page_count").fetchone()[0]
+    steps = -(-total // 8)
+    # A pause after every step but the last.
+    assert pauses == [0.002] * (steps - 1)
+    progress = [r.getMessage() for r in caplog.records if "pages copied" in r.getMessage()]
+    assert progress[-1].endswith(f"{total} of {total} pages copied")
+    assert 2 <= len(progress) <= 11, "logged once per tenth, not once per step"
+
+
+@pytest.mark.parametrize(("method", "suffix"), [("gzip", ".gz"), ("zstd", ".zst")])
+def test_compressed_snapshot_restores(tmp_path, monkeypatch, method, suffix):
+    if method == "zstd":
+        pytest.importorskip("zstandard")
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["x" * 2000 for _ in range(50)] + ["kept"])
+    monkeypatch.setenv("PUFFIN_BACKUP_COMPRESS", method)
+
+    dest = backup_database(db)
+
+    assert dest.name.endswith(".db" + suffix)
+    assert dest.stat().st_size < db.stat().st_size / 5
+    assert list(dest.parent.iterdir()) == [dest], "the plain copy is replaced"
+
+    conn = sqlite3.connect(str(db))
+    conn.execute("DELETE FROM feedings")
+    conn.commit()
+    conn.close()
+    previous = backup.restore_database(dest, db)
+
+    assert _read_notes(db)[-1] == "kept"
+    # The database the restore replaced was kept, in case it was the wrong one.
+    assert "pre-restore" in previous.name
+
+
+def test_restore_rejects_a_damaged_snapshot(tmp_path, monkeypatch):
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["live"])
+    monkeypatch.setenv("PUFFIN_BACKUP_COMPRESS", "gzip")
+    dest = backup_database(db)
+    dest.write_bytes(dest.read_bytes()[:200])  # truncated
+
+    with pytest.raises(EOFError):
+        backup.restore_database(dest, db)
+    assert _read_notes(db) == ["live"]
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".restore-")] == []
+
+
+def test_restore_refuses_when_the_pre_restore_snapshot_fails(tmp_path, monkeypatch):
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["old"])
+    dest = backup_database(db)
+    conn = sqlite3.connect(str(db))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    conn.execute("UPDATE feedings SET note = 'only in the WAL'")
+    conn.commit()
+
+    def disk_full(*args, **kwargs):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    monkeypatch.setattr(backup, "copy_database", disk_full)
+    with pytest.raises(RuntimeError):
+        backup.restore_database(dest, db)
+    conn.close()  # checkpoints the WAL, which must still be there
+    assert _read_notes(db) == ["only in the WAL"]
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".restore-")] == []
+
+
+def _snapshot(backups, stamp, size=10):
+    path = backups / f"puffin-{stamp}_000000Z-manual.db.zst"
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_pruning_keeps_grandfather_father_son_tiers(tmp_path):
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    # Two a day, 2026-01-01 through 2026-03-01.
+    snaps = {}
+    day = datetime(2026, 1, 1)
+    while day <= datetime(2026, 3, 1):
+        for hour in ("T030000", "T150000"):
+            stamp = day.strftime("%Y%m%d") + hour
+            snaps[stamp] = _snapshot(backups, stamp)
+        day += timedelta(days=1)
+
+    backup._prune(backups, "puffin", 2, daily=3, weekly=2, monthly=3)
+
+    kept = sorted(p.name[7:22] for p in backups.iterdir())
+    assert kept == [
+        "20260131T150000",  # January's newest
+        "20260222T150000",  # the previous ISO week's newest
+        "20260227T150000",  # the last three days' newest...
+        "20260228T150000",  # ...this one also February's
+        "20260301T030000",  # the newest two
+        "20260301T150000",
+    ]
+
+
+def test_pruning_caps_total_size_but_keeps_the_newest(tmp_path):
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    stamps = [f"2026010{d}T030000" for d in range(1, 6)]
+    for stamp in stamps:
+        _snapshot(backups, stamp, size=100)
+
+    backup._prune(backups, "puffin", 10, max_bytes=250)
+    assert len(list(backups.iterdir())) == 2
+
+    backup._prune(backups, "puffin", 10, max_bytes=50)
+    assert [p.name[7:22] for p in backups.iterdir()] == [stamps[-1]]
+
+
+def test_pruning_one_kind_leaves_the_others(tmp_path):
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    (backups / "puffin-20260101T030000_000000Z-pre-migration.db").write_bytes(b"x" * 100)
+    (backups / "puffin-20260101T040000_000000Z-manual.db").write_bytes(b"x" * 100)
+    for hour in range(10, 20):
+        (backups / f"puffin-20260101T{hour}0000_000000Z-scheduled.db").write_bytes(b"x" * 100)
+
+    backup._prune(backups, "puffin", 3, reason="scheduled")
+    names = sorted(p.name for p in backups.iterdir())
+    assert names[:2] == [
+        "puffin-20260101T030000_000000Z-pre-migration.db",
+        "puffin-20260101T040000_000000Z-manual.db",
+    ]
+    assert [n[16:22] for n in names[2:]] == ["170000", "180000", "190000"]
+
+    # The size cap counts every kind but only removes the kind being pruned.
+    backup._prune(backups, "puffin", 3, reason="scheduled", max_bytes=350)
+    assert len(list(backups.glob("*-scheduled.db"))) == 1
+    assert len(list(backups.iterdir())) == 3
+
+
+def _pages_stored(db):
+    store = sqlite3.connect(str(db.parent / "backups" / "puffin-pages.db"))
+    try:
+        return store.execute("SELECT count(*) FROM pages").fetchone()[0]
+    finally:
+        store.close()
+
+
+def test_incremental_backup_stores_only_changed_pages(tmp_path):
+    db = tmp_path / "puffin.db"
+    _make_db(db, [f"feed {i} " + "x" * 2000 for i in range(200)])
+
+    first = backup.incremental_backup(db)
+    stored = _pages_stored(db)
+    conn = sqlite3.connect(str(db))
+    conn.execute("UPDATE feedings SET note = 'edited' WHERE id = 100")
+    conn.commit()
+    conn.close()
+    second = backup.incremental_backup(db)
+
+    [(_, pages, _), (_, changed, _)] = backup.incremental_backups(db)
+    assert pages == stored > 100
+    # The edited row's page, and the header page with its change counter.
+    assert 1 <= changed <= 3
+    assert _pages_stored(db) == stored + changed
+
+    # Either point in time can be put back.
+    backup.restore_incremental(first, db)
+    assert _read_notes(db)[99].startswith("feed 99")
+    backup.restore_incremental(second[:15], db)  # the start of a stamp will do
+    assert _read_notes(db)[99] == "edited"
+
+
+def test_incremental_restore_of_an_unknown_stamp_changes_nothing(tmp_path):
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["live"])
+    backup.incremental_backup(db)
+
+    with pytest.raises(LookupError):
+        backup.restore_incremental("19990101", db)
+    assert _read_notes(db) == ["live"]
+
+
+def test_incremental_restore_without_backups_creates_nothing(tmp_path):
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["live"])
+
+    with pytest.raises(LookupError):
+        backup.restore_incremental("2026", db)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["puffin.db"]
+
+
+def test_incremental_pruning_drops_unused_pages(tmp_path):
+    db = tmp_path / "puffin.db"
+    _make_db(db, ["x" * 2000 for _ in range(50)])
+    backup.incremental_backup(db, keep=1)
+    first = _pages_stored(db)
+
+    conn = sqlite3.connect(str(db))
+    conn.execute("UPDATE feedings SET note = 'y' || note")
+    conn.commit()
+    conn.close()
+    backup.incremental_backup(db, keep=1)
+
+    assert len(backup.incremental_backups(db)) == 1
+    # Every page was rewritten, so none of the first backup's pages is still used.
+    assert _pages_stored(db) <= first
+    backup.restore_incremental("2", db)
+    assert _read_notes(db)[0].startswith("yx")
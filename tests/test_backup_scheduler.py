@@ -0,0 +1,125 @@
+"""Scheduled backups: skipped when nothing changed, never overlapping, reported."""
+
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from puffin import backup_scheduler, export_jobs
+from puffin.backup_scheduler import BackupScheduler
+from puffin.database import Base
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'puffin.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+def _log_a_diaper(url):
+    conn = sqlite3.connect(url.removeprefix("sqlite:///"))
+    conn.execute(
+        "INSERT INTO diaper_changes (timestamp, type, created_at)"
+        " VALUES ('2026-03-01 08:00:00', 0, '2026-03-01 08:00:00')"
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize("mode", backup_scheduler.MODES)
+def test_run_is_skipped_until_something_changes(db_url, tmp_path, mode):
+    # An hour's interval: only the runs asked for below happen.
+    scheduler = BackupScheduler(db_url, 3600, mode)
+    try:
+        first = scheduler.run_now()
+        assert first.outcome == "done"
+        assert first.duration_seconds >= 0
+        assert scheduler.run_now().outcome == "skipped"
+
+        _log_a_diaper(db_url)
+        assert scheduler.run_now().outcome == "done"
+    finally:
+        scheduler.close()
+
+    backups = tmp_path / "backups"
+    if mode == "snapshot":
+        assert len(list(backups.glob("puffin-*-scheduled.db"))) == 2
+    else:
+        assert len(backup_scheduler.backup.incremental_backups(tmp_path / "puffin.db")) == 2
+
+
+def test_runs_do_not_overlap(db_url):
+    scheduler = BackupScheduler(db_url, 3600)
+    try:
+        with scheduler._running:
+            assert scheduler.running
+            assert scheduler.run_now() is None
+        assert scheduler.run_now().outcome == "done"
+    finally:
+        scheduler.close()
+
+
+def test_runs_wait_for_exports(db_url, monkeypatch):
+    exporting = True
+    monkeypatch.setattr(export_jobs, "running", lambda: exporting)
+    scheduler = BackupScheduler(db_url, 0.02)
+    try:
+        time.sleep(0.1)
+        assert scheduler.last_run is None
+        exporting = False
+        deadline = time.monotonic() + 5
+        while scheduler.last_run is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.last_run.outcome == "done"
+    finally:
+        scheduler.close()
+
+
+def test_status_endpoint(client, db_url, monkeypatch):
+    assert client.get("/api/backups/status").json() == {
+        "enabled": False,
+        "mode": None,
+        "interval_minutes": None,
+        "running": False,
+        "last_run": None,
+    }
+
+    scheduler = BackupScheduler(db_url, 3600)
+    monkeypatch.setattr(backup_scheduler, "_scheduler", scheduler)
+    try:
+        scheduler.run_now()
+        status = client.get("/api/backups/status").json()
+    finally:
+        scheduler.close()
+    assert status["enabled"] and status["mode"] == "snapshot"
+    assert status["interval_minutes"] == 60
+    assert status["last_run"]["outcome"] == "done"
+    assert status["last_run"]["detail"].endswith("-scheduled.db")
+
+
+@pytest.mark.parametrize(
+    ("env", "settings"),
+    [
+        ({}, (None, "snapshot")),
+        ({"PUFFIN_BACKUP_INTERVAL_MINUTES": "90"}, (5400.0, "snapshot")),
+        ({"PUFFIN_BACKUP_INTERVAL_MINUTES": "0"}, (None, "snapshot")),
+        (
+            {"PUFFIN_BACKUP_INTERVAL_MINUTES": "x", "PUFFIN_BACKUP_MODE": "incremental"},
+            (None, "incremental"),
+        ),
+        (
+            {"PUFFIN_BACKUP_INTERVAL_MINUTES": "5", "PUFFIN_BACKUP_MODE": "bogus"},
+            (300.0, "snapshot"),
+        ),
+    ],
+)
+def test_settings_from_env(monkeypatch, env, settings):
+    monkeypatch.delenv("PUFFIN_BACKUP_INTERVAL_MINUTES", raising=False)
+    monkeypatch.delenv("PUFFIN_BACKUP_MODE", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert backup_scheduler.settings_from_env() == settings
@@ -0,0 +1,128 @@
+"""The batch write API: many operations, one transaction, a result each."""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from tests.conftest import engine
+
+
+@contextmanager
+def _capture(name):
+    """Everything *engine* reports for event *name* inside the block."""
+    seen = []
+
+    def capture(conn, *args):
+        seen.append(args)
+
+    event.listen(engine, name, capture)
+    try:
+        yield seen
+    finally:
+        event.remove(engine, name, capture)
+
+
+def test_batch_applies_mixed_operations_in_order(client):
+    maya = client.post("/api/children", json={"name": "Maya"}).json()
+    diaper = client.post("/api/diapers", json={"type": "pee"}).json()
+    doomed = client.post(
+        "/api/medications",
+        json={"medication_name": "Tylenol", "dosage_quantity": 2.5, "dosage_unit": "mL"},
+    ).json()
+
+    with _capture("commit") as commits:
+        resp = client.post(
+            "/api/batch",
+            json=[
+                {
+                    "op": "create",
+                    "kind": "feeding",
+                    "data": {
+                        "feeding_type": "breast_left",
+                        "duration_minutes": 12,
+                        "child_id": maya["id"],
+                    },
+                },
+                {"op": "create", "kind": "temperature", "data": {"temperature": 38.1, "unit": "C"}},
+                {"op": "update", "kind": "diaper", "id": diaper["id"], "data": {"type": "both"}},
+                {"op": "delete", "kind": "medication", "id": doomed["id"]},
+            ],
+        )
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["status"] for r in results] == [201, 201, 200, 204]
+    assert results[0]["item"]["child_id"] == maya["id"]
+    assert results[2]["item"]["type"] == "both"
+    assert len(commits) == 1
+
+    assert len(client.get("/api/feedings").json()) == 1
+    assert client.get(f"/api/diapers/{diaper['id']}").json()["type"] == "both"
+    assert client.get(f"/api/medications/{doomed['id']}").status_code == 404
+
+
+def test_failed_operations_are_reported_and_the_rest_still_commit(client):
+    resp = client.post(
+        "/api/batch",
+        json=[
+            {"op": "create", "kind": "diaper", "data": {"type": "pee"}},
+            {"op": "create", "kind": "diaper", "data": {"type": "sparkly"}},
+            {"op": "create", "kind": "diaper", "data": {"type": "pee", "child_id": 99}},
+            {"op": "update", "kind": "feeding", "id": 12345, "data": {"notes": "x"}},
+            {"op": "delete", "kind": "temperature"},
+            {"op": "create", "kind": "diaper", "data": {"type": "dry"}},
+        ],
+    )
+    results = resp.json()
+    assert [r["status"] for r in results] == [201, 422, 422, 404, 422, 201]
+    assert results[1]["detail"][0]["loc"] == ["type"]
+    assert results[2]["detail"] == "Child 99 not found"
+    assert results[3]["detail"] == "Feeding not found"
+    assert sorted(d["type"] for d in client.get("/api/diapers").json()) == ["dry", "pee"]
+
+
+def test_batch_checks_child_ids_with_one_query(client):
+    maya = client.post("/api/children", json={"name": "Maya"}).json()
+    with _capture("before_cursor_execute") as queries:
+        client.post(
+            "/api/batch",
+            json=[
+                {"op": "create", "kind": "diaper", "data": {"type": "pee", "child_id": maya["id"]}}
+                for _ in range(5)
+            ],
+        )
+    assert sum("FROM children" in statement for _, statement, *_ in queries) == 1
+
+
+def test_batch_size_is_capped(client):
+    ops = [{"op": "create", "kind": "diaper", "data": {"type": "pee"}}] * 501
+    assert client.post("/api/batch", json=ops).status_code == 422
+
+
+def test_a_keyed_create_is_applied_once(client):
+    ops = [
+        {"op": "create", "kind": "diaper", "key": "k-1", "data": {"type": "pee"}},
+        {"op": "create", "kind": "feeding", "key": "k-2", "data": {"feeding_type": "bottle"}},
+    ]
+    first = client.post("/api/batch", json=ops).json()
+    # The response was lost; the client sends the same batch again.
+    again = client.post("/api/batch", json=ops).json()
+    assert [r["status"] for r in again] == [201, 201]
+    assert [r["item"] for r in again] == [r["item"] for r in first]
+    assert len(client.get("/api/diapers").json()) == 1
+    assert len(client.get("/api/feedings").json()) == 1
+
+    client.delete(f"/api/diapers/{first[0]['item']['id']}")
+    reused = client.post(
+        "/api/batch",
+        json=[ops[0], {"op": "create", "kind": "temperature", "key": "k-2", "data": {}}],
+    ).json()
+    assert [r["status"] for r in reused] == [404, 422]
+    assert client.get("/api/diapers").json() == []
+
+
+def test_a_key_repeated_within_one_batch_creates_one_log(client):
+    op = {"op": "create", "kind": "diaper", "key": "k-1", "data": {"type": "pee"}}
+    results = client.post("/api/batch", json=[op, op]).json()
+    assert [r["status"] for r in results] == [201, 201]
+    assert results[0]["item"] == results[1]["item"]
+    assert len(client.get("/api/diapers").json()) == 1
@@ -0,0 +1,130 @@
+"""Bulk edit and delete: one statement per table, counts back per kind."""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from tests.conftest import engine
+
+
+@contextmanager
+def _statements():
+    """The SQL statements run inside the block."""
+    seen = []
+
+    def capture(conn, cursor, statement, *args):
+        seen.append(statement.split(None, 1)[0])
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield seen
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def _log_some(client, child_id=None):
+    ids = {}
+    for url, body in [
+        ("/api/diapers", {"type": "pee", "timestamp": "2026-03-01T08:00:00Z"}),
+        ("/api/diapers", {"type": "poop", "timestamp": "2026-03-02T08:00:00Z"}),
+        ("/api/feedings", {"feeding_type": "breast_left", "timestamp": "2026-03-01T09:00:00Z"}),
+        (
+            "/api/temperatures",
+            {"temperature": 37.0, "unit": "C", "timestamp": "2026-03-01T10:00:00Z"},
+        ),
+    ]:
+        ids.setdefault(url, []).append(
+            client.post(url, json={**body, "child_id": child_id}).json()["id"]
+        )
+    return ids
+
+
+def test_reassign_by_filter(client):
+    maya = client.post("/api/children", json={"name": "Maya"}).json()["id"]
+    leo = client.post("/api/children", json={"name": "Leo"}).json()["id"]
+    _log_some(client, maya)
+
+    with _statements() as statements:
+        resp = client.post(
+            "/api/bulk/update",
+            json={
+                "where": {"child_id": maya, "end_date": "2026-03-02T00:00:00Z"},
+                "set": {"child_id": leo},
+            },
+        )
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "counts": {"diaper": 1, "feeding": 1, "medication": 0, "temperature": 1},
+        "total": 3,
+    }
+    assert statements == ["SELECT", "UPDATE", "UPDATE", "UPDATE", "UPDATE"]  # the child check
+
+    assert len(client.get(f"/api/diapers?child_id={leo}").json()) == 1
+    assert len(client.get(f"/api/diapers?child_id={maya}").json()) == 1
+    assert len(client.get(f"/api/feedings?child_id={leo}").json()) == 1
+
+
+def test_update_by_ids_back_to_unassigned(client):
+    maya = client.post("/api/children", json={"name": "Maya"}).json()["id"]
+    ids = _log_some(client, maya)
+
+    resp = client.post(
+        "/api/bulk/update",
+        json={
+            "where": {"kinds": ["diaper"], "ids": ids["/api/diapers"]},
+            "set": {"child_id": None, "notes": "mis-set"},
+        },
+    )
+    assert resp.json()["counts"] == {"diaper": 2}
+    for diaper_id in ids["/api/diapers"]:
+        diaper = client.get(f"/api/diapers/{diaper_id}").json()
+        assert diaper["child_id"] is None and diaper["notes"] == "mis-set"
+    assert client.get("/api/children/unassigned").json() == {"count": 2}
+
+
+def test_delete_by_ids_and_time_range(client):
+    ids = _log_some(client)
+
+    with _statements() as statements:
+        resp = client.post(
+            "/api/bulk/delete",
+            json={"kinds": ["diaper"], "ids": ids["/api/diapers"] + [9999]},
+        )
+    assert resp.json() == {"counts": {"diaper": 2}, "total": 2}
+    assert statements == ["DELETE"]
+    assert client.get("/api/diapers").json() == []
+
+    resp = client.post(
+        "/api/bulk/delete",
+        json={"start_date": "2026-03-01T08:30:00Z", "end_date": "2026-03-01T09:30:00Z"},
+    )
+    assert resp.json()["counts"] == {"diaper": 0, "feeding": 1, "medication": 0, "temperature": 0}
+    assert len(client.get("/api/temperatures").json()) == 1
+
+
+def test_delete_unassigned_leaves_other_children(client):
+    maya = client.post("/api/children", json={"name": "Maya"}).json()["id"]
+    _log_some(client, maya)
+    _log_some(client)
+
+    resp = client.post("/api/bulk/delete", json={"unassigned": True})
+    assert resp.json()["total"] == 4
+    assert len(client.get("/api/diapers").json()) == 2
+
+
+def test_rejects_an_open_selection(client):
+    _log_some(client)
+    assert client.post("/api/bulk/delete", json={}).status_code == 422
+    assert client.post("/api/bulk/delete", json={"kinds": ["diaper"]}).status_code == 422
+    # Ids are per table, so they need a single kind.
+    assert client.post("/api/bulk/delete", json={"ids": [1]}).status_code == 422
+    assert len(client.get("/api/diapers").json()) == 2
+
+
+def test_rejects_empty_changes_and_unknown_child(client):
+    ids = _log_some(client)
+    where = {"kinds": ["diaper"], "ids": ids["/api/diapers"]}
+    assert client.post("/api/bulk/update", json={"where": where, "set": {}}).status_code == 422
+    resp = client.post("/api/bulk/update", json={"where": where, "set": {"child_id": 42}})
+    assert resp.status_code == 422
+    assert resp.json()["detail"] == "Child 42 not found"
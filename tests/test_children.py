@@ -213,6 +213,75 @@ def test_dashboard_unassigned_filter(client, child):
     assert resp["diaper_stats"]["today"] == 1
 
 
+def test_children_dashboard_matches_each_scoped_dashboard(client, two_children):
+    maya, theo = two_children
+    client.post("/api/diapers", json={"type": "pee", "child_id": maya["id"]})
+    client.post("/api/diapers", json={"type": "poop", "child_id": maya["id"]})
+    client.post("/api/feedings", json={"feeding_type": "breast_left", "child_id": theo["id"]})
+    client.post(
+        "/api/temperatures", json={"temperature": 37.2, "unit": "C", "child_id": theo["id"]}
+    )
+    client.post(
+        "/api/medications",
+        json={"medication_name": "Tylenol", "dosage_quantity": 2.5, "dosage_unit": "mL"},
+    )
+
+    data = client.get("/api/dashboard/children").json()
+    assert [c["name"] for c in data["children"]] == ["Maya", "Theo"]
+    for summary in data["children"]:
+        single = client.get(f"/api/dashboard?child_id={summary['child_id']}").json()
+        for key in (
+            "diaper_stats",
+            "feeding_stats",
+            "medication_count_today",
+            "last_diaper",
+            "last_feeding",
+            "last_temperature",
+        ):
+            assert summary[key] == single[key], key
+
+    assert data["unassigned_count"] == 1
+    assert data["unassigned"]["medication_count_today"] == 1
+
+
+def test_children_dashboard_omits_unassigned_when_empty(client, child):
+    client.post("/api/diapers", json={"type": "pee", "child_id": child["id"]})
+
+    data = client.get("/api/dashboard/children").json()
+    assert data["unassigned"] is None
+    assert data["unassigned_count"] == 0
+    assert data["children"][0]["diaper_stats"]["today"] == 1
+
+
+def test_children_dashboard_query_count_is_fixed(client):
+    """Adding profiles must not add queries."""
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    def count_queries() -> int:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            assert client.get("/api/dashboard/children").status_code == 200
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        return len(statements)
+
+    for name in ("Maya", "Theo"):
+        child = client.post("/api/children", json={"name": name}).json()
+        client.post("/api/diapers", json={"type": "pee", "child_id": child["id"]})
+    two = count_queries()
+    for name in ("Ada", "Bo", "Cy"):
+        child = client.post("/api/children", json={"name": name}).json()
+        client.post("/api/feedings", json={"feeding_type": "bottle", "child_id": child["id"]})
+    assert count_queries() == two
+
+
 def test_activities_scoped_to_child(client, two_children):
     maya, theo = two_children
     client.post("/api/diapers", json={"type": "pee", "child_id": maya["id"]})
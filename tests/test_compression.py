@@ -0,0 +1,116 @@
+"""Response compression: negotiation, streaming, and what is left alone."""
+
+import zlib
+
+import anyio
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from puffin import compression
+from puffin.compression import CompressionMiddleware, negotiate
+
+_ROWS = [{"timestamp": f"2026-07-19T18:{m:02d}:00Z", "type": "pee"} for m in range(60)]
+_CHUNKS = [b"timestamp,type\n" + b"2026-07-19T18:30:00Z,pee\n" * 200 for _ in range(3)]
+
+
+def _app(tmp_path):
+    stored = tmp_path / "export.csv"
+    stored.write_bytes(b"".join(_CHUNKS))
+    routes = [
+        Route("/api/rows", lambda r: JSONResponse(_ROWS)),
+        Route("/api/small", lambda r: JSONResponse({"ok": True})),
+        Route("/api/stream", lambda r: StreamingResponse(iter(_CHUNKS), media_type="text/csv")),
+        Route("/api/file", lambda r: FileResponse(stored)),
+        Route("/api/pdf", lambda r: Response(b"%PDF-" * 1000, media_type="application/pdf")),
+        Route("/page", lambda r: JSONResponse(_ROWS)),
+    ]
+    return CompressionMiddleware(Starlette(routes=routes))
+
+
+@pytest.fixture
+def client(tmp_path):
+    return TestClient(_app(tmp_path))
+
+
+def test_negotiation_prefers_zstd_and_honours_q_values(monkeypatch):
+    assert negotiate("") is None
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, deflate") is None
+    assert negotiate("*") in ("gzip", "zstd")
+    monkeypatch.setattr(compression, "zstandard", object())
+    assert negotiate("gzip, zstd") == "zstd"
+    assert negotiate("gzip;q=1, zstd;q=0.5") == "gzip"
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert negotiate("zstd") is None
+
+
+def test_json_is_gzipped_when_accepted(client):
+    resp = client.get("/api/rows", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in resp.headers["vary"].lower()
+    assert resp.json() == _ROWS
+    assert int(resp.headers["content-length"]) < len(JSONResponse(_ROWS).body) / 5
+
+
+def test_zstd_when_available_and_accepted(client):
+    pytest.importorskip("zstandard")
+    resp = client.get("/api/rows", headers={"Accept-Encoding": "gzip, zstd"})
+    assert resp.headers["content-encoding"] == "zstd"
+    assert resp.json() == _ROWS
+
+
+def test_identity_without_accept_encoding_or_below_the_threshold(client):
+    plain = client.get("/api/rows", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    small = client.get("/api/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    page = client.get("/page", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in page.headers
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk(tmp_path):
+    """Each chunk is flushed as it comes, so the client can decode it at once."""
+    sent = []
+    requests = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+    async def receive():
+        # The request, then nothing: the client stays connected throughout.
+        for message in requests:
+            return message
+        await anyio.sleep_forever()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/stream",
+        "raw_path": b"/api/stream",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    anyio.run(_app(tmp_path), scope, receive, send)
+
+    start, *bodies = sent
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    for chunk, message in zip(_CHUNKS, bodies, strict=False):
+        assert decoder.decompress(message["body"]) == chunk
+    assert bodies[-1]["more_body"] is False
+
+
+def test_ranged_files_and_compressed_types_are_sent_as_stored(client):
+    whole = client.get("/api/file", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in whole.headers
+    assert whole.headers["content-length"] == str(len(b"".join(_CHUNKS)))
+    part = client.get("/api/file", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+    assert part.status_code == 206
+    assert part.content == _CHUNKS[0][:10]
+    pdf = client.get("/api/pdf", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pdf.headers
@@ -2,6 +2,8 @@
 
 from pathlib import Path
 
+import pytest
+
 from puffin.routers import dashboard
 
 
@@ -53,6 +55,75 @@ def test_pdf_uses_the_bundled_unicode_font(client):
     assert dashboard._register_pdf_fonts(FPDF()) == "DejaVu"
 
 
+def test_pdf_fonts_are_parsed_once_per_process(client, monkeypatch):
+    """Later exports copy the cached faces instead of re-reading the TTFs."""
+    from fpdf import FPDF
+
+    _post_feed(client, "café")
+    client.get("/api/export?format=pdf")
+    calls = []
+    monkeypatch.setattr(FPDF, "add_font", lambda *a, **kw: calls.append(a))
+
+    resp = client.get("/api/export?format=pdf")
+    assert resp.status_code == 200
+    assert calls == []
+
+
+def test_a_failed_font_parse_caches_nothing(monkeypatch):
+    from fpdf import FPDF
+
+    add_font = FPDF.add_font
+
+    def fail_on_bold(self, family, style="", *args, **kwargs):
+        if style == "B":
+            raise OSError("truncated font file")
+        return add_font(self, family, style, *args, **kwargs)
+
+    monkeypatch.setattr(dashboard, "_pdf_fonts", [])
+    monkeypatch.setattr(FPDF, "add_font", fail_on_bold)
+    with pytest.raises(OSError):
+        dashboard._parsed_pdf_fonts()
+    assert dashboard._pdf_fonts == []
+
+    monkeypatch.setattr(FPDF, "add_font", add_font)
+    assert [face.fontkey for face, _ in dashboard._parsed_pdf_fonts()] == ["dejavu", "dejavuB"]
+
+
+def test_cached_pdf_fonts_render_the_same_bytes_as_add_font():
+    """A document's copy of a cached face is indistinguishable from a fresh one."""
+    from datetime import UTC, datetime
+
+    from fpdf import FPDF
+
+    def render(register):
+        pdf = FPDF()
+        pdf.creation_date = datetime(2026, 1, 1, tzinfo=UTC)
+        register(pdf)
+        pdf.add_page()
+        pdf.set_font("DejaVu", "", 10)
+        pdf.cell(0, 10, "mom’s note — café ½")
+        pdf.set_font("DejaVu", "B", 10)
+        pdf.cell(0, 10, "Feedings")
+        return bytes(pdf.output())
+
+    def add_fonts(pdf):
+        pdf.add_font("DejaVu", "", str(dashboard._FONT_REGULAR))
+        pdf.add_font("DejaVu", "B", str(dashboard._FONT_BOLD))
+
+    expected = render(add_fonts)
+    # Twice: the first document's subsetting must not leak into the second.
+    assert render(dashboard._register_pdf_fonts) == expected
+    assert render(dashboard._register_pdf_fonts) == expected
+
+
+def test_pdf_embeds_only_the_glyphs_it_uses(client):
+    """Each face is subset, not embedded whole (the TTFs are ~700 KB each)."""
+    _post_feed(client, "note")
+
+    resp = client.get("/api/export?format=pdf")
+    assert len(resp.content) < 100_000
+
+
 def test_pdf_export_falls_back_without_the_font(client, monkeypatch):
     """If the font files vanish, the export transliterates instead of crashing."""
     monkeypatch.setattr(dashboard, "_FONT_REGULAR", Path("/nonexistent/DejaVuSans.ttf"))
@@ -117,6 +188,46 @@ def test_json_export_temperature_is_value_as_entered_with_unit(client):
     assert all("temperature_celsius" not in t for t in temps)
 
 
+def test_json_export_records_match_the_response_schemas(client):
+    """Rows skip Pydantic now, so check they still serialize as the API does."""
+    _post_feed(client, "left side")
+    client.post(
+        "/api/feedings",
+        json={
+            "feeding_type": "bottle",
+            "amount": 120,
+            "amount_unit": "mL",
+            "bottle_type": "formula",
+        },
+    )
+    client.post("/api/diapers", json={"type": "both", "notes": "café"})
+    client.post(
+        "/api/medications",
+        json={"medication_name": "Tylenol", "dosage_quantity": 2.5, "dosage_unit": "mL"},
+    )
+    client.post("/api/temperatures", json={"temperature": 98.6, "unit": "F", "location": "oral"})
+
+    data = client.get("/api/export?format=json").json()
+    for key in ("diapers", "feedings", "medications", "temperatures"):
+        assert data[key] == client.get(f"/api/{key}").json(), key
+
+
+def test_ndjson_export_is_one_tagged_record_per_line(client):
+    import json
+
+    child = client.post("/api/children", json={"name": "Maya"}).json()
+    client.post("/api/diapers", json={"type": "pee", "child_id": child["id"]})
+    _post_feed(client, "unassigned feed")
+
+    resp = client.get("/api/export?format=ndjson")
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["kind"] for line in lines] == ["child", "diaper", "feeding"]
+    assert lines[0] == {"kind": "child", "id": child["id"], "name": "Maya"}
+    diaper = {k: v for k, v in lines[1].items() if k != "kind"}
+    assert diaper == client.get("/api/diapers").json()[0]
+
+
 # --- Low-severity export completeness (second-audit follow-ups) ---
 
 
@@ -178,3 +289,251 @@ def test_export_is_not_capped(client):
     diaper_rows = [line for line in body.splitlines() if line and line.split(",")[0].isdigit()]
     # 120 diapers all present (plus any other types, but we posted only diapers).
     assert len(diaper_rows) == 120
+
+
+# --- CSV streaming: memory and time to first byte must not grow with history ---
+
+
+def _seed_diapers(n: int) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    from sqlalchemy import insert
+
+    from puffin.models import DiaperChange
+    from tests.conftest import engine
+
+    base = datetime(2024, 1, 1, tzinfo=UTC)
+    rows = [
+        {"timestamp": base + timedelta(minutes=i), "type": "pee", "notes": f"note {i}"}
+        for i in range(n)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(DiaperChange), rows)
+
+
+def _csv_chunks(db):
+    from zoneinfo import ZoneInfo
+
+    return dashboard._csv_chunks(db, None, None, None, {}, False, ZoneInfo("UTC"))
+
+
+def test_csv_export_yields_before_reading_later_tables(client, monkeypatch):
+    """The first chunk goes out while only the first table has been queried."""
+    from sqlalchemy import event
+
+    from tests.conftest import TestingSessionLocal, engine
+
+    _seed_diapers(500)
+    _post_feed(client, "later table")
+    monkeypatch.setattr(dashboard, "_EXPORT_CHUNK_SIZE", 1024)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with TestingSessionLocal() as db:
+        chunks = _csv_chunks(db)
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            first = next(chunks)
+            assert not any("FROM feedings" in s for s in statements)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        rest = list(chunks)
+
+    assert len(first) < 2048
+    assert len(rest) > 10
+    assert (first + b"".join(rest)).decode() == client.get("/api/export?format=csv").text
+
+
+def test_csv_export_peak_memory_does_not_grow_with_history():
+    import tracemalloc
+
+    from tests.conftest import TestingSessionLocal
+
+    def peak_while_exporting() -> int:
+        with TestingSessionLocal() as db:
+            tracemalloc.start()
+            try:
+                for _ in _csv_chunks(db):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    _seed_diapers(5_000)
+    small = peak_while_exporting()
+    _seed_diapers(20_000)
+    large = peak_while_exporting()
+    # Buffering the file or the rows would make this ~5x.
+    assert large < small * 1.5
+
+
+# --- Parquet / Arrow: one typed table per log, in a zip ---
+
+
+def _columnar_tables(content: bytes, export_format: str) -> dict:
+    import io
+    import zipfile
+
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    tables = {}
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        for name in archive.namelist():
+            data = pa.BufferReader(archive.read(name))
+            if export_format == "parquet":
+                tables[name] = pq.read_table(data)
+            else:
+                tables[name] = pa.ipc.open_file(data).read_all()
+    return tables
+
+
+def test_parquet_export_is_one_typed_table_per_log(client):
+    pa = pytest.importorskip("pyarrow")
+    child = client.post("/api/children", json={"name": "Maya"}).json()
+    client.post("/api/diapers", json={"type": "poop", "child_id": child["id"]})
+    client.post("/api/feedings", json={"feeding_type": "bottle", "amount": 4, "amount_unit": "oz"})
+
+    resp = client.get("/api/export?format=parquet")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/zip"
+    assert "puffin_export_parquet.zip" in resp.headers["content-disposition"]
+
+    tables = _columnar_tables(resp.content, "parquet")
+    assert sorted(tables) == [
+        "children.parquet",
+        "diapers.parquet",
+        "feedings.parquet",
+        "medications.parquet",
+        "temperatures.parquet",
+    ]
+    diapers = tables["diapers.parquet"]
+    assert diapers.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    assert diapers.schema.field("type").type == pa.dictionary(pa.int8(), pa.string())
+    assert diapers.column("type").to_pylist() == ["poop"]
+    assert diapers.column("child_id").to_pylist() == [child["id"]]
+    feedings = tables["feedings.parquet"].to_pylist()
+    assert feedings[0]["amount"] == 4.0
+    assert feedings[0]["amount_unit"] == "oz"
+    assert feedings[0]["bottle_type"] is None
+    assert tables["children.parquet"].to_pylist() == [{"id": child["id"], "name": "Maya"}]
+
+
+def test_arrow_export_writes_every_batch(client, monkeypatch):
+    """Rows span several record batches and come back newest first, in full."""
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(dashboard, "_COLUMNAR_BATCH", 2)
+    for minute in range(5):
+        client.post(
+            "/api/diapers", json={"type": "pee", "timestamp": f"2026-07-19T18:0{minute}:00Z"}
+        )
+
+    resp = client.get("/api/export?format=arrow")
+    diapers = _columnar_tables(resp.content, "arrow")["diapers.arrow"]
+    assert [ts.minute for ts in diapers.column("timestamp").to_pylist()] == [4, 3, 2, 1, 0]
+    assert diapers.column("type").to_pylist() == ["pee"] * 5
+
+
+def test_columnar_export_without_pyarrow_is_refused(client, monkeypatch):
+    import importlib.util
+
+    real_find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *a: None if name == "pyarrow" else real_find_spec(name, *a),
+    )
+
+    resp = client.get("/api/export?format=parquet")
+    assert resp.status_code == 501
+    assert "pyarrow" in resp.json()["detail"]
+
+
+# --- SQLite snapshot: the whole database, gzipped ---
+
+
+def test_sqlite_export_is_a_gzipped_copy_of_the_database(client, tmp_path):
+    import gzip
+    import sqlite3
+
+    _post_feed(client, "snapshot me")
+
+    resp = client.get("/api/export?format=sqlite")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/gzip"
+    assert "puffin_export.db.gz" in resp.headers["content-disposition"]
+
+    copy = tmp_path / "copy.db"
+    copy.write_bytes(gzip.decompress(resp.content))
+    conn = sqlite3.connect(str(copy))
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        assert conn.execute("SELECT notes FROM feedings").fetchall() == [("snapshot me",)]
+    finally:
+        conn.close()
+
+
+def test_sqlite_export_rejects_filters(client):
+    resp = client.get("/api/export?format=sqlite&child_id=1")
+    assert resp.status_code == 400
+    assert client.post("/api/exports?format=sqlite").status_code == 422
+
+
+# --- Incremental export: what changed since a watermark ---
+
+
+def test_changes_export_returns_only_writes_after_the_watermark(client):
+    kept = _post_feed(client, "kept").json()
+    edited = _post_feed(client, "edited").json()
+    gone = client.post("/api/diapers", json={"type": "pee"}).json()
+
+    first = client.get("/api/export/changes").json()
+    assert first["since"] == 0
+    assert [f["id"] for f in first["feedings"]] == [kept["id"], edited["id"]]
+    assert [d["id"] for d in first["diapers"]] == [gone["id"]]
+    assert first["deleted"] == []
+
+    # A back-dated edit and a delete: neither would show up in a date range.
+    client.put(f"/api/feedings/{edited['id']}", json={"timestamp": "2025-01-01T08:00:00Z"})
+    client.delete(f"/api/diapers/{gone['id']}")
+    child = client.post("/api/children", json={"name": "Maya"}).json()
+
+    second = client.get(f"/api/export/changes?since={first['next_since']}").json()
+    assert second["next_since"] > first["next_since"]
+    assert [f["id"] for f in second["feedings"]] == [edited["id"]]
+    assert second["feedings"][0]["timestamp"] == "2025-01-01T08:00:00Z"
+    assert second["feedings"][0]["updated_at"].endswith("Z")
+    assert second["diapers"] == []
+    assert [c["id"] for c in second["children"]] == [child["id"]]
+    assert second["deleted"] == [
+        {"table": "diapers", "id": gone["id"], "deleted_at": second["deleted"][0]["deleted_at"]}
+    ]
+
+    third = client.get(f"/api/export/changes?since={second['next_since']}").json()
+    assert third["next_since"] == second["next_since"]
+    assert all(third[key] == [] for key in ("children", "feedings", "diapers", "deleted"))
+
+
+def test_changes_export_refuses_a_watermark_from_the_future(client):
+    resp = client.get("/api/export/changes?since=1000000")
+    assert resp.status_code == 409
+    assert client.get("/api/export/changes?since=-1").status_code == 422
+
+
+def test_changes_export_refuses_a_watermark_behind_pruned_deletions(client):
+    from sqlalchemy import text
+
+    from tests.conftest import engine
+
+    client.post("/api/diapers", json={"type": "pee"})
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE data_version SET pruned_through = 5"))
+    for _ in range(5):
+        client.post("/api/diapers", json={"type": "pee"})
+
+    resp = client.get("/api/export/changes?since=1")
+    assert resp.status_code == 410
+    assert client.get("/api/export/changes?since=5").status_code == 200
+    assert client.get("/api/export/changes?since=0").status_code == 200
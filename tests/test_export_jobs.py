@@ -0,0 +1,176 @@
+"""Background export jobs: rendered in a worker process, cached on disk.
+
+The worker is a separate process, so it cannot see the suite's in-memory
+database; these tests run against a database file of their own.
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from puffin import export_jobs
+from puffin.database import Base, get_db
+from puffin.main import app
+from puffin.routers import exports
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'puffin.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(file_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+
+    def override_get_db():
+        db = session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+def _wait(client, job, timeout=60):
+    deadline = time.monotonic() + timeout
+    while job["status"] in ("queued", "running"):
+        assert time.monotonic() < deadline, "export did not finish"
+        time.sleep(0.1)
+        job = client.get(f"/api/exports/{job['id']}").json()
+    return job
+
+
+def _seed(client, n=3):
+    for i in range(n):
+        client.post("/api/diapers", json={"type": "pee", "notes": f"note {i}"})
+
+
+def test_export_job_renders_the_same_file_as_the_direct_download(client):
+    _seed(client)
+    job = client.post("/api/exports?format=csv")
+    assert job.status_code == 202
+
+    job = _wait(client, job.json())
+    assert job["status"] == "done"
+    assert job["rows_done"] == job["rows_total"] == 3
+
+    resp = client.get(job["download_url"])
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "puffin_export.csv" in resp.headers["content-disposition"]
+    assert resp.text == client.get("/api/export?format=csv").text
+
+
+def test_repeated_export_is_served_from_the_cache(client):
+    _seed(client)
+    first = _wait(client, client.post("/api/exports?format=json").json())
+
+    again = client.post("/api/exports?format=json").json()
+    assert again["id"] == first["id"]
+    assert again["status"] == "done"
+
+
+def test_a_new_log_invalidates_the_cached_export(client):
+    _seed(client)
+    first = _wait(client, client.post("/api/exports?format=csv").json())
+
+    client.post("/api/diapers", json={"type": "poop"})
+    second = client.post("/api/exports?format=csv").json()
+    assert second["id"] != first["id"]
+    assert _wait(client, second)["rows_total"] == 4
+
+
+def test_export_download_honours_byte_ranges(client):
+    _seed(client)
+    job = _wait(client, client.post("/api/exports?format=pdf").json())
+    whole = client.get(job["download_url"]).content
+
+    part = client.get(job["download_url"], headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206
+    assert part.content == whole[:10]
+    assert part.headers["content-range"] == f"bytes 0-9/{len(whole)}"
+
+
+def test_deleting_a_finished_export_removes_its_file(client):
+    _seed(client)
+    job = _wait(client, client.post("/api/exports?format=ndjson").json())
+
+    assert client.delete(f"/api/exports/{job['id']}").status_code == 204
+    assert client.get(f"/api/exports/{job['id']}").status_code == 404
+    assert client.get(job["download_url"]).status_code == 404
+
+
+def test_unknown_or_malformed_job_ids_are_not_found(client):
+    assert client.get(f"/api/exports/{'0' * 32}").status_code == 404
+    assert client.get("/api/exports/..%2F..%2Fpuffin.db/file").status_code == 404
+
+
+def test_worker_stops_at_the_cancel_marker(file_engine, tmp_path):
+    """Cancellation is checked between batches and leaves no partial file."""
+    with file_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO diaper_changes (timestamp, type, created_at) "
+                "VALUES ('2026-01-01', 0, '2026-01-01')"
+            )
+        )
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    request = export_jobs.ExportRequest("csv", None, None, None)
+    (directory / "job.cancel").touch()
+
+    with pytest.raises(export_jobs.ExportCancelledError):
+        export_jobs._run(str(file_engine.url), str(directory), "job", request, 1, "UTC")
+    assert sorted(p.name for p in directory.iterdir()) == ["job.progress"]
+
+
+def test_finished_jobs_are_left_to_their_files(client):
+    _seed(client)
+    job = _wait(client, client.post("/api/exports?format=csv").json())
+    assert job["status"] == "done"
+    deadline = time.monotonic() + 5  # the done callback runs just after the file appears
+    while job["id"] in export_jobs._jobs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job["id"] not in export_jobs._jobs
+
+
+def test_a_write_before_the_worker_renders_goes_under_the_newer_key(client, monkeypatch):
+    _seed(client)
+    # As if the version was read, then a log landed before the worker began.
+    monkeypatch.setattr(exports, "read_data_version", lambda conn: -1)
+
+    job = _wait(client, client.post("/api/exports?format=csv").json())
+    assert job["status"] == "done"
+    assert job["rows_total"] == 3
+    assert job["download_url"] != f"/api/exports/{job['id']}/file"
+    assert job["id"] in export_jobs._jobs, "kept: its file is under another key"
+
+    monkeypatch.undo()
+    current = client.post("/api/exports?format=csv").json()
+    assert current["status"] == "done", "served from the file the first job rendered"
+    assert job["download_url"] == current["download_url"]
+
+
+def test_every_write_bumps_the_data_version(client, file_engine):
+    def version():
+        with file_engine.connect() as conn:
+            return conn.execute(text("SELECT version FROM data_version")).scalar_one()
+
+    start = version()
+    diaper = client.post("/api/diapers", json={"type": "pee"}).json()
+    client.put(f"/api/diapers/{diaper['id']}", json={"notes": "edited"})
+    client.delete(f"/api/diapers/{diaper['id']}")
+    client.post("/api/children", json={"name": "Maya"})
+    assert version() == start + 4
@@ -510,26 +510,92 @@ def test_implausible_temperature_is_rejected(client):
     assert resp.status_code == 201
 
 
-def test_saved_medication_survives_a_lost_race(client, monkeypatch):
-    """Losing the check-then-insert race must not surface as a 500.
-
-    ``SavedMedication.name`` is unique and the existence check is not atomic
-    with the insert, so two parents saving the same new medication at once can
-    both pass the check. Patching the check to report "absent" while the row
-    exists reproduces the loser's path deterministically -- a plain sequential
-    duplicate returns at the check and never reaches the insert.
-
-    This matters because ``add_saved_medication`` runs *after* the medication
-    log has already been committed, so an uncaught IntegrityError showed the
-    user a failure for a save that had partly succeeded.
+def test_saved_medication_duplicate_is_not_an_error(client):
+    """Saving an already-saved name, in any casing, must not surface as a 500.
+
+    ``add_saved_medication`` runs *after* the medication log has already been
+    committed, so an error here showed the user a failure for a save that had
+    partly succeeded.  It used to check and then insert, and two parents saving
+    the same new medication at once could both pass the check; it is now a
+    single upsert against the NOCASE unique index, so a duplicate is a no-op.
     """
-    from puffin import crud
-
     payload = {"medication_name": "Tylenol", "dosage_quantity": 2.5, "dosage_unit": "mL"}
     assert client.post("/api/medications", json=payload).status_code == 201
 
-    monkeypatch.setattr(crud, "_saved_medication_exists", lambda db, name: False)
-    resp = client.post("/api/medications", json=payload)
+    resp = client.post("/api/medications", json={**payload, "medication_name": "tylenol"})
+
+    assert resp.status_code == 201
+    assert client.get("/api/medications/saved-names").json() == ["Tylenol"]
+
 
+def _log_med(client, name, ts="2026-04-01T10:00:00Z"):
+    resp = client.post(
+        "/api/medications",
+        json={
+            "medication_name": name,
+            "dosage_quantity": 1.0,
+            "dosage_unit": "mL",
+            "timestamp": ts,
+        },
+    )
     assert resp.status_code == 201
-    assert client.get("/api/medications/saved-names").json().count("Tylenol") == 1
+
+
+def test_saved_names_prefix_search_ranks_by_use_then_recency(client):
+    _log_med(client, "Tylenol")
+    _log_med(client, "Tums", ts="2026-04-03T10:00:00Z")
+    _log_med(client, "Tea tree oil", ts="2026-04-02T10:00:00Z")
+    _log_med(client, "tylenol")
+    _log_med(client, "Vitamin D")
+
+    names = client.get("/api/medications/saved-names?prefix=t").json()
+
+    # Tylenol was logged twice; Tums more recently than the tea tree oil.
+    assert names == ["Tylenol", "Tums", "Tea tree oil"]
+    assert client.get("/api/medications/saved-names?prefix=TU").json() == ["Tums"]
+    assert client.get("/api/medications/saved-names?prefix=x").json() == []
+
+
+def test_saved_names_exact_match_leads_the_search(client):
+    """The exact name comes first even when longer names are used more often."""
+    for _ in range(3):
+        _log_med(client, "Vitamin D drops")
+    _log_med(client, "Vitamin D")
+
+    names = client.get("/api/medications/saved-names?prefix=vitamin d").json()
+    assert names == ["Vitamin D", "Vitamin D drops"]
+
+
+def test_saved_names_prefix_search_is_limited(client):
+    for i in range(5):
+        _log_med(client, f"Med {i}")
+
+    resp = client.get("/api/medications/saved-names?prefix=med&limit=3")
+    assert len(resp.json()) == 3
+    # An empty prefix is a ranked search over everything, not the full list.
+    assert len(client.get("/api/medications/saved-names?prefix=&limit=2").json()) == 2
+
+
+def test_saved_names_prefix_search_seeks_the_nocase_index(client):
+    """The prefix is a range on the NOCASE unique index, not a full scan."""
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    _log_med(client, "Tylenol")
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM saved_medications" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert client.get("/api/medications/saved-names?prefix=ty").json() == ["Tylenol"]
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    sql, params = statements[-1]
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()
+    assert any("idx_saved_medication_name" in row[-1] for row in plan)
@@ -0,0 +1,152 @@
+"""Bulk import: Puffin's exports round-trip, and generic CSVs are checked row by row."""
+
+import pytest
+
+from puffin.routers import imports
+
+_GENERIC_CSV = """kind,timestamp,type,feeding_type,duration_minutes,amount,amount_unit,child,notes
+diaper,2026-07-19T08:00:00,pee,,,,,Maya,
+feeding,2026-07-19T08:30:00Z,,bottle,,4,oz,Maya,evening top-up
+feeding,2026-07-19T09:00:00Z,,bottle,,4,,Noah,missing unit
+diaper,,poop,,,,,,no time
+nap,2026-07-19T10:00:00Z,,,,,,,
+"""
+
+
+def _seed(client):
+    maya = client.post("/api/children", json={"name": "Maya"}).json()
+    client.post(
+        "/api/diapers",
+        json={"type": "poop", "timestamp": "2026-07-19T06:00:00Z", "child_id": maya["id"]},
+    )
+    client.post(
+        "/api/feedings",
+        json={
+            "feeding_type": "bottle",
+            "amount": 120,
+            "amount_unit": "mL",
+            "bottle_type": "formula",
+            "timestamp": "2026-07-19T07:00:00Z",
+            "notes": "café, “quoted”",
+        },
+    )
+    client.post(
+        "/api/medications",
+        json={
+            "medication_name": "Vitamin D",
+            "dosage_quantity": 1,
+            "dosage_unit": "drop(s)",
+            "timestamp": "2026-07-19T07:30:00Z",
+            "child_id": maya["id"],
+        },
+    )
+    client.post(
+        "/api/temperatures",
+        json={"temperature": 37.2, "unit": "C", "timestamp": "2026-07-19T07:45:00Z"},
+    )
+
+
+def _logs(client):
+    """Every log, without ids, for comparing before and after an import."""
+    logs = []
+    for path in ("diapers", "feedings", "medications", "temperatures"):
+        for log in client.get(f"/api/{path}").json():
+            logs.append({k: v for k, v in log.items() if k != "id"})
+    return sorted(logs, key=repr)
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson", "csv"])
+def test_export_round_trips_through_import(client, fmt):
+    _seed(client)
+    before = _logs(client)
+    exported = client.get(f"/api/export?format={fmt}").content
+
+    resp = client.post("/api/import", files={"file": (f"puffin_export.{fmt}", exported)})
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["failed"] == 0, result["errors"]
+    assert result["imported"] == {"diaper": 1, "feeding": 1, "medication": 1, "temperature": 1}
+    assert result["children_created"] == []
+
+    # Every log is now there twice: the original and its imported copy.
+    after = _logs(client)
+    assert sorted(before * 2, key=repr) == after
+
+
+def test_generic_csv_reports_bad_rows_and_imports_the_rest(client):
+    resp = client.post("/api/import", files={"file": ("other_app.csv", _GENERIC_CSV)})
+    result = resp.json()
+
+    assert result["imported"] == {"diaper": 1, "feeding": 1, "medication": 0, "temperature": 0}
+    assert result["children_created"] == ["Maya"]
+    assert result["failed"] == 3
+    assert [(e["row"], e["kind"]) for e in result["errors"]] == [
+        (4, "feeding"),
+        (5, "diaper"),
+        (6, "nap"),
+    ]
+    assert "amount_unit" in result["errors"][0]["message"]
+    assert result["errors"][1]["message"] == "timestamp is required"
+
+    maya = client.get("/api/children").json()[0]
+    feeding = client.get("/api/feedings").json()[0]
+    assert feeding["child_id"] == maya["id"]
+    assert feeding["notes"] == "evening top-up"
+
+
+def test_dry_run_validates_without_writing(client):
+    resp = client.post("/api/import?dry_run=true", files={"file": ("other_app.csv", _GENERIC_CSV)})
+    result = resp.json()
+    assert result["dry_run"] is True
+    assert result["imported"]["feeding"] == 1
+    assert result["children_created"] == ["Maya"]
+    assert client.get("/api/children").json() == []
+    assert client.get("/api/feedings").json() == []
+
+
+def test_naive_timestamps_are_local_time(client, monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    csv = "kind,timestamp,type\ndiaper,2026-07-19T08:00:00,pee\n"
+    client.post("/api/import", files={"file": ("log.csv", csv)})
+    assert client.get("/api/diapers").json()[0]["timestamp"] == "2026-07-19T12:00:00Z"
+
+
+def test_import_is_batched_and_checks_child_ids_once(client, monkeypatch):
+    monkeypatch.setattr(imports, "_BATCH", 2)
+    batches = []
+    insert_logs = imports.crud.insert_logs
+    monkeypatch.setattr(
+        imports.crud,
+        "insert_logs",
+        lambda db, rows: batches.append(sum(map(len, rows.values()))) or insert_logs(db, rows),
+    )
+    lines = [
+        f'{{"kind": "diaper", "type": "pee", "timestamp": "2026-07-19T0{i}:00:00Z"}}'
+        for i in range(5)
+    ]
+    lines.append(
+        '{"kind": "diaper", "type": "pee", "timestamp": "2026-07-19T09:00:00Z", "child_id": 7}'
+    )
+    resp = client.post("/api/import", files={"file": ("log.ndjson", "\n".join(lines))})
+
+    assert batches == [2, 2, 1]
+    assert resp.json()["errors"] == [{"row": 6, "kind": "diaper", "message": "Child 7 not found"}]
+    assert len(client.get("/api/diapers").json()) == 5
+
+
+def test_unreadable_files_are_refused(client):
+    assert client.post("/api/import", files={"file": ("x.txt", "a,b\n")}).status_code == 422
+    resp = client.post("/api/import", files={"file": ("x.csv", "a,b\n1,2\n")})
+    assert resp.status_code == 422
+    assert client.post("/api/import", files={"file": ("x.json", "[1, 2]")}).status_code == 422
+
+
+def test_a_changes_export_is_refused(client):
+    _seed(client)
+    changes = client.get("/api/export/changes?since=0").content
+    before = _logs(client)
+
+    resp = client.post("/api/import", files={"file": ("changes.json", changes)})
+    assert resp.status_code == 422
+    assert "changes export" in resp.json()["detail"]
+    assert _logs(client) == before
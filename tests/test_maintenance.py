@@ -0,0 +1,123 @@
+"""Maintenance: statistics, incremental auto-vacuum, free pages reclaimed in steps."""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from puffin import maintenance
+from puffin.database import Base
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A database that has just lost most of its rows, as after a bulk delete."""
+    path = tmp_path / "puffin.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.execute("CREATE INDEX idx_notes_body ON notes (body)")
+    conn.executemany("INSERT INTO notes (body) VALUES (?)", [("x" * 500,)] * 2000)
+    conn.commit()
+    conn.execute("DELETE FROM notes WHERE id > 100")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _pragma(path, name):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("journal_mode", ["delete", "wal"])
+def test_first_run_converts_then_later_runs_reclaim_in_steps(db_path, monkeypatch, journal_mode):
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.close()
+
+    report = maintenance.run_maintenance(db_path)
+    assert report.converted
+    assert report.size_after < report.size_before / 5
+    assert set(report.seconds) == {"prune", "analyze", "convert", "reclaim", "total"}
+    assert _pragma(db_path, "auto_vacuum") == 2  # incremental
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT count(*) FROM sqlite_stat1").fetchone()[0] > 0
+
+    conn.execute("DELETE FROM notes WHERE id > 10")
+    conn.commit()
+    conn.close()
+    free = _pragma(db_path, "freelist_count")
+    steps = []
+    monkeypatch.setattr(maintenance, "RECLAIM_STEP_PAGES", 4)
+    monkeypatch.setattr(maintenance.time, "sleep", steps.append)
+
+    report = maintenance.run_maintenance(db_path)
+    assert not report.converted
+    assert report.reclaimed_pages == free
+    assert len(steps) == -(-free // 4) - 1  # a pause between each step
+    assert _pragma(db_path, "freelist_count") == 0
+
+
+def test_compacted_snapshot(db_path, tmp_path):
+    report = maintenance.run_maintenance(db_path, snapshot=True)
+    assert report.snapshot.parent == tmp_path / "backups"
+    assert report.snapshot.name.endswith("-compacted.db")
+    assert _pragma(report.snapshot, "quick_check") == "ok"
+    assert report.snapshot.stat().st_size <= report.size_after
+
+
+def test_old_deletion_records_are_pruned(tmp_path, monkeypatch):
+    path = tmp_path / "puffin.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    for _ in range(3):
+        conn.execute(
+            "INSERT INTO diaper_changes (timestamp, type, created_at)"
+            " VALUES ('2026-03-01 08:00:00', 0, '2026-03-01 08:00:00')"
+        )
+    conn.execute("DELETE FROM diaper_changes WHERE id < 3")
+    # The first deletion long ago, the second just now.
+    conn.execute("UPDATE row_changes SET updated_at = '2020-01-01 00:00:00' WHERE row_id = 1")
+    conn.commit()
+    old_seq = conn.execute("SELECT seq FROM row_changes WHERE row_id = 1").fetchone()[0]
+
+    monkeypatch.setenv("PUFFIN_CHANGES_RETENTION_DAYS", "30")
+    report = maintenance.run_maintenance(path)
+
+    assert report.pruned_tombstones == 1
+    rows = conn.execute("SELECT row_id, deleted FROM row_changes ORDER BY row_id").fetchall()
+    assert rows == [(2, 1), (3, 0)]
+    assert conn.execute("SELECT pruned_through FROM data_version").fetchone()[0] == old_seq
+    conn.close()
+
+    monkeypatch.setenv("PUFFIN_CHANGES_RETENTION_DAYS", "0")
+    assert maintenance.run_maintenance(path).pruned_tombstones == 0
+
+
+def test_no_database_yet(tmp_path):
+    assert maintenance.run_maintenance(tmp_path / "puffin.db") is None
+
+
+@pytest.mark.parametrize(
+    ("env", "settings"),
+    [
+        ({}, (None, False)),
+        ({"PUFFIN_MAINTENANCE_INTERVAL_HOURS": "24"}, (86400.0, False)),
+        ({"PUFFIN_MAINTENANCE_INTERVAL_HOURS": "x"}, (None, False)),
+        (
+            {"PUFFIN_MAINTENANCE_INTERVAL_HOURS": "0.5", "PUFFIN_MAINTENANCE_SNAPSHOT": "1"},
+            (1800.0, True),
+        ),
+    ],
+)
+def test_settings_from_env(monkeypatch, env, settings):
+    monkeypatch.delenv("PUFFIN_MAINTENANCE_INTERVAL_HOURS", raising=False)
+    monkeypatch.delenv("PUFFIN_MAINTENANCE_SNAPSHOT", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert maintenance.settings_from_env() == settings
@@ -13,13 +13,15 @@ user upgrading from an older release still ends up with:
 """
 
 import sqlite3
+from datetime import datetime
 
 import pytest
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, insert, inspect, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.pool import StaticPool
 
-from puffin import models  # noqa: F401  (register ORM models on Base.metadata)
 from puffin.database import Base, _run_migrations
+from puffin.models import Feeding, Medication, TemperatureReading
 
 
 def _legacy_schema_sql() -> str:
@@ -99,7 +101,7 @@ def test_migration_renames_feeding_amount_column(legacy_engine):
     with legacy_engine.connect() as conn:
         cols = {c["name"] for c in inspect(conn).get_columns("feedings")}
         rows = conn.execute(
-            text("SELECT feeding_type, amount, amount_unit FROM feedings ORDER BY id")
+            select(Feeding.feeding_type, Feeding.amount, Feeding.amount_unit).order_by(Feeding.id)
         ).fetchall()
     assert "amount" in cols
     assert "amount_unit" in cols
@@ -119,6 +121,21 @@ def test_migration_adds_child_id_to_every_log_table(legacy_engine, table):
     assert "child_id" in cols
 
 
+def test_migration_replaces_the_child_index_with_child_and_timestamp(legacy_engine):
+    """The composite index serves "latest log for this child" without a sort."""
+    with legacy_engine.connect() as conn:
+        conn.execute(text("DROP INDEX idx_diaper_child_timestamp"))
+        conn.execute(text("CREATE INDEX idx_diaper_child ON diaper_changes (child_id)"))
+        conn.commit()
+    _run_migrations(bind=legacy_engine)
+    with legacy_engine.connect() as conn:
+        indexes = {
+            i["name"]: i["column_names"] for i in inspect(conn).get_indexes("diaper_changes")
+        }
+    assert indexes["idx_diaper_child_timestamp"] == ["child_id", "timestamp"]
+    assert "idx_diaper_child" not in indexes
+
+
 def test_migration_leaves_existing_logs_unassigned(legacy_engine):
     """No log is silently adopted by a profile — bulk assignment is opt-in.
 
@@ -184,7 +201,9 @@ def test_migration_adds_amount_unit_to_current_amount_schema(tmp_path):
         with engine.connect() as conn:
             cols = {c["name"] for c in inspect(conn).get_columns("feedings")}
             rows = conn.execute(
-                text("SELECT feeding_type, amount, amount_unit FROM feedings ORDER BY id")
+                select(Feeding.feeding_type, Feeding.amount, Feeding.amount_unit).order_by(
+                    Feeding.id
+                )
             ).fetchall()
     finally:
         engine.dispose()
@@ -246,7 +265,9 @@ def test_migration_backfills_temperature_unit_as_celsius(tmp_path):
         with engine.connect() as conn:
             cols = {c["name"] for c in inspect(conn).get_columns("temperature_readings")}
             rows = conn.execute(
-                text("SELECT unit, temperature FROM temperature_readings ORDER BY id")
+                select(TemperatureReading.unit, TemperatureReading.temperature).order_by(
+                    TemperatureReading.id
+                )
             ).all()
     finally:
         engine.dispose()
@@ -309,7 +330,9 @@ def test_migration_reconstructs_entered_fahrenheit(tmp_path):
         with engine.connect() as conn:
             cols = {c["name"] for c in inspect(conn).get_columns("temperature_readings")}
             rows = conn.execute(
-                text("SELECT unit, temperature FROM temperature_readings ORDER BY id")
+                select(TemperatureReading.unit, TemperatureReading.temperature).order_by(
+                    TemperatureReading.id
+                )
             ).all()
     finally:
         engine.dispose()
@@ -331,9 +354,9 @@ def test_migration_drops_obsolete_dosage_column(legacy_engine):
 def test_migration_parses_existing_dosage_values(legacy_engine):
     with legacy_engine.connect() as conn:
         rows = conn.execute(
-            text(
-                "SELECT medication_name, dosage_quantity, dosage_unit FROM medications ORDER BY id"
-            )
+            select(
+                Medication.medication_name, Medication.dosage_quantity, Medication.dosage_unit
+            ).order_by(Medication.id)
         ).fetchall()
     assert rows[0] == ("Tylenol", 2.5, "mL")
     assert rows[1] == ("Vitamin D", 400.0, "unit(s)")
@@ -356,19 +379,14 @@ def test_new_medication_insert_works_after_migration(legacy_engine):
     old ``dosage`` column) must succeed."""
     with legacy_engine.connect() as conn:
         conn.execute(
-            text(
-                "INSERT INTO medications "
-                "(timestamp, medication_name, dosage_quantity, dosage_unit, notes, created_at) "
-                "VALUES (:ts, :name, :qty, :unit, :notes, :created_at)"
-            ),
-            {
-                "ts": "2026-04-24 00:00:00",
-                "name": "Advil",
-                "qty": 1.0,
-                "unit": "mL",
-                "notes": None,
-                "created_at": "2026-04-24 00:00:00",
-            },
+            insert(Medication).values(
+                timestamp=datetime(2026, 4, 24),
+                medication_name="Advil",
+                dosage_quantity=1.0,
+                dosage_unit="mL",
+                notes=None,
+                created_at=datetime(2026, 4, 24),
+            )
         )
         conn.commit()
         count = conn.execute(
@@ -391,3 +409,225 @@ def test_migration_is_idempotent(legacy_engine):
     assert "amount_unit" in feeding_cols
     assert "amount_oz" not in feeding_cols
     assert saved == 2
+
+
+def test_migration_stores_enum_columns_as_integer_codes(legacy_engine):
+    """The repeated enum strings become small integer codes, fenced by CHECKs."""
+    with legacy_engine.connect() as conn:
+        stored = conn.execute(
+            text("SELECT typeof(feeding_type), typeof(amount_unit) FROM feedings ORDER BY id")
+        ).first()
+        assert stored == ("integer", "integer")
+        # Reads through the model still hand back the enum values.
+        assert conn.execute(select(Feeding.feeding_type).order_by(Feeding.id)).scalar() == "bottle"
+        with pytest.raises(IntegrityError):
+            conn.execute(
+                text(
+                    "INSERT INTO feedings (timestamp, feeding_type) "
+                    "VALUES ('2026-04-24 00:00:00', 99)"
+                )
+            )
+
+
+def test_migration_refuses_unrecognized_enum_values(tmp_path):
+    """A value outside the enum is never relabelled; the rebuild does not run."""
+    db_path = tmp_path / "odd_diaper.db"
+    raw = sqlite3.connect(db_path)
+    raw.executescript(
+        """
+        CREATE TABLE feedings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME NOT NULL,
+            feeding_type TEXT NOT NULL,
+            duration_minutes INTEGER,
+            amount REAL,
+            amount_unit TEXT,
+            notes TEXT,
+            session_id TEXT,
+            bottle_type TEXT,
+            created_at DATETIME
+        );
+        CREATE TABLE diaper_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME NOT NULL, type TEXT NOT NULL,
+            notes TEXT, created_at DATETIME);
+        INSERT INTO diaper_changes (timestamp, type) VALUES ('2026-04-01 09:00:00', 'mystery');
+        """
+    )
+    raw.commit()
+    raw.close()
+
+    engine = create_engine(f"sqlite:///{db_path}", poolclass=StaticPool)
+    try:
+        with pytest.raises(RuntimeError, match="diaper_changes.type"):
+            _run_migrations(bind=engine)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT type FROM diaper_changes")).scalar() == "mystery"
+    finally:
+        engine.dispose()
+
+
+def _legacy_diapers(tmp_path):
+    """A legacy database with three diapers, the newest deleted, one lacking created_at."""
+    db_path = tmp_path / "legacy_diapers.db"
+    raw = sqlite3.connect(db_path)
+    raw.executescript(_legacy_schema_sql())
+    raw.executescript(
+        """
+        INSERT INTO diaper_changes (timestamp, type, created_at)
+            VALUES ('2026-04-01 09:00:00', 'pee', NULL),
+                   ('2026-04-01 10:00:00', 'poop', '2026-04-01 10:00:00'),
+                   ('2026-04-01 11:00:00', 'dry', '2026-04-01 11:00:00');
+        DELETE FROM diaper_changes WHERE id = 3;
+        """
+    )
+    raw.commit()
+    raw.close()
+    return create_engine(f"sqlite:///{db_path}", poolclass=StaticPool)
+
+
+def test_migration_encodes_rows_without_created_at_and_keeps_autoincrement(tmp_path):
+    engine = _legacy_diapers(tmp_path)
+    try:
+        Base.metadata.create_all(bind=engine)
+        _run_migrations(bind=engine)
+        with engine.connect() as conn:
+            assert conn.execute(
+                text("SELECT created_at = timestamp FROM diaper_changes WHERE id = 1")
+            ).scalar()
+            ddl = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = 'diaper_changes'")
+            ).scalar()
+            assert "AUTOINCREMENT" in ddl
+            # The deleted diaper's id is not handed out again.
+            conn.execute(
+                text(
+                    "INSERT INTO diaper_changes (timestamp, type, created_at)"
+                    " VALUES ('2026-04-02 09:00:00', 0, '2026-04-02 09:00:00')"
+                )
+            )
+            assert conn.execute(text("SELECT max(id) FROM diaper_changes")).scalar() == 4
+    finally:
+        engine.dispose()
+
+
+def test_migration_rebuild_is_all_or_nothing(tmp_path, monkeypatch):
+    """A failure part-way through a rebuild leaves the table as it was."""
+    from puffin import database
+
+    def crash(conn, old, new):
+        raise RuntimeError("power cut")
+
+    monkeypatch.setattr(database, "_carry_autoincrement", crash)
+    engine = _legacy_diapers(tmp_path)
+    try:
+        with pytest.raises(RuntimeError, match="power cut"):
+            _run_migrations(bind=engine)
+        with engine.connect() as conn:
+            tables = conn.execute(
+                text("SELECT name FROM sqlite_master WHERE name LIKE 'diaper_changes%'")
+            ).scalars()
+            assert list(tables) == ["diaper_changes"]
+            assert conn.execute(
+                text("SELECT type FROM diaper_changes ORDER BY id")
+            ).scalars().all() == [
+                "pee",
+                "poop",
+            ]
+    finally:
+        engine.dispose()
+
+
+def test_migration_collapses_case_duplicate_saved_names(legacy_engine):
+    """Duplicates the old check-then-insert let through are folded onto the
+    first-saved casing so the NOCASE unique index can be built."""
+    with legacy_engine.connect() as conn:
+        conn.execute(text("DROP INDEX idx_saved_medication_name"))
+        conn.execute(
+            text("INSERT INTO saved_medications (name, created_at) VALUES ('TYLENOL', :now)"),
+            {"now": datetime(2026, 4, 24)},
+        )
+        conn.commit()
+
+    _run_migrations(bind=legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        names = conn.execute(text("SELECT name FROM saved_medications ORDER BY id")).scalars()
+        indexes = {i["name"] for i in inspect(conn).get_indexes("saved_medications")}
+        assert list(names) == ["Tylenol", "Vitamin D"]
+    assert "idx_saved_medication_name" in indexes
+
+
+def test_migration_backfills_and_attaches_the_search_index(legacy_engine):
+    """Logs predating search are indexed, and the tables the enum-code rebuild
+    recreated are still tracked afterwards."""
+    with legacy_engine.connect() as conn:
+        hits = conn.execute(
+            text("SELECT rowid / 4 FROM log_search WHERE log_search MATCH 'tylenol'")
+        ).scalars()
+        assert sorted(hits) == [1, 3]
+
+        conn.execute(
+            text(
+                "INSERT INTO diaper_changes (timestamp, type, notes, created_at) "
+                "VALUES ('2026-04-24 00:00:00', 0, 'heat rash', '2026-04-24 00:00:00')"
+            )
+        )
+        conn.commit()
+        assert conn.execute(
+            text("SELECT COUNT(*) FROM log_search WHERE notes MATCH 'rash'")
+        ).scalar()
+
+
+def test_migration_tracks_the_data_version_on_rebuilt_tables(legacy_engine):
+    """The enum-code rebuild drops every trigger; the version ones come back."""
+    with legacy_engine.connect() as conn:
+        before = conn.execute(text("SELECT version FROM data_version")).scalar_one()
+        conn.execute(text("UPDATE feedings SET notes = 'edited'"))
+        conn.commit()
+        after = conn.execute(text("SELECT version FROM data_version")).scalar_one()
+    assert after > before
+
+
+def test_migration_enters_existing_rows_in_the_change_log(legacy_engine):
+    """Every legacy row is in ``row_changes``, and the bump-only triggers are
+    replaced rather than left to count each write twice."""
+    with legacy_engine.connect() as conn:
+        logged = conn.execute(
+            text("SELECT table_name, COUNT(*) FROM row_changes WHERE seq > 0 GROUP BY table_name")
+        ).all()
+        assert dict(logged) == {"feedings": 2, "medications": 3}
+        triggers = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE name GLOB '*_version_*'")
+        ).all()
+        assert triggers == []
+
+        before = conn.execute(text("SELECT version FROM data_version")).scalar_one()
+        conn.execute(text("UPDATE feedings SET notes = 'edited' WHERE id = 1"))
+        conn.commit()
+        assert conn.execute(text("SELECT version FROM data_version")).scalar_one() == before + 1
+        assert (
+            conn.execute(
+                text("SELECT seq FROM row_changes WHERE table_name = 'feedings' AND row_id = 1")
+            ).scalar_one()
+            == before + 1
+        )
+
+
+def test_migration_adds_the_pruned_mark_to_an_existing_version_row(tmp_path):
+    """A ``data_version`` from before tombstone pruning gains an unset mark."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'versioned.db'}")
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text("CREATE TABLE data_version (id INTEGER PRIMARY KEY, version INTEGER)")
+            )
+            conn.execute(text("INSERT INTO data_version VALUES (1, 7)"))
+        Base.metadata.create_all(bind=engine)
+        _run_migrations(bind=engine)
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT version, pruned_through FROM data_version")).one()
+        assert row.version >= 7
+        assert row.pruned_through == 0
+    finally:
+        engine.dispose()
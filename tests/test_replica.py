@@ -0,0 +1,176 @@
+"""WAL shipping: every committed write reaches the replica, restorable to a point in time."""
+
+import sqlite3
+import struct
+import time
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+from puffin import replica
+from puffin.database import Base, _leave_checkpoints_to_replica
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "puffin.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def replicator(db_path, tmp_path):
+    # An hour's interval: only the syncs asked for below happen.
+    r = replica.Replicator(f"sqlite:///{db_path}", tmp_path / "replica", interval=3600)
+    deadline = time.monotonic() + 5
+    while r.last_sync is None and time.monotonic() < deadline:  # the first, with the snapshot
+        time.sleep(0.01)
+    yield r
+    r.close()
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    return conn
+
+
+def _log_diapers(conn, count=1):
+    for _ in range(count):
+        conn.execute(
+            "INSERT INTO diaper_changes (timestamp, type, created_at)"
+            " VALUES ('2026-03-01 08:00:00', 0, '2026-03-01 08:00:00')"
+        )
+        conn.commit()
+
+
+def _wal_checkpoint_seq(db_path):
+    with open(f"{db_path}-wal", "rb") as wal:
+        return struct.unpack(">4I", wal.read(16))[3]
+
+
+def _diapers(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT count(*) FROM diaper_changes").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_restore_latest_and_point_in_time(db_path, tmp_path, replicator):
+    conn = _connect(db_path)
+    _log_diapers(conn)
+    assert replicator.sync() > 0
+    between = datetime.now(UTC)
+    time.sleep(0.01)
+    _log_diapers(conn, 2)
+    replicator.sync()
+    assert replicator.sync() == 0
+    conn.close()
+    replicator.close()
+
+    (generation,) = (tmp_path / "replica" / "puffin").iterdir()
+    assert len(list(generation.glob("wal/*.wal"))) == 2
+
+    replica.restore_replica(tmp_path / "replica", db_path)
+    assert _diapers(db_path) == 3
+    replica.restore_replica(tmp_path / "replica", db_path, at=between)
+    assert _diapers(db_path) == 1
+    with pytest.raises(LookupError):
+        replica.restore_replica(tmp_path / "replica", db_path, at=datetime(2020, 1, 1, tzinfo=UTC))
+
+
+def test_checkpoints_and_wal_restarts_lose_nothing(db_path, tmp_path, replicator, monkeypatch):
+    monkeypatch.setattr(replica, "CHECKPOINT_PAGES", 1)
+    conn = _connect(db_path)
+    for _ in range(5):
+        _log_diapers(conn, 3)
+        replicator.sync()
+    conn.close()
+    replicator.close()
+
+    # The replicator's checkpoints let the WAL restart, without a new generation.
+    assert replicator._checkpoint_seq >= 3
+    assert len(list((tmp_path / "replica" / "puffin").iterdir())) == 1
+    replica.restore_replica(tmp_path / "replica", db_path)
+    assert _diapers(db_path) == 15
+
+
+def test_outside_checkpoint_starts_a_generation(db_path, tmp_path, replicator):
+    conn = sqlite3.connect(db_path)
+    _log_diapers(conn)
+    replicator.sync()
+    for _ in range(2):
+        _log_diapers(conn)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    _log_diapers(conn)
+    conn.close()
+    time.sleep(0.01)  # a distinct stamp for the new generation
+    replicator.sync()
+    replicator.close()
+
+    assert len(list((tmp_path / "replica" / "puffin").iterdir())) == 2
+    replica.restore_replica(tmp_path / "replica", db_path)
+    assert _diapers(db_path) == 4
+
+
+def test_a_single_outside_checkpoint_starts_a_generation(db_path, tmp_path, replicator):
+    conn = _connect(db_path)
+    _log_diapers(conn)
+    replicator.sync()
+    _log_diapers(conn)  # never shipped: checkpointed away below
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    _log_diapers(conn)  # restarts the WAL, one checkpoint on as after the replicator's own
+    conn.close()
+    time.sleep(0.01)
+    replicator.sync()
+    replicator.close()
+
+    assert len(list((tmp_path / "replica" / "puffin").iterdir())) == 2
+    replica.restore_replica(tmp_path / "replica", db_path)
+    assert _diapers(db_path) == 3
+
+
+def test_app_connections_leave_checkpoints_to_the_replica(tmp_path, monkeypatch):
+    conn = sqlite3.connect(tmp_path / "puffin.db")
+    _leave_checkpoints_to_replica(conn, None)
+    assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 1000
+
+    monkeypatch.setenv("PUFFIN_REPLICA_DIR", str(tmp_path / "replica"))
+    _leave_checkpoints_to_replica(conn, None)
+    assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+    conn.close()
+
+
+def test_replica_down_backs_off_and_keeps_checkpointing(db_path, replicator, monkeypatch):
+    snapshots = []
+
+    def unreachable(source, dest, **kwargs):
+        snapshots.append(dest)
+        raise OSError("No such device")
+
+    monkeypatch.setattr(replica.backup, "copy_database", unreachable)
+    replicator.generation = None
+    with pytest.raises(OSError):
+        replicator.sync()
+
+    conn = _connect(db_path)
+    _log_diapers(conn)
+    seq_before = _wal_checkpoint_seq(db_path)
+    for _ in range(3):
+        _log_diapers(conn)
+        assert replicator.sync() == 0
+    conn.close()
+
+    # No snapshot retried inside the pause, but the WAL was checkpointed and restarted.
+    assert len(snapshots) == 1
+    assert _wal_checkpoint_seq(db_path) > seq_before
+
+    replicator._retry_at = 0
+    with pytest.raises(OSError):
+        replicator.sync()
+    assert len(snapshots) == 2
+    assert replicator._backoff == 2 * replica.SYNC_INTERVAL
@@ -0,0 +1,93 @@
+"""Tests for /api/search: full-text search over notes and medication names."""
+
+
+def _search(client, q, **params):
+    resp = client.get("/api/search", params={"q": q, **params})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_search_finds_notes_across_log_types(client):
+    client.post("/api/diapers", json={"type": "poop", "notes": "small rash on the left side"})
+    client.post("/api/feedings", json={"feeding_type": "bottle", "notes": "no rash today"})
+    client.post("/api/temperatures", json={"temperature": 99.1, "notes": "fussy"})
+
+    results = _search(client, "rash")
+
+    assert {r["type"] for r in results} == {"diaper", "feeding"}
+    assert all("<mark>rash</mark>" in r["snippet"] for r in results)
+
+
+def test_search_matches_medication_names(client):
+    created = client.post(
+        "/api/medications",
+        json={"medication_name": "Tylenol", "dosage_quantity": 2.5, "dosage_unit": "mL"},
+    ).json()
+
+    results = _search(client, "tylenol")
+    assert len(results) == 1
+    assert results[0]["type"] == "medication"
+    assert results[0]["timestamp"] == created["timestamp"]  # formatted like every other log
+    assert results[0]["snippet"] == "<mark>Tylenol</mark>"
+
+
+def test_search_matches_the_last_word_as_a_prefix(client):
+    client.post("/api/diapers", json={"type": "pee", "notes": "Blowout after the walk"})
+
+    assert len(_search(client, "blow")) == 1
+    assert _search(client, "walk blow") != []
+    assert _search(client, "lowout") == []
+
+
+def test_search_follows_edits_and_deletes(client):
+    diaper = client.post("/api/diapers", json={"type": "pee", "notes": "rash"}).json()
+
+    client.put(f"/api/diapers/{diaper['id']}", json={"notes": "cleared up"})
+    assert _search(client, "rash") == []
+    assert [r["id"] for r in _search(client, "cleared")] == [diaper["id"]]
+
+    client.delete(f"/api/diapers/{diaper['id']}")
+    assert _search(client, "cleared") == []
+
+
+def test_search_is_scoped_to_the_selected_child(client):
+    kid = client.post("/api/children", json={"name": "Ada"}).json()
+    client.post("/api/diapers", json={"type": "pee", "notes": "rash", "child_id": kid["id"]})
+    client.post("/api/diapers", json={"type": "pee", "notes": "rash"})
+
+    assert len(_search(client, "rash")) == 2
+    assert len(_search(client, "rash", child_id=kid["id"])) == 1
+    assert len(_search(client, "rash", unassigned=True)) == 1
+
+    # Re-assigning a log moves it between scopes.
+    client.post(f"/api/children/{kid['id']}/assign-unassigned")
+    assert len(_search(client, "rash", child_id=kid["id"])) == 2
+
+
+def test_search_paginates(client):
+    for i in range(5):
+        client.post(
+            "/api/diapers",
+            json={"type": "pee", "notes": f"rash {i}", "timestamp": f"2026-04-0{i + 1}T10:00:00Z"},
+        )
+
+    first = _search(client, "rash", limit=2)
+    second = _search(client, "rash", limit=2, offset=2)
+    assert len(first) == 2 and len(second) == 2
+    assert not {r["id"] for r in first} & {r["id"] for r in second}
+
+
+def test_search_input_is_literal_and_snippets_are_escaped(client):
+    """FTS5 operators and markup in the query or the note must not leak through."""
+    client.post("/api/diapers", json={"type": "pee", "notes": '<b>"odd"</b> AND (note'})
+
+    assert _search(client, "AND (") != []
+    assert _search(client, '"odd') != []
+    snippet = _search(client, "odd")[0]["snippet"]
+    assert "<b>" not in snippet
+    assert "&lt;b&gt;" in snippet
+
+
+def test_search_requires_a_query(client):
+    assert client.get("/api/search?q=").status_code == 422
+    assert _search(client, "   ") == []
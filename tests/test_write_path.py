@@ -0,0 +1,107 @@
+"""Each write endpoint is a single statement: INSERT/UPDATE/DELETE ... RETURNING."""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from tests.conftest import engine
+
+_CREATES = {
+    "/api/diapers": {"type": "pee"},
+    "/api/feedings": {"feeding_type": "bottle", "amount": 3, "amount_unit": "oz"},
+    "/api/medications": {"medication_name": "Tylenol", "dosage_quantity": 2.5, "dosage_unit": "mL"},
+    "/api/temperatures": {"temperature": 37.2, "unit": "C"},
+    "/api/children": {"name": "Maya"},
+}
+_UPDATES = {
+    "/api/diapers": {"type": "both", "notes": "changed"},
+    "/api/feedings": {"amount": 4, "amount_unit": "oz"},
+    "/api/medications": {"dosage_quantity": 5},
+    "/api/temperatures": {"temperature": 99.1, "unit": "F"},
+    "/api/children": {"name": "Maya B"},
+}
+
+
+@contextmanager
+def _statements():
+    """The SQL statements run inside the block."""
+    seen = []
+
+    def capture(conn, cursor, statement, *args):
+        seen.append(statement.split(None, 1)[0])
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield seen
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.parametrize("url", list(_CREATES))
+def test_create_is_one_insert(client, url):
+    with _statements() as statements:
+        resp = client.post(url, json=_CREATES[url])
+    assert resp.status_code == 201
+    assert resp.json()["id"] and resp.json()["created_at"]
+    # A medication also records its name for the autocomplete.
+    assert statements == (["INSERT", "INSERT"] if url == "/api/medications" else ["INSERT"])
+
+
+@pytest.mark.parametrize("url", list(_UPDATES))
+def test_update_is_one_update(client, url):
+    log_id = client.post(url, json=_CREATES[url]).json()["id"]
+    with _statements() as statements:
+        resp = client.put(f"{url}/{log_id}", json=_UPDATES[url])
+    assert resp.status_code == 200
+    assert resp.json().items() >= _UPDATES[url].items()
+    assert statements == ["UPDATE"]
+    assert client.get(f"{url}/{log_id}").json() == resp.json()
+
+    with _statements() as statements:
+        assert client.put(f"{url}/9999", json=_UPDATES[url]).status_code == 404
+    assert statements == ["UPDATE"]
+
+
+@pytest.mark.parametrize("url", list(_CREATES))
+def test_delete_is_one_delete(client, url):
+    log_id = client.post(url, json=_CREATES[url]).json()["id"]
+    with _statements() as statements:
+        assert client.delete(f"{url}/{log_id}").status_code == 204
+    # Deleting a profile also returns its logs to unassigned, one UPDATE per table.
+    assert statements[0] == "DELETE"
+    assert len(statements) == (5 if url == "/api/children" else 1)
+    assert client.get(f"{url}/{log_id}").status_code == 404
+    assert client.delete(f"{url}/{log_id}").status_code == 404
+
+
+def test_feeding_type_conversion_clears_fields_in_the_update(client):
+    breast = {"feeding_type": "breast_left", "duration_minutes": 12}
+    feeding_id = client.post("/api/feedings", json=breast).json()["id"]
+
+    bottle = client.put(
+        f"/api/feedings/{feeding_id}",
+        json={"feeding_type": "bottle", "amount": 90, "amount_unit": "mL"},
+    ).json()
+    assert (bottle["duration_minutes"], bottle["amount"]) == (None, 90)
+
+    # The type is unchanged, so the stored one decides: a bottle has no duration.
+    with _statements() as statements:
+        resp = client.put(f"/api/feedings/{feeding_id}", json={"duration_minutes": 5})
+    assert statements == ["UPDATE"]
+    assert (resp.json()["duration_minutes"], resp.json()["amount_unit"]) == (None, "mL")
+
+
+def test_writes_fall_back_without_returning(client, monkeypatch):
+    """SQLite before 3.35 has no RETURNING: the row is read back instead."""
+    for kind in ("insert", "update", "delete"):
+        monkeypatch.setattr(engine.dialect, f"{kind}_returning", False)
+
+    created = client.post("/api/diapers", json={"type": "pee"})
+    assert created.status_code == 201
+    diaper_id = created.json()["id"]
+    updated = client.put(f"/api/diapers/{diaper_id}", json={"type": "dry"})
+    assert updated.json()["type"] == "dry"
+    assert client.put("/api/diapers/9999", json={"type": "dry"}).status_code == 404
+    assert client.delete(f"/api/diapers/{diaper_id}").status_code == 204
+    assert client.delete(f"/api/diapers/{diaper_id}").status_code == 404
@@ -0,0 +1,131 @@
+"""Group commit: concurrent writes share a transaction, each with its own outcome."""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select
+
+from puffin import writer
+from puffin.database import Base
+from puffin.models import DiaperChange
+from puffin.routers import diapers
+from puffin.schemas import DiaperChangeCreate, DiaperChangeUpdate
+
+
+@pytest.fixture
+def group_writer(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'puffin.db'}"
+    setup = create_engine(url)
+    Base.metadata.create_all(setup)
+    setup.dispose()
+    # A long window, so every write submitted below lands in one group.
+    w = writer.GroupCommitWriter(url, window=0.5)
+    monkeypatch.setattr(writer, "_writer", w)
+    yield w
+    w.close()
+
+
+def _commits(w):
+    seen = []
+    event.listen(w.engine, "commit", lambda conn: seen.append(threading.current_thread().name))
+    return seen
+
+
+def test_concurrent_writes_share_a_commit(group_writer):
+    commits = _commits(group_writer)
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        futures = [
+            pool.submit(
+                diapers.create_diaper, DiaperChangeCreate(type="pee", notes=str(i)), db=None
+            )
+            for i in range(20)
+        ]
+        created = [f.result() for f in futures]
+
+    assert len({d.id for d in created}) == 20
+    assert {d.notes for d in created} == {str(i) for i in range(20)}
+    assert 1 <= len(commits) < 20
+    assert set(commits) == {"puffin-writer"}
+    with group_writer.engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(DiaperChange)) == 20
+
+
+def test_failed_write_is_rolled_back_alone(group_writer):
+    commits = _commits(group_writer)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        good = pool.submit(diapers.create_diaper, DiaperChangeCreate(type="poop"), db=None)
+        missing = pool.submit(diapers.update_diaper, 9999, DiaperChangeUpdate(type="dry"), db=None)
+        also_good = pool.submit(diapers.create_diaper, DiaperChangeCreate(type="dry"), db=None)
+
+        with pytest.raises(HTTPException) as exc_info:
+            missing.result()
+        assert exc_info.value.status_code == 404
+        assert good.result().type == "poop"
+        assert also_good.result().type == "dry"
+
+    assert len(commits) == 1
+    with group_writer.engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(DiaperChange)) == 2
+
+
+def test_writes_go_through_the_writer_over_http(client, group_writer):
+    commits = _commits(group_writer)
+    resp = client.post("/api/diapers", json={"type": "both"})
+    assert resp.status_code == 201
+    assert commits == ["puffin-writer"]
+    # Written to the writer's database, not the request session's.
+    assert client.get(f"/api/diapers/{resp.json()['id']}").status_code == 404
+
+
+def test_stuck_writer_times_out_and_skips_the_abandoned_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(writer, "SUBMIT_TIMEOUT", 0.2)
+    w = writer.GroupCommitWriter(f"sqlite:///{tmp_path / 'puffin.db'}", window=0)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def stuck(session):
+        started.set()
+        release.wait()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        first = pool.submit(w.submit, stuck)
+        started.wait()
+        with pytest.raises(HTTPException) as exc_info:
+            w.submit(lambda session: ran.append("late"))
+        assert exc_info.value.status_code == 503
+        release.set()
+        with pytest.raises(HTTPException):
+            first.result()  # timed out too, though it still commits
+
+    w.submit(lambda session: ran.append("next"))
+    w.close()
+    assert ran == ["next"]
+
+
+def test_dead_writer_fails_fast(tmp_path):
+    w = writer.GroupCommitWriter(f"sqlite:///{tmp_path / 'missing' / 'puffin.db'}", window=0)
+    w._thread.join()  # the loop could not open its connection
+    with pytest.raises(HTTPException) as exc_info:
+        w.submit(lambda session: None)
+    assert exc_info.value.status_code == 503
+
+    queued: Future = Future()
+    w._queue.put((None, queued))
+    w._fail_queued(RuntimeError("gone"))
+    with pytest.raises(RuntimeError):
+        queued.result(timeout=0)
+
+
+def test_off_by_default(client, monkeypatch):
+    monkeypatch.delenv("PUFFIN_GROUP_COMMIT_MS", raising=False)
+    assert writer.window_from_env() is None
+    assert writer._writer is None
+    assert client.post("/api/diapers", json={"type": "pee"}).status_code == 201
+
+
+@pytest.mark.parametrize(("raw", "window"), [("5", 0.005), ("0", 0.0), ("-3", 0.0), ("x", None)])
+def test_window_from_env(monkeypatch, raw, window):
+    monkeypatch.setenv("PUFFIN_GROUP_COMMIT_MS", raw)
+    assert writer.window_from_env() == window